@@ -0,0 +1,206 @@
+"""
+Endpoint benchmark over a seeded household, with comparison to a baseline.
+
+Migrates a throwaway SQLite database, fills it with `seed_data`, then calls
+every API endpoint in-process through Django's test client. For each one it
+records latency percentiles, the number of SQL queries and the response
+size, and writes them to JSON. Given a baseline written by an earlier run,
+it prints the differences and exits with status 1 when an endpoint runs
+more queries or returns more bytes than `--tolerance` allows. Latency is
+only gated with `--check-latency`, since it varies between runs even on a
+quiet machine.
+
+    python benchmarks/api_benchmark.py --output before.json
+    python benchmarks/api_benchmark.py --baseline before.json
+
+The summary cache is disabled unless `--cache-backend` says otherwise, so
+summaries are computed on every request. `--existing` measures the database
+configured in the environment instead of seeding a new one.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = BASE_DIR / 'benchmarks' / 'baseline.json'
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(client, method, url, body, iterations, warmup):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def call():
+        if body is None:
+            return getattr(client, method)(url)
+        return getattr(client, method)(url, json.dumps(body), content_type='application/json')
+
+    for _ in range(warmup):
+        call()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    # Counted on a separate call so capturing does not skew the timings
+    with CaptureQueriesContext(connection) as queries:
+        response = call()
+    latencies.sort()
+    return {
+        'url': url,
+        'method': method.upper(),
+        'status': response.status_code,
+        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+        'p90_ms': round(percentile(latencies, 0.90) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'queries': len(queries),
+        'bytes': len(response.content),
+    }
+
+
+def run(args):
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+    from tracker.models import Child, DailyTracking, ScreenTimeGoal
+    from tracker.seeding import endpoint_requests
+
+    if args.existing:
+        child = Child.objects.order_by('pk').first()
+        latest = DailyTracking.objects.order_by('-date').first()
+        if child is None:
+            sys.exit('The database has no children; run seed_data first')
+        day = latest.date if latest else date.today()
+    else:
+        call_command('migrate', '--noinput', verbosity=0)
+        call_command(
+            'seed_data', children=args.children, goals=args.goals, years=args.years,
+            end=str(args.end), seed=args.seed, stdout=io.StringIO(),
+        )
+        child = Child.objects.order_by('pk').first()
+        day = args.end
+
+    goal_ids = list(ScreenTimeGoal.objects.filter(children=child).values_list('pk', flat=True))
+    client = Client()
+    results = {}
+    for name, method, url, body in endpoint_requests(child.pk, goal_ids, day):
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure(client, method, url, body, args.iterations, args.warmup)
+        row = results[name]
+        print(f"{name:<22}{row['status']:>7}{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+              f"{row['queries']:>8}{row['bytes']:>10}", file=sys.stderr)
+
+    counts = {model.__name__: model.objects.count() for model in (Child, ScreenTimeGoal, DailyTracking)}
+    return {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': connection.vendor,
+            'cache_backend': os.environ.get('DJANGO_CACHE_BACKEND'),
+            'iterations': args.iterations,
+            'dataset': None if args.existing else {
+                'children': args.children, 'goals': args.goals, 'years': args.years,
+                'end': str(args.end), 'seed': args.seed,
+            },
+            'rows': counts,
+        },
+        'endpoints': results,
+    }
+
+
+def compare(current, baseline, tolerance, min_delta_ms, check_latency=False):
+    """Print current vs baseline per endpoint and return the regressions found.
+
+    Query counts and bytes are gated on the same dataset; p50 latency only
+    when `check_latency` is set.
+    """
+    regressions = []
+    same_data = current['meta']['dataset'] == baseline['meta'].get('dataset')
+    if not same_data:
+        print('Baseline was recorded on a different dataset; queries and bytes are not compared')
+    print(f"{'endpoint':<22}{'p50 ms':>10}{'base':>10}{'change':>9}{'queries':>9}{'base':>6}{'bytes':>10}{'base':>10}")
+    for name, row in current['endpoints'].items():
+        base = baseline['endpoints'].get(name)
+        if base is None:
+            print(f"{name:<22}{row['p50_ms']:>10.2f}{'new':>10}")
+            continue
+        change = (row['p50_ms'] - base['p50_ms']) / base['p50_ms'] if base['p50_ms'] else 0
+        print(f"{name:<22}{row['p50_ms']:>10.2f}{base['p50_ms']:>10.2f}{change:>+9.0%}"
+              f"{row['queries']:>9}{base['queries']:>6}{row['bytes']:>10}{base['bytes']:>10}")
+        if check_latency and change > tolerance and row['p50_ms'] - base['p50_ms'] > min_delta_ms:
+            regressions.append(f"{name}: p50 {base['p50_ms']:.2f} -> {row['p50_ms']:.2f} ms")
+        if same_data and row['queries'] > base['queries']:
+            regressions.append(f"{name}: queries {base['queries']} -> {row['queries']}")
+        if same_data and row['bytes'] > base['bytes'] * (1 + tolerance):
+            regressions.append(f"{name}: bytes {base['bytes']} -> {row['bytes']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--children', type=int, default=3)
+    parser.add_argument('--goals', type=int, default=6)
+    parser.add_argument('--years', type=float, default=1, help='years of seeded history')
+    parser.add_argument('--end', type=date.fromisoformat, default=date(2026, 3, 1),
+                        help='last seeded day, fixed so runs see the same data (default: 2026-03-01)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=30, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed requests per endpoint')
+    parser.add_argument('--only', action='append', help='endpoint name to run (repeatable, default: all)')
+    parser.add_argument('--cache-backend', default='dummy', help='DJANGO_CACHE_BACKEND for the run (default: dummy)')
+    parser.add_argument('--existing', action='store_true',
+                        help='measure the configured database instead of seeding a temporary one')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', nargs='?', const=str(DEFAULT_BASELINE),
+                        help=f'compare with an earlier --output file (default: {DEFAULT_BASELINE.name})')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed relative growth in bytes, and in p50 latency with --check-latency (default: 0.5)')
+    parser.add_argument('--check-latency', action='store_true',
+                        help='also fail when an endpoint\'s p50 latency grew past --tolerance and --min-delta-ms')
+    parser.add_argument('--min-delta-ms', type=float, default=1,
+                        help='with --check-latency, ignore latency changes smaller than this (default: 1)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'
+    os.environ['DJANGO_CACHE_BACKEND'] = args.cache_backend
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.existing:
+            os.environ.pop('DJANGO_DB_ENGINE', None)
+            os.environ['SQLITE_PATH'] = os.path.join(tmp, 'bench.sqlite3')
+        import django
+        django.setup()
+        print(f"{'endpoint':<22}{'status':>7}{'p50 ms':>10}{'p99 ms':>10}{'queries':>8}{'bytes':>10}", file=sys.stderr)
+        current = run(args)
+        from django.db import connections
+        connections.close_all()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2) + '\n')
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(current, baseline, args.tolerance, args.min_delta_ms, args.check_latency)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+    elif not args.output:
+        print(json.dumps(current, indent=2))
+
+
+if __name__ == '__main__':
+    main()
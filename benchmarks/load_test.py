@@ -0,0 +1,120 @@
+"""
+Load test comparing the sync (DRF) and async read paths.
+
+Each virtual user repeatedly fetches the five requests the dashboard fires
+with `Promise.all` (daily summary, weekly ledger, and the day's rewards,
+penalties and usage), over a keep-alive connection, for `--duration`
+seconds per path. Reports requests per second and latency percentiles.
+
+Start the server in the mode to measure, then point the harness at it:
+
+    SERVER_MODE=asgi sh entrypoint.sh            # or uvicorn config.asgi:application
+    python benchmarks/load_test.py --base-url http://localhost:8000 --child 1
+
+Under WSGI (gunicorn) both paths run on sync workers; under ASGI the async
+path serves concurrent requests from one worker.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+PATHS = {'sync': '/api', 'async': '/api/async'}
+
+
+def dashboard_urls(prefix, child, day):
+    return [
+        f'{prefix}/children/{child}/daily_summary/?date={day}',
+        f'{prefix}/children/{child}/weekly_ledger/?date={day}',
+        f'{prefix}/adhoc-rewards/?child_id={child}&date={day}',
+        f'{prefix}/adhoc-penalties/?child_id={child}&date={day}',
+        f'{prefix}/screen-time-usage/?child_id={child}&date={day}',
+    ]
+
+
+def virtual_user(base_url, urls, deadline, latencies, errors, lock):
+    parts = urlsplit(base_url)
+    conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    conn = conn_class(parts.netloc, timeout=30)
+    mine, failed = [], 0
+    index = 0
+    while time.perf_counter() < deadline:
+        url = urls[index % len(urls)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            conn.request('GET', url, headers={'Accept': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                failed += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = conn_class(parts.netloc, timeout=30)
+            continue
+        mine.append(time.perf_counter() - started)
+    conn.close()
+    with lock:
+        latencies.extend(mine)
+        errors[0] += failed
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_path(name, args):
+    urls = dashboard_urls(PATHS[name], args.child, args.date)
+    latencies, errors, lock = [], [0], threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=virtual_user, args=(args.base_url, urls, deadline, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'path': name,
+        'concurrency': args.concurrency,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--child', type=int, default=1, help='child id to request summaries for')
+    parser.add_argument('--date', default=time.strftime('%Y-%m-%d'))
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per path')
+    parser.add_argument('--path', choices=sorted(PATHS), action='append', help='path to test (default: both)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = [run_path(name, args) for name in args.path or PATHS]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'path':<8}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+    for row in results:
+        print(f"{row['path']:<8}{row['requests']:>10}{row['errors']:>8}{row['rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p99_ms']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Per-request connection overhead against MySQL/MariaDB.
+
+Runs the same request loop under three connection settings and reports the
+mean time per request and how many server connections were opened:
+
+- fresh: MYSQL_CONN_MAX_AGE=0, a new connection for every request
+- persistent: MYSQL_CONN_MAX_AGE=60 with health checks
+- pooled: MYSQL_CONN_MAX_AGE=0 with MYSQL_POOL_SIZE=4
+
+Point it at the docker-compose database (`docker compose up -d db`) with the
+usual MYSQL_* variables, e.g.
+
+    MYSQL_HOSTNAME=127.0.0.1 MYSQL_DATABASE=screentime MYSQL_USERNAME=screentime \\
+    MYSQL_PASSWORD=screentime python benchmarks/mysql_connection_overhead.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+MODES = {
+    'fresh': {'MYSQL_CONN_MAX_AGE': '0', 'MYSQL_POOL_SIZE': '0'},
+    'persistent': {'MYSQL_CONN_MAX_AGE': '60', 'MYSQL_POOL_SIZE': '0'},
+    'pooled': {'MYSQL_CONN_MAX_AGE': '0', 'MYSQL_POOL_SIZE': '4'},
+}
+
+
+def server_connections(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW GLOBAL STATUS LIKE 'Connections'")
+        return int(cursor.fetchone()[1])
+
+
+def run_mode(requests):
+    """Simulate `requests` request cycles in this process and print the outcome as JSON."""
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+    django.setup()
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+    from tracker.models import Child
+
+    # Warm up imports and the first connection
+    Child.objects.exists()
+    before = server_connections(connection)
+    request_finished.send(sender=None)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started.send(sender=None)
+        Child.objects.exists()
+        # close_old_connections runs here, as at the end of a real request
+        request_finished.send(sender=None)
+    elapsed = time.perf_counter() - started
+
+    opened = server_connections(connection) - before
+    print(json.dumps({'requests': requests, 'seconds': elapsed, 'connections': opened}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--run', choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_mode(args.requests)
+        return
+
+    results = []
+    for name, overrides in MODES.items():
+        env = {
+            **os.environ,
+            **overrides,
+            'DJANGO_DB_ENGINE': 'mysql',
+            'DJANGO_SETTINGS_MODULE': 'config.settings',
+        }
+        output = subprocess.run(
+            [sys.executable, __file__, '--run', name, '--requests', str(args.requests)],
+            cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        outcome = json.loads(output.strip().splitlines()[-1])
+        results.append({
+            'mode': name,
+            'requests': outcome['requests'],
+            'ms_per_request': round(outcome['seconds'] / outcome['requests'] * 1000, 3),
+            'connections_opened': outcome['connections'],
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<12}{'ms/request':>12}{'connections':>13}")
+    for row in results:
+        print(f"{row['mode']:<12}{row['ms_per_request']:>12}{row['connections_opened']:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Multi-process write contention benchmark for the SQLite profiles.
+
+Starts several worker processes that upsert trackings into one SQLite file
+at the same time, the way gunicorn workers do when several phones save at
+once, and reports throughput, latency and "database is locked" failures for
+the default settings and for the SQLITE_TUNED profile. Workers that crash
+are counted as failed rather than aborting the run.
+
+    python benchmarks/sqlite_write_contention.py --workers 4 --writes 200
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    'default': {'SQLITE_TUNED': 'false'},
+    'tuned': {'SQLITE_TUNED': 'true'},
+}
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+def create_fixtures(workers):
+    """Create one child and goal per worker and print their ids as JSON.
+
+    Runs before any worker starts, so the workers' own writes are the only
+    ones contending for the database.
+    """
+    setup_django()
+    from tracker.models import Child, ScreenTimeGoal
+
+    fixtures = []
+    for worker in range(workers):
+        child = Child.objects.create(name=f'Worker {worker}')
+        goal = ScreenTimeGoal.objects.create(name=f'Goal {worker}', reward_minutes=10)
+        goal.children.add(child)
+        fixtures.append([child.pk, goal.pk])
+    print(json.dumps(fixtures))
+
+
+def run_worker(child_id, goal_id, writes, start_at):
+    """Upsert `writes` trackings for this worker's child and print the outcome as JSON."""
+    setup_django()
+    from django.db import OperationalError
+    from tracker.models import Child, ScreenTimeGoal
+    from tracker.upserts import upsert_tracking
+
+    child = Child.objects.get(pk=child_id)
+    goal = ScreenTimeGoal.objects.get(pk=goal_id)
+
+    time.sleep(max(0, start_at - time.time()))
+    latencies, locked = [], 0
+    first_day = date(2026, 1, 5)
+    for index in range(writes):
+        started = time.perf_counter()
+        try:
+            upsert_tracking(child, goal, first_day + timedelta(days=index), {'status': 'earned'})
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            locked += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    print(json.dumps({'latencies': latencies, 'locked': locked}))
+
+
+def worker_outcome(worker, proc):
+    """Wait for a worker and return its outcome, or None if it died or printed nothing."""
+    stdout, stderr = proc.communicate()
+    lines = stdout.strip().splitlines()
+    if proc.returncode == 0 and lines:
+        try:
+            return json.loads(lines[-1])
+        except ValueError:
+            pass
+    reason = stderr.strip().splitlines()[-1] if stderr.strip() else 'no output'
+    print(f'worker {worker} failed (exit {proc.returncode}): {reason}', file=sys.stderr)
+    return None
+
+
+def run_profile(name, workers, writes):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            **PROFILES[name],
+            'SQLITE_PATH': os.path.join(tmp, 'bench.sqlite3'),
+            'DJANGO_CACHE_BACKEND': 'dummy',
+            'DJANGO_SETTINGS_MODULE': 'config.settings',
+        }
+        subprocess.run(
+            [sys.executable, 'manage.py', 'migrate', '--noinput', '-v', '0'],
+            cwd=BASE_DIR, env=env, check=True,
+        )
+        setup = subprocess.run(
+            [sys.executable, __file__, '--setup', '--workers', str(workers)],
+            cwd=BASE_DIR, env=env, check=True, stdout=subprocess.PIPE, text=True,
+        )
+        fixtures = json.loads(setup.stdout.strip().splitlines()[-1])
+        # Give every worker time to import Django before the writes start
+        start_at = time.time() + 3
+        procs = [
+            subprocess.Popen(
+                [sys.executable, __file__, '--worker', str(child_id), str(goal_id), '--writes', str(writes),
+                 '--start-at', str(start_at)],
+                cwd=BASE_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            )
+            for child_id, goal_id in fixtures
+        ]
+        outcomes = [worker_outcome(worker, proc) for worker, proc in enumerate(procs)]
+        elapsed = time.time() - start_at
+
+    finished = [outcome for outcome in outcomes if outcome is not None]
+    latencies = sorted(value for outcome in finished for value in outcome['latencies'])
+    ok = len(latencies)
+    return {
+        'profile': name,
+        'workers': workers,
+        'failed_workers': workers - len(finished),
+        'attempted': workers * writes,
+        'ok': ok,
+        'locked': sum(outcome['locked'] for outcome in finished),
+        'writes_per_sec': round(ok / elapsed, 1) if elapsed > 0 else None,
+        'p50_ms': round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        'p95_ms': round(latencies[int(ok * 0.95) - 1] * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--writes', type=int, default=200, help='writes per worker')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='profile to run (repeatable, default: all)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--setup', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--worker', type=int, nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument('--start-at', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.setup:
+        create_fixtures(args.workers)
+        return
+    if args.worker is not None:
+        run_worker(*args.worker, args.writes, args.start_at)
+        return
+
+    results = [run_profile(name, args.workers, args.writes) for name in args.profile or PROFILES]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'profile':<10}{'ok':>8}{'locked':>8}{'failed':>8}{'writes/s':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for row in results:
+        print(f"{row['profile']:<10}{row['ok']:>8}{row['locked']:>8}{row['failed_workers']:>8}"
+              f"{row['writes_per_sec']:>10}{str(row['p50_ms']):>9}{str(row['p95_ms']):>9}")
+
+
+if __name__ == '__main__':
+    main()
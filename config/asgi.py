@@ -1,3 +1,11 @@
 """
-Asynchronous configuration for Screen Time Tracker
+ASGI config for the Screen Time Tracker project.
+
+Served by uvicorn workers when entrypoint.sh runs with SERVER_MODE=asgi,
+which also enables the async read endpoints and the per-child event streams.
 """
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+application = get_asgi_application()
@@ -0,0 +1,64 @@
+"""
+MySQL/MariaDB backend with an optional in-process connection pool.
+
+Set `OPTIONS['pool_size']` to keep that many idle connections per process.
+Closing a connection (at the end of a request when `CONN_MAX_AGE` is 0, or
+when it expires) rolls it back and returns it to the pool instead of
+disconnecting, so the next request skips the TCP and authentication
+handshake. Pooled connections are pinged before reuse.
+"""
+import threading
+from functools import partial
+
+from django.db.backends.mysql import base
+
+from ..pool import ConnectionPool
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _ping(conn):
+    try:
+        conn.ping()
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pool_size = int(kwargs.pop('pool_size', 0) or 0)
+        return kwargs
+
+    @property
+    def pool(self):
+        return _pools.get(self.alias)
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_size:
+            return super().get_new_connection(conn_params)
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = ConnectionPool(
+                    partial(super().get_new_connection, conn_params), self.pool_size, check=_ping
+                )
+        return _pools[self.alias].acquire()
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        if self.errors_occurred:
+            # Don't hand a connection in an unknown state to the next request
+            self.pool.discard(self.connection)
+            return
+        try:
+            self.connection.rollback()
+        except base.Database.Error:
+            self.pool.discard(self.connection)
+        else:
+            self.pool.release(self.connection)
+
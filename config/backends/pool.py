@@ -0,0 +1,59 @@
+"""
+A small thread-safe pool of DB-API connections shared by a process.
+"""
+import threading
+
+
+class ConnectionPool:
+    """Keep up to `max_size` idle connections around for reuse.
+
+    `connect()` opens a new connection and `check(conn)` returns whether an
+    idle connection is still usable; connections failing the check are
+    closed and replaced. Idle connections are reused most recent first so
+    the rest can time out on the server.
+    """
+
+    def __init__(self, connect, max_size, check=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.check = check
+        self.idle = []
+        self.lock = threading.Lock()
+        self.stats = {'created': 0, 'reused': 0, 'discarded': 0}
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                conn = self.idle.pop() if self.idle else None
+            if conn is None:
+                break
+            if self.check is None or self.check(conn):
+                with self.lock:
+                    self.stats['reused'] += 1
+                return conn
+            self.discard(conn)
+        conn = self.connect()
+        with self.lock:
+            self.stats['created'] += 1
+        return conn
+
+    def release(self, conn):
+        with self.lock:
+            if len(self.idle) < self.max_size:
+                self.idle.append(conn)
+                return
+        self.discard(conn)
+
+    def discard(self, conn):
+        with self.lock:
+            self.stats['discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            self.discard(conn)
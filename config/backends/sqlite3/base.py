@@ -0,0 +1,42 @@
+"""
+SQLite backend tuned for several app server workers writing at once.
+
+Adds two keys to the database `OPTIONS`:
+
+- `pragmas`: mapping of PRAGMA name to value, run on every new connection
+- `transaction_mode`: `DEFERRED` (SQLite's default), `IMMEDIATE` or
+  `EXCLUSIVE`, used when Django opens a transaction
+
+`IMMEDIATE` takes the write lock when `atomic()` starts instead of on the
+first write, so a transaction that reads then writes waits on
+`busy_timeout` rather than failing with "database is locked" when another
+writer got there first.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = kwargs.pop('pragmas', {})
+        self.transaction_mode = (kwargs.pop('transaction_mode', None) or 'DEFERRED').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}, "
+                f"not {self.transaction_mode!r}."
+            )
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
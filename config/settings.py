@@ -44,6 +44,19 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Opt-in per-request instrumentation: Server-Timing headers, per-route
+# histograms at /api/_metrics and a warning log for slow requests
+REQUEST_METRICS = os.environ.get('REQUEST_METRICS', 'false').lower() == 'true'
+REQUEST_METRICS_SLOW_MS = int(os.environ.get('REQUEST_METRICS_SLOW_MS', 500))
+if REQUEST_METRICS:
+    # First, so the wall time covers every other middleware
+    MIDDLEWARE.insert(0, 'tracker.middleware.RequestMetricsMiddleware')
+
+# What to do when a viewset action runs more queries than its declared
+# budget (see tracker.budgets): 'log', 'raise' or 'off'. Tests always raise.
+QUERY_BUDGETS = os.environ.get('QUERY_BUDGETS', 'log' if DEBUG else 'off')
+TEST_RUNNER = 'tracker.test_runner.QueryBudgetTestRunner'
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -63,26 +76,91 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# Under ASGI the frontend reads through the async views in tracker.async_views
+ASYNC_API = os.environ.get('SERVER_MODE', 'wsgi').lower() == 'asgi'
+
+# The index page is rendered once per process; set to false while editing templates/index.html
+APP_SHELL_CACHE = os.environ.get('APP_SHELL_CACHE', 'true').lower() == 'true'
 
 if os.environ.get('DJANGO_DB_ENGINE') == 'mysql':
+    # MYSQL_CONN_MAX_AGE keeps each worker's connection open between requests
+    # (0 closes it after every request). MYSQL_POOL_SIZE > 0 switches to a
+    # backend that returns closed connections to an in-process pool instead.
+    MYSQL_POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE", 0))
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.mysql",
+            "ENGINE": "config.backends.mysql" if MYSQL_POOL_SIZE else "django.db.backends.mysql",
             "NAME": os.environ.get("MYSQL_DATABASE", "savingstracker"),
             "USER": os.environ.get("MYSQL_USERNAME", "savings"),
             "PASSWORD": os.environ.get("MYSQL_PASSWORD", "null"),
             "HOST": os.environ.get("MYSQL_HOSTNAME", "localhost"),
             "PORT": os.environ.get("MYSQL_PORT", "3306"),
+            "CONN_MAX_AGE": int(os.environ.get("MYSQL_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": os.environ.get("MYSQL_CONN_HEALTH_CHECKS", "true").lower() == "true",
+            "OPTIONS": {"pool_size": MYSQL_POOL_SIZE} if MYSQL_POOL_SIZE else {},
+        }
+    }
+elif os.environ.get('SQLITE_TUNED', 'false').lower() == 'true':
+    # Opt-in profile for running several workers against one SQLite file:
+    # WAL lets readers proceed during a write, IMMEDIATE transactions queue
+    # writers on busy_timeout instead of failing with "database is locked".
+    DATABASES = {
+        "default": {
+            "ENGINE": "config.backends.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", "db.sqlite3"),
+            "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 600)),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "transaction_mode": "IMMEDIATE",
+                "pragmas": {
+                    "journal_mode": "WAL",
+                    "synchronous": "NORMAL",
+                    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+                    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 134217728)),
+                    # Negative values are KiB rather than pages
+                    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -20000)),
+                    "temp_store": "MEMORY",
+                },
+            },
         }
     }
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": "db.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", "db.sqlite3"),
         }
     }   
 
+# Cache backing the summary endpoints. DJANGO_CACHE_BACKEND selects:
+#   file (default) - shared by every worker of this checkout, under .cache/summaries
+#   redis          - DJANGO_CACHE_LOCATION=redis://host:6379/0 (requires the `redis` package)
+#   locmem         - per process, only safe with a single worker
+#   dummy          - disables caching
+CACHE_BACKENDS = {
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache' / 'summaries')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://localhost:6379/0'),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'screentime'),
+    'dummy': ('django.core.cache.backends.dummy.DummyCache', ''),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[os.environ.get('DJANGO_CACHE_BACKEND', 'file')]
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', _cache_location),
+    }
+}
+SUMMARY_CACHE_ALIAS = 'default'
+SUMMARY_CACHE_TIMEOUT = int(os.environ.get('SUMMARY_CACHE_TIMEOUT', 600))
+
+# Deletions stay visible to the /api/sync/ feed this long; older tokens get a full resync
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+# Replayed offline mutations are remembered this long; a queue retried later would apply again
+MUTATION_RETENTION_DAYS = int(os.environ.get('MUTATION_RETENTION_DAYS', 30))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -5,10 +5,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from tracker.frontend_views import index
+from tracker.frontend_views import index, service_worker
 
 urlpatterns = [
     path('', index, name='index'),
+    path('sw.js', service_worker, name='service-worker'),
     path('admin/', admin.site.urls),
     path('api/', include('tracker.urls')),
 ]
@@ -4,6 +4,9 @@ set -e
 # Run database migrations
 python manage.py migrate --noinput
 
+# Collect static assets under content-hashed names for WhiteNoise to serve with far-future caching
+python manage.py collectstatic --noinput
+
 # Optionally create a superuser 
 if [ "${CREATE_SUPERUSER:-false}" = "true" ]; then
   python manage.py create_superuser \
@@ -12,5 +15,13 @@ if [ "${CREATE_SUPERUSER:-false}" = "true" ]; then
     --password "${DJANGO_SUPERUSER_PASSWORD:-admin}" || true
 fi
 
-# Hand off to the app server
+# Hand off to the app server. SERVER_MODE=asgi runs a single uvicorn worker:
+# it serves concurrent requests through the async endpoints, and the live
+# events broker only reaches streams in its own process.
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  if [ "${WORKERS:-1}" != "1" ]; then
+    echo "SERVER_MODE=asgi runs one worker so live events reach every stream; ignoring WORKERS=${WORKERS}" >&2
+  fi
+  exec uvicorn config.asgi:application --host 0.0.0.0 --port 8000 --workers 1
+fi
 gunicorn --bind 0.0.0.0:8000 --workers "${WORKERS:-4}" config.wsgi:application
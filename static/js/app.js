@@ -0,0 +1,1707 @@
+// Server-side settings rendered into the page shell
+const APP_CONFIG = document.body.dataset;
+// Resolve API URL relative to the current host so app works on any domain
+const API_URL = new URL('/api', window.location.origin).href;
+// Read-only endpoints; served by the async views when the server runs under ASGI
+const READ_API_URL = new URL(APP_CONFIG.readApiPath, window.location.origin).href;
+
+// Helper function to get CSRF token
+function getCsrfToken() {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, 10) === ('csrftoken' + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(10));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+let selectedChild = null;
+let children = [];
+let goals = [];
+
+// Initialize
+async function init() {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register(APP_CONFIG.serviceWorkerUrl)
+            .catch(error => console.warn('Service worker not registered:', error));
+        navigator.serviceWorker.addEventListener('message', event => {
+            if (event.data?.type === 'mutations-replayed') {
+                applyReplayResults(event.data.results);
+            }
+        });
+    }
+    window.addEventListener('online', replayMutations);
+    if (!(await loadBootstrap())) {
+        await loadChildren();
+    }
+    replayMutations();
+}
+
+// Last data rendered on the dashboard; taps patch it and re-render before the server answers
+let dashboardState = null;
+// Entries created on this page get negative ids until the server assigns real ones
+let nextTempId = -1;
+// Temp id -> id of the queued mutation that creates the entry
+const pendingCreates = {};
+// Row key -> id of the latest queued mutation that writes the row, until it is replayed
+const pendingWrites = {};
+// Row key -> updated_at of the row as our own replayed mutations left it
+const rowVersions = {};
+let replaying = null;
+
+// Where each ad-hoc entry type lives in the dashboard data and how it moves the weekly ledger
+const OPTIMISTIC_ENTRIES = {
+    reward: { list: 'adhocRewards', minutes: 'minutes', ledger: 'adhoc_reward_minutes', available: 1 },
+    penalty: { list: 'adhocPenalties', minutes: 'minutes', ledger: 'adhoc_penalty_minutes', available: -1 },
+    usage: { list: 'usageList', minutes: 'minutes_used', ledger: 'used_minutes', available: 0 }
+};
+
+// The newer of two updated_at stamps as the server formats them
+function newerVersion(a, b) {
+    return !a || (b && b > a) ? b : a;
+}
+
+// Queue a mutation in IndexedDB and try to send it. `rowKey` names the row it writes and
+// `seenVersion` is that row's updated_at as last fetched. Returns the mutation id right
+// away and a promise that settles once it is stored.
+function queueMutation(model, op, data, target = null, rowKey = null, seenVersion = null) {
+    const mutation = {
+        id: MutationQueue.uuid(),
+        model: model,
+        op: op,
+        data: data
+    };
+    if (target !== null) {
+        mutation.pk = target < 0 ? { ref: pendingCreates[target] } : target;
+    }
+    if (rowKey) {
+        // An edit on top of a queued one builds on that mutation's result, not on what was fetched
+        const earlier = pendingWrites[rowKey];
+        const version = earlier ? { ref: earlier } : newerVersion(seenVersion, rowVersions[rowKey]);
+        if (version) {
+            mutation.base_updated_at = version;
+        }
+        pendingWrites[rowKey] = mutation.id;
+    }
+    const queued = MutationQueue.enqueue(mutation, getCsrfToken()).then(requestReplay);
+    return { id: mutation.id, queued: queued };
+}
+
+function requestReplay() {
+    // Background sync replays the queue even if the app is closed before the network returns
+    if ('serviceWorker' in navigator && 'SyncManager' in window) {
+        navigator.serviceWorker.getRegistration()
+            .then(registration => registration?.sync.register(MutationQueue.SYNC_TAG))
+            .catch(() => {});
+    }
+    if (navigator.onLine) {
+        replayMutations();
+    }
+}
+
+function replayMutations() {
+    if (!replaying) {
+        replaying = MutationQueue.flush(`${API_URL}/mutations/`)
+            .then(applyReplayResults)
+            .catch(error => console.warn('Mutations stay queued until the next attempt:', error))
+            .finally(() => { replaying = null; });
+    }
+    return replaying;
+}
+
+// Reconcile the dashboard with the server once queued mutations have been replayed
+async function applyReplayResults(results) {
+    if (!results || results.length === 0) {
+        return;
+    }
+    results.forEach(result => {
+        const rowKey = Object.keys(pendingWrites).find(key => pendingWrites[key] === result.id);
+        if (rowKey) {
+            delete pendingWrites[rowKey];
+            rowVersions[rowKey] = newerVersion(rowVersions[rowKey], result.object?.updated_at);
+        }
+        if (result.status === 'conflict') {
+            console.info('Kept the newer server copy for mutation', result.id);
+        } else if (result.status === 'invalid' || result.status === 'error') {
+            console.warn('Server rejected mutation', result.id, result.errors);
+        }
+    });
+    // Wait for the rest of the queue, and don't replace a form the user has open
+    const stillQueued = (await MutationQueue.pending()).length > 0;
+    if (!stillQueued && document.querySelector('#mainContent .daily-summary')) {
+        await renderDashboard();
+    }
+}
+
+// Live updates pushed by the server when it runs under ASGI; EventSource reconnects on its own
+let liveEvents = null;
+let liveRefreshTimer = null;
+
+function subscribeToChild(childId) {
+    if (liveEvents) {
+        liveEvents.close();
+        liveEvents = null;
+    }
+    if (!APP_CONFIG.liveEvents || !('EventSource' in window)) {
+        return;
+    }
+    liveEvents = new EventSource(`${API_URL}/children/${childId}/events/`);
+    liveEvents.addEventListener('change', event => {
+        const change = JSON.parse(event.data);
+        // Anything in the displayed week can move the weekly totals
+        if (formatDate(getWeekStart(parseLocalDate(change.date))) === formatDate(getWeekStart(currentDate))) {
+            scheduleLiveRefresh();
+        }
+    });
+    liveEvents.addEventListener('resync', scheduleLiveRefresh);
+}
+
+// Coalesce bursts of events into one refresh
+function scheduleLiveRefresh() {
+    clearTimeout(liveRefreshTimer);
+    liveRefreshTimer = setTimeout(async () => {
+        if (!document.querySelector('#mainContent .daily-summary')) {
+            return;
+        }
+        // Cached reads predate the change; drop them so the refresh hits the server
+        if ('caches' in window) {
+            const names = await caches.keys();
+            await Promise.all(names.filter(name => name.startsWith('api-')).map(name => caches.delete(name)));
+        }
+        renderDashboard();
+    }, 300);
+}
+
+// Dashboard data for the selected child and day, or null when something else is shown
+function currentDashboardState() {
+    const state = dashboardState;
+    if (state && state.childId === selectedChild?.id && state.date === formatDate(currentDate)) {
+        return state;
+    }
+    return null;
+}
+
+function renderOptimistic() {
+    const state = currentDashboardState();
+    return state ? renderDashboard(state) : renderDashboard();
+}
+
+function adjustLedger(field, delta, availableSign) {
+    const ledger = currentDashboardState()?.weeklyLedger;
+    if (!ledger || !delta) {
+        return;
+    }
+    ledger[field] += delta;
+    ledger.total_available_minutes += availableSign * delta;
+    ledger.remaining_minutes += availableSign * delta - (field === 'used_minutes' ? delta : 0);
+}
+
+// Mirrors ScreenTimeGoal.minutes_for on the server
+function minutesFor(goal, tracking) {
+    if (tracking.status !== 'earned') {
+        return 0;
+    }
+    if (goal.goal_type === 'tracked') {
+        return Math.floor(tracking.actual_minutes / 60) * goal.reward_per_hour;
+    }
+    return goal.reward_minutes + (tracking.bonus_earned ? goal.bonus_minutes : 0);
+}
+
+function patchTracking(goalId, fields) {
+    const goal = goals.find(g => g.id === goalId);
+    const summary = currentDashboardState()?.dailySummary;
+    if (!goal || !summary) {
+        return;
+    }
+    let tracking = summary.goals.find(t => t.goal === goalId);
+    if (!tracking) {
+        tracking = { goal: goalId, status: 'not_earned', actual_minutes: 0, bonus_earned: false, minutes_earned: 0 };
+        summary.goals.push(tracking);
+    }
+    const before = tracking.minutes_earned || 0;
+    Object.assign(tracking, fields);
+    if (goal.goal_type === 'tracked' && !('status' in fields)) {
+        tracking.status = tracking.actual_minutes > 0 ? 'earned' : 'not_earned';
+    }
+    tracking.minutes_earned = minutesFor(goal, tracking);
+    const delta = tracking.minutes_earned - before;
+    summary.total_earned_minutes = (summary.total_earned_minutes || 0) + delta;
+    // Sunday earnings of rollover goals count toward the next week, as on the server
+    if (!(goal.rollover_sunday_to_next_week && currentDate.getDay() === 0)) {
+        adjustLedger('goal_earned_minutes', delta, 1);
+    }
+}
+
+function patchEntry(model, op, id, fields) {
+    const config = OPTIMISTIC_ENTRIES[model];
+    const list = currentDashboardState()?.[config.list];
+    if (!list) {
+        return;
+    }
+    const index = list.findIndex(entry => entry.id === id);
+    const before = index >= 0 ? list[index][config.minutes] : 0;
+    let after = 0;
+    if (op === 'create') {
+        list.unshift({ id: id, ...fields });
+        after = fields[config.minutes];
+    } else if (index < 0) {
+        return;
+    } else if (op === 'update') {
+        Object.assign(list[index], fields);
+        after = list[index][config.minutes];
+    } else {
+        list.splice(index, 1);
+    }
+    adjustLedger(config.ledger, after - before, config.available);
+}
+
+// Queue a reward, penalty or usage change and show it on the dashboard right away
+async function saveEntry(model, op, id, fields = {}) {
+    if (op === 'create') {
+        id = nextTempId--;
+    }
+    const entry = currentDashboardState()?.[OPTIMISTIC_ENTRIES[model].list]?.find(item => item.id === id);
+    const mutation = queueMutation(
+        model, op, fields, op === 'create' ? null : id, `${model}:${id}`, entry?.updated_at
+    );
+    if (op === 'create') {
+        pendingCreates[id] = mutation.id;
+    }
+    if (op !== 'create' || fields.child === selectedChild?.id) {
+        patchEntry(model, op, id, fields);
+    }
+    renderOptimistic();
+    await mutation.queued;
+}
+
+// Load children, goals and the selected child's dashboard in one request
+async function loadBootstrap() {
+    try {
+        const savedChildId = localStorage.getItem('selectedChildId');
+        const params = new URLSearchParams({ date: formatDate(currentDate) });
+        if (savedChildId) {
+            params.set('child_id', savedChildId);
+        }
+        let response = await fetch(`${API_URL}/bootstrap/?${params}`);
+        if (response.status === 404 && savedChildId) {
+            // The saved child no longer exists; fall back to the first child
+            params.delete('child_id');
+            response = await fetch(`${API_URL}/bootstrap/?${params}`);
+        }
+        if (!response.ok) {
+            return false;
+        }
+
+        const data = await response.json();
+        children = data.children;
+        selectedChild = children.find(c => c.id === data.child_id) || null;
+        renderChildren();
+        if (!selectedChild) {
+            return true;
+        }
+        localStorage.setItem('selectedChildId', selectedChild.id);
+        subscribeToChild(selectedChild.id);
+        goals = data.goals;
+        renderChildren();
+        await renderDashboard({
+            dailySummary: data.daily_summary,
+            weeklyLedger: data.weekly_ledger,
+            adhocRewards: data.adhoc_rewards,
+            adhocPenalties: data.adhoc_penalties,
+            usageList: data.screen_time_usage
+        });
+        return true;
+    } catch (error) {
+        console.error('Error loading bootstrap data:', error);
+        return false;
+    }
+}
+
+async function loadChildren() {
+    try {
+        const response = await fetch(`${READ_API_URL}/children/`, {
+            headers: { 'Content-Type': 'application/json' }
+        });
+
+        if (response.ok) {
+            const data = await response.json();
+            children = data.results || data;
+            renderChildren();
+            if (children.length > 0) {
+                // Restore previously selected child from localStorage, or use first child
+                const savedChildId = localStorage.getItem('selectedChildId');
+                const childId = savedChildId && children.find(c => c.id === parseInt(savedChildId)) 
+                    ? parseInt(savedChildId) 
+                    : children[0].id;
+
+                selectChild(childId);
+            }
+        }
+    } catch (error) {
+        console.error('Error loading children:', error);
+        document.getElementById('mainContent').innerHTML = `
+            <div class="card" style="color: #dc3545;">
+                <p>⚠️ Unable to connect to server.</p>
+                <p style="font-size: 0.9rem; margin-top: 10px;">Run: <code style="background: #f0f0f0; padding: 2px 6px; border-radius: 3px;">python manage.py runserver</code></p>
+            </div>
+        `;
+    }
+}
+
+function renderChildren() {
+    const selector = document.getElementById('childSelector');
+    selector.innerHTML = children.map(child => `
+        <button class="child-btn ${selectedChild?.id === child.id ? 'active' : ''}" 
+                onclick="selectChild(${child.id})">
+            ${child.name}
+        </button>
+    `).join('');
+    document.getElementById('childSelectorCard').style.display = 'block';
+}
+
+function hideChildSelector() {
+    document.getElementById('childSelectorCard').style.display = 'none';
+}
+
+function showChildSelector() {
+    document.getElementById('childSelectorCard').style.display = 'block';
+}
+
+async function selectChild(childId) {
+    const child = children.find(c => c.id === childId);
+    selectedChild = child;
+    localStorage.setItem('selectedChildId', childId);
+    subscribeToChild(childId);
+    renderChildren();
+    await loadGoals();
+    renderDashboard();
+}
+
+async function loadGoals() {
+    try {
+        const response = await fetch(`${READ_API_URL}/goals/?child_id=${selectedChild.id}`, {
+            headers: { 'Content-Type': 'application/json' }
+        });
+
+        if (response.ok) {
+            const data = await response.json();
+            goals = data.results || data;
+        }
+    } catch (error) {
+        console.error('Error loading goals:', error);
+    }
+}
+
+// Day navigation
+let currentDate = new Date();
+
+function formatMinutesHuman(minutes) {
+    if (minutes === null || minutes === undefined || isNaN(minutes)) return '0m';
+    const sign = minutes < 0 ? '-' : '';
+    const abs = Math.abs(Math.round(minutes));
+    const hours = Math.floor(abs / 60);
+    const mins = abs % 60;
+    if (hours > 0) return `${sign}${hours}h ${mins}m`;
+    return `${sign}${mins}m`;
+}
+
+function getWeekStart(date = new Date()) {
+    const d = new Date(date);
+    const day = d.getDay();
+    const diff = d.getDate() - day + (day === 0 ? -6 : 1);
+    return new Date(d.setDate(diff));
+}
+
+function formatDate(date) {
+    // Format using local time (avoids UTC shifting the date)
+    const d = new Date(date);
+    const year = d.getFullYear();
+    const month = String(d.getMonth() + 1).padStart(2, '0');
+    const day = String(d.getDate()).padStart(2, '0');
+    return `${year}-${month}-${day}`;
+}
+
+// Weekday bits match ScreenTimeGoal.applies_to_days_mask (Monday is bit 0)
+function goalAppliesOn(goal, date) {
+    const dayBit = 1 << ((new Date(date).getDay() + 6) % 7);
+    return (goal.applies_to_days_mask & dayBit) !== 0;
+}
+
+function parseLocalDate(dateStr) {
+    // Parse "YYYY-MM-DD" as local date instead of UTC
+    const [year, month, day] = dateStr.split('-').map(Number);
+    return new Date(year, month - 1, day);
+}
+
+
+// Fetch the selected child's trackings between two dates, following the batch cursor
+async function fetchTrackings(start, end) {
+    const trackings = [];
+    let cursor = null;
+    do {
+        const payload = {
+            child_id: selectedChild.id,
+            goal_ids: goals.map(g => g.id),
+            start: formatDate(start),
+            end: formatDate(end),
+            cursor
+        };
+        const res = await fetch(`${API_URL}/daily-tracking/batch/`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+        if (!res.ok) break;
+        const data = await res.json();
+        trackings.push(...data.results);
+        cursor = data.next;
+    } while (cursor);
+    return trackings;
+}
+
+async function getDailyTrackingsForDate(date) {
+    try {
+        return await fetchTrackings(new Date(date), new Date(date));
+    } catch (err) {
+        console.error('Batch tracking fetch error', err);
+    }
+    return [];
+}
+
+async function getWeeklyTrackings(weekStart) {
+    const weekEnd = new Date(weekStart);
+    weekEnd.setDate(weekEnd.getDate() + 6);
+    try {
+        return await fetchTrackings(new Date(weekStart), weekEnd);
+    } catch (err) {
+        console.error('Batch weekly fetch error', err);
+    }
+    return [];
+}
+
+async function getAdhocRewards(dateStr) {
+    try {
+        const response = await fetch(`${READ_API_URL}/adhoc-rewards/?child_id=${selectedChild.id}&date=${dateStr}`, {
+            headers: { 'Content-Type': 'application/json' }
+        });
+
+        if (response.ok) {
+            const data = await response.json();
+            return data.results || data || [];
+        }
+    } catch (error) {
+        console.error('Error loading adhoc rewards:', error);
+    }
+    return [];
+}
+
+async function getAdhocPenalties(dateStr) {
+    try {
+        const response = await fetch(`${READ_API_URL}/adhoc-penalties/?child_id=${selectedChild.id}&date=${dateStr}`, {
+            headers: { 'Content-Type': 'application/json' }
+        });
+
+        if (response.ok) {
+            const data = await response.json();
+            return data.results || data || [];
+        }
+    } catch (error) {
+        console.error('Error loading adhoc penalties:', error);
+    }
+    return [];
+}
+
+async function getScreenTimeUsage(dateStr) {
+    try {
+        const response = await fetch(`${READ_API_URL}/screen-time-usage/?child_id=${selectedChild.id}&date=${dateStr}`, {
+            headers: { 'Content-Type': 'application/json' }
+        });
+
+        if (response.ok) {
+            const data = await response.json();
+            return data.results || data || [];
+        }
+    } catch (error) {
+        console.error('Error loading screen time usage:', error);
+    }
+    return [];
+}
+
+// `prefetched` carries data already loaded by the bootstrap request
+async function renderDashboard(prefetched = null) {
+    showChildSelector();
+    if (!selectedChild) {
+        return;
+    }
+
+    let dailySummary, weeklyLedger, adhocRewards, adhocPenalties, usageList;
+    if (prefetched) {
+        ({ dailySummary, weeklyLedger, adhocRewards, adhocPenalties, usageList } = prefetched);
+    } else {
+        // Fetch day and week summaries from backend to centralize calculations
+        const dateStr = formatDate(currentDate);
+        let dailyResp, ledgerResp;
+        [dailyResp, ledgerResp, adhocRewards, adhocPenalties, usageList] = await Promise.all([
+            fetch(`${READ_API_URL}/children/${selectedChild.id}/daily_summary/?date=${dateStr}`),
+            fetch(`${READ_API_URL}/children/${selectedChild.id}/weekly_ledger/?date=${dateStr}`),
+            getAdhocRewards(dateStr),
+            getAdhocPenalties(dateStr),
+            getScreenTimeUsage(dateStr)
+        ]);
+        dailySummary = dailyResp.ok ? await dailyResp.json() : null;
+        weeklyLedger = ledgerResp.ok ? await ledgerResp.json() : null;
+    }
+    dashboardState = {
+        childId: selectedChild.id,
+        date: formatDate(currentDate),
+        dailySummary, weeklyLedger, adhocRewards, adhocPenalties, usageList
+    };
+
+    const trackings = dailySummary?.goals || [];
+    let weekStart = weeklyLedger?.week_start ? parseLocalDate(weeklyLedger.week_start) : getWeekStart(currentDate);
+    let weekEnd = weeklyLedger?.week_end ? parseLocalDate(weeklyLedger.week_end) : new Date(new Date(weekStart).setDate(new Date(weekStart).getDate() + 6));
+
+    // Reset time components to midnight for proper date comparison
+    weekStart = new Date(weekStart.getFullYear(), weekStart.getMonth(), weekStart.getDate());
+    weekEnd = new Date(weekEnd.getFullYear(), weekEnd.getMonth(), weekEnd.getDate());
+    // Set weekEnd to the start of the next day (exclusive) so Sunday is fully included
+    weekEnd.setDate(weekEnd.getDate() + 1);
+
+    // Weekly usage and ad-hoc totals are aggregated server-side by the ledger
+    const totalWeeklyUsed = weeklyLedger?.used_minutes || 0;
+
+    // Only show the ad-hoc bonus entries for the currently selected day
+    const dailyAdhocRewards = adhocRewards
+        .filter(reward => {
+            const rewardDate = parseLocalDate(reward.awarded_date);
+            const currentDateOnly = new Date(currentDate);
+            return rewardDate.toDateString() === currentDateOnly.toDateString();
+        });
+
+    // Only show the ad-hoc penalty entries for the currently selected day
+    const dailyAdhocPenalties = adhocPenalties
+        .filter(penalty => {
+            const penaltyDate = parseLocalDate(penalty.applied_date);
+            const currentDateOnly = new Date(currentDate);
+            return penaltyDate.toDateString() === currentDateOnly.toDateString();
+        });
+
+    // Calculate today's potential reward (still client-side since it's goal metadata)
+    const dayReward = goals
+        .filter(g => goalAppliesOn(g, currentDate))
+        .reduce((sum, g) => sum + g.reward_minutes, 0);
+
+    // Only count earned minutes from goals that still apply to this child
+    const totalEarned = dailySummary?.total_earned_minutes ?? trackings
+        .filter(t => {
+            if (t.status !== 'earned') return false;
+            // Find the goal for this tracking
+            const goal = goals.find(g => g.id === t.goal);
+            // Only count if goal exists and child is in the goal's children list
+            return goal && goal.children && goal.children.some(c => c.id === selectedChild.id);
+        })
+        .reduce((sum, t) => sum + (t.minutes_earned || 0), 0);
+
+    // Add rewards awarded today to the daily total
+    const todayRewards = adhocRewards
+        .filter(reward => {
+            const rewardDate = parseLocalDate(reward.awarded_date);
+            const currentDateOnly = new Date(currentDate);
+            return rewardDate.toDateString() === currentDateOnly.toDateString();
+        })
+        .reduce((sum, r) => sum + r.minutes, 0);
+
+    // Subtract penalties applied today from the daily total
+    const todayPenalties = adhocPenalties
+        .filter(penalty => {
+            const penaltyDate = parseLocalDate(penalty.applied_date);
+            const currentDateOnly = new Date(currentDate);
+            return penaltyDate.toDateString() === currentDateOnly.toDateString();
+        })
+        .reduce((sum, p) => sum + p.minutes, 0);
+
+    const totalDailyEarned = totalEarned + todayRewards - todayPenalties;
+
+    // Use backend weekly totals when available
+    const weeklyTotal = weeklyLedger?.total_available_minutes ?? (selectedChild.baseline_weekly_minutes || 0);
+
+    const dayNames = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'];
+    const dayName = dayNames[currentDate.getDay()];
+    const dateDisplay = currentDate.toLocaleDateString('en-US', {month: 'short', day: 'numeric', year: 'numeric'});
+    const weekDisplay = `${weekStart.toLocaleDateString('en-US', {month: 'short', day: 'numeric'})} - ${weekEnd.toLocaleDateString('en-US', {month: 'short', day: 'numeric'})}`;
+
+    // determine which goals apply to the current day; goals without any days are always shown
+    const visibleGoals = goals.filter(g => !g.applies_to_days_mask || goalAppliesOn(g, currentDate));
+
+    let html = `
+        <div class="daily-summary">
+            <h2>${selectedChild.name}'s Screen Time</h2>
+            <div class="summary-stat">
+                Earned 
+                <strong>${formatMinutesHuman(weeklyTotal)}</strong>
+            </div>
+            <div class="summary-stat">
+                Used
+                <strong>${formatMinutesHuman(totalWeeklyUsed)}</strong>
+            </div>
+            <div class="summary-stat">
+                Remaining
+                <strong>${formatMinutesHuman(Math.max(0, weeklyTotal - totalWeeklyUsed))}</strong>
+            </div>
+        </div>
+
+        <div class="card">
+            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px;">
+                <button class="btn-primary" style="flex: 0 1 auto; padding: 8px 12px; font-size: 0.9rem;" onclick="previousDay()">← Previous</button>
+                <h2 style="margin: 0; flex: 1; text-align: center; font-size: 1.1rem;">${dayName} (${dateDisplay})</h2>
+                <button class="btn-primary" style="flex: 0 1 auto; padding: 8px 12px; font-size: 0.9rem;" onclick="nextDay()">Next →</button>
+            </div>
+            <h2 style="margin-bottom: 15px;">Goals</h2>
+            <div class="goals-list">
+    `;
+
+    if (visibleGoals.length === 0) {
+        html += `
+            <div class="empty-state">
+                <p>No goals set yet. Add one to get started!</p>
+            </div>
+        `;
+    } else {
+        visibleGoals.forEach((goal, index) => {
+            const tracking = trackings.find(t => t.goal === goal.id);
+            const status = tracking?.status || 'not_earned';
+            const earned = tracking?.minutes_earned || 0;
+            const bonusEarned = tracking?.bonus_earned || false;
+            const actualMinutes = tracking?.actual_minutes || 0;
+
+            // Parse days
+            const daysArray = goal.applies_to_days ? goal.applies_to_days.split(',').map(d => d.trim()) : [];
+            const dayNames = {mon: 'Mon', tue: 'Tue', wed: 'Wed', thu: 'Thu', fri: 'Fri', sat: 'Sat', sun: 'Sun'};
+
+            // Format days display
+            let daysDisplay;
+            if (daysArray.length === 7) {
+                daysDisplay = 'All';
+            } else if (daysArray.length === 5 && ['mon', 'tue', 'wed', 'thu', 'fri'].every(d => daysArray.includes(d))) {
+                daysDisplay = 'Weekdays';
+            } else {
+                daysDisplay = daysArray.map(d => dayNames[d]).join(', ');
+            }
+
+            html += `
+                <div class="goal-card">
+                    <div class="goal-header">
+                        <div class="goal-title">${goal.name}</div>
+                        <div style="display: flex; gap: 8px;">
+                            <button class="reorder-btn" style="background: #0066cc; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="showEditGoalForm(${goal.id})" title="Edit goal">✎</button>
+                            <button class="reorder-btn" style="background: #666; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="moveGoal(${goal.id}, 'up')" ${index === 0 ? 'disabled' : ''}>▲</button>
+                            <button class="reorder-btn" style="background: #666; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="moveGoal(${goal.id}, 'down')" ${index === visibleGoals.length - 1 ? 'disabled' : ''}>▼</button>
+                        </div>
+                    </div>
+                    <div style="font-size: 0.9rem; color: #666; margin: 8px 0;">
+                        ${goal.goal_type === 'tracked' ? `Earns: ${goal.reward_per_hour} mins/hr` : `Earns: ${formatMinutesHuman(goal.reward_minutes)}${goal.bonus_minutes > 0 ? ` (+${formatMinutesHuman(goal.bonus_minutes)})` : ''}`} | Days: ${daysDisplay}
+                    </div>
+                    ${goal.goal_type === 'tracked' ? `
+                        <div style="margin: 12px 0;">
+                            <label style="display: block; margin-bottom: 5px; font-size: 0.9rem; color: #666;">Time Spent (hours):</label>
+                            <div style="display: flex; gap: 8px; align-items: center;">
+                                <button class="btn-primary" style="padding: 8px 12px; font-size: 1rem;" onclick="changeTrackedHours(${goal.id}, -1)">−</button>
+                                <input type="number" id="actualMinutes_${goal.id}" value="${Math.floor(actualMinutes / 60)}" min="0" placeholder="0" style="flex: 1; padding: 8px; border: 1px solid #ddd; border-radius: 4px; text-align: center;" readonly>
+                                <button class="btn-primary" style="padding: 8px 12px; font-size: 1rem;" onclick="changeTrackedHours(${goal.id}, 1)">+</button>
+                            </div>
+                            ${actualMinutes > 0 ? `<div style="font-size: 0.85rem; color: #666; margin-top: 5px;">Time Spent: ${Math.floor(actualMinutes / 60)} hrs | Earned: ${Math.floor(actualMinutes / 60) * goal.reward_per_hour} mins</div>` : ''}
+                        </div>
+                    ` : `
+                        <div class="goal-controls">
+                            <button class="goal-btn ${status === 'earned' ? 'earned-btn' : 'not-earned-btn'}" onclick="updateTracking(${goal.id}, '${status === 'earned' ? 'not_earned' : 'earned'}', false)">
+                                ${status === 'earned' ? '✓ Earned' : '⭕ Mark Earned'}
+                            </button>
+                            ${goal.bonus_minutes > 0 && status === 'earned' ? `
+                                <button class="goal-btn ${bonusEarned ? 'earned-btn' : 'not-earned-btn'}" style="font-size: 0.9rem;" onclick="updateTracking(${goal.id}, 'earned', ${!bonusEarned})">
+                                    ${bonusEarned ? '⭐ Without Being Asked!' : '⭐ Without Being Asked'}
+                                </button>
+                            ` : ''}
+                        </div>
+                    `}
+                </div>
+            `;
+        });
+    }
+
+    html += `
+            </div>
+    `;
+
+    // Display ad-hoc rewards if any exist
+    if (dailyAdhocRewards.length > 0) {
+        html += `
+            <h2 style="margin-bottom: 15px; margin-top: 20px;">Rewards</h2>
+            <div class="goals-list">
+        `;
+        dailyAdhocRewards.forEach(reward => {
+            html += `
+                <div class="goal-card">
+                    <div class="goal-header">
+                        <div class="goal-title">${reward.reason}</div>
+                        <div style="display: flex; gap: 8px;">
+                            <button class="reorder-btn" style="background: #0066cc; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="showEditRewardForm(${reward.id}, ${reward.minutes}, '${reward.reason.replace(/'/g, "\\'")}')">✎</button>
+                            <button class="reorder-btn" style="background: #dc3545; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="deleteAdhocReward(${reward.id})">✕</button>
+                        </div>
+                    </div>
+                    <div style="font-size: 0.9rem; color: #666; margin: 8px 0;">
+                        <strong>${formatMinutesHuman(reward.minutes)}</strong>
+                    </div>
+                </div>
+            `;
+        });
+        html += `
+            </div>
+        `;
+    }
+
+    // Display ad-hoc penalties if any exist
+    if (dailyAdhocPenalties.length > 0) {
+        html += `
+            <h2 style="margin-bottom: 15px; margin-top: 20px;">Penalties</h2>
+            <div class="goals-list">
+        `;
+        dailyAdhocPenalties.forEach(penalty => {
+            html += `
+                <div class="goal-card">
+                    <div class="goal-header">
+                        <div class="goal-title">${penalty.reason}</div>
+                        <div style="display: flex; gap: 8px;">
+                            <button class="reorder-btn" style="background: #0066cc; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="showEditPenaltyForm(${penalty.id}, ${penalty.minutes}, '${penalty.reason.replace(/'/g, "\\'")}')">✎</button>
+                            <button class="reorder-btn" style="background: #dc3545; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="deleteAdhocPenalty(${penalty.id})">✕</button>
+                        </div>
+                    </div>
+                    <div style="font-size: 0.9rem; color: #666; margin: 8px 0;">
+                        <strong>-${formatMinutesHuman(penalty.minutes)}</strong>
+                    </div>
+                </div>
+            `;
+        });
+        html += `
+            </div>
+        `;
+    }
+
+    // Display screen time usage for this day
+    if (usageList.length > 0) {
+        html += `
+            <h2 style="margin-bottom: 15px; margin-top: 20px;">Usage</h2>
+            <div class="goals-list">
+    `;
+        usageList.forEach(usage => {
+            const safeNotes = (usage.notes || "Screen Time Usage").replace(/'/g, "\\'");
+            html += `
+                <div class="goal-card">
+                    <div class="goal-header">
+                        <div class="goal-title">${usage.notes || "Screen Time Usage"}</div>
+                        <div style="display: flex; gap: 8px;">
+                            <button class="reorder-btn" style="background: #0066cc; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="showEditUsageForm(${usage.id}, ${usage.minutes_used}, '${safeNotes}')">✎</button>
+                            <button class="reorder-btn" style="background: #dc3545; color: white; border: none; border-radius: 4px; padding: 4px 8px; cursor: pointer; font-size: 1rem; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center;" onclick="deleteScreenTimeUsage(${usage.id})">✕</button>
+                        </div>
+                    </div>
+                    <div style="font-size: 0.9rem; color: #666; margin: 8px 0;">
+                        <strong>${formatMinutesHuman(usage.minutes_used)}</strong>
+                    </div>
+                </div>
+            `;
+        });
+        html += `
+            </div>
+        `;
+    }
+
+    html += `
+            </div>
+            <div style="display: grid; grid-template-columns: 1fr 1fr 1fr; gap: 10px;">
+                <button class="btn-primary" style="margin-top: 15px;" onclick="showAddGoalForm()">🎯 Add Goal</button>
+                <button class="btn-primary" style="margin-top: 15px;" onclick="showAdhocRewardForm()">⭐ Reward</button>
+                <button class="btn-primary" style="margin-top: 15px;" onclick="showAdhocPenaltyForm()">⚠️ Penalty</button>
+            </div>
+            <div style="display: grid; grid-template-columns: 1fr; gap: 10px; margin-top: 10px;">
+                <button class="btn-primary" style="margin-top: 5px;" onclick="showScreenTimeUsageForm()">📱 Log Usage</button>
+            </div>
+        </div>
+    `;
+
+    document.getElementById('mainContent').innerHTML = html;
+}
+
+function previousDay() {
+    currentDate = new Date(currentDate);
+    currentDate.setDate(currentDate.getDate() - 1);
+    renderDashboard();
+}
+
+function nextDay() {
+    currentDate = new Date(currentDate);
+    currentDate.setDate(currentDate.getDate() + 1);
+    renderDashboard();
+}
+
+async function getDailyTrackings() {
+    return getDailyTrackingsForDate(new Date());
+}
+
+function changeTrackedHours(goalId, delta) {
+    const input = document.getElementById(`actualMinutes_${goalId}`);
+    let currentValue = parseInt(input.value) || 0;
+    currentValue = Math.max(0, currentValue + delta);
+    input.value = currentValue;
+    // Autosave when hours change
+    updateTrackedGoal(goalId);
+}
+
+// Record a tracking change for the selected child, goal and day. The dashboard updates
+// at once; the change is queued and the server computes minutes_earned when it is replayed.
+async function upsertTracking(goalId, fields) {
+    const date = formatDate(currentDate);
+    const seen = currentDashboardState()?.dailySummary?.goals.find(t => t.goal === goalId);
+    patchTracking(goalId, fields);
+    renderOptimistic();
+    await queueMutation('tracking', 'upsert', {
+        child: selectedChild.id,
+        goal: goalId,
+        date: date,
+        ...fields
+    }, null, `tracking:${selectedChild.id}:${goalId}:${date}`, seen?.updated_at).queued;
+}
+
+async function updateTrackedGoal(goalId) {
+    const inputHours = parseFloat(document.getElementById(`actualMinutes_${goalId}`).value) || 0;
+    const actualMinutes = inputHours * 60; // Convert hours to minutes
+    const goal = goals.find(g => g.id === goalId);
+    if (!goal) return;
+
+    try {
+        // Status is derived from the time spent: earned if any time was spent
+        await upsertTracking(goalId, {
+            actual_minutes: actualMinutes,
+            bonus_earned: false
+        });
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error updating tracked goal');
+    }
+}
+
+async function updateTracking(goalId, status, bonusEarned = false) {
+    try {
+        await upsertTracking(goalId, {
+            status: status,
+            bonus_earned: bonusEarned
+        });
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error updating tracking');
+    }
+}
+
+async function moveGoal(goalId, direction) {
+    try {
+        // Find the goal's current position
+        const currentIndex = goals.findIndex(g => g.id === goalId);
+        if (currentIndex === -1) return;
+
+        // Calculate new index
+        let newIndex = direction === 'up' ? currentIndex - 1 : currentIndex + 1;
+        if (newIndex < 0 || newIndex >= goals.length) return;
+
+        // Create new order array
+        const newOrder = goals.map(g => g.id);
+        [newOrder[currentIndex], newOrder[newIndex]] = [newOrder[newIndex], newOrder[currentIndex]];
+
+        // Send reorder request
+        const response = await fetch(`${API_URL}/goals/reorder/`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCsrfToken()
+            },
+            body: JSON.stringify({ goals: newOrder })
+        });
+
+        if (response.ok) {
+            // Update local goals array with new order
+            await loadGoals();
+            await renderDashboard();
+        } else {
+            alert('Error reordering goals');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error reordering goals');
+    }
+}
+
+function showAddGoalForm() {
+    hideChildSelector();
+
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Add New Goal</h2>
+            <form onsubmit="createGoal(event)" novalidate>
+                <div class="form-group">
+                    <label>Goal Name</label>
+                    <input type="text" id="goalName" placeholder="e.g., Math Practice, Read a book">
+                </div>
+                <div class="form-group">
+                    <label>Applies to Children</label>
+                    <div style="display: flex; flex-direction: column; gap: 8px; margin-top: 8px;">
+                        ${children.map(child => `
+                            <label style="display: flex; align-items: center;">
+                                <input type="checkbox" value="${child.id}" class="child-checkbox" checked style="margin-right: 6px;">
+                                ${child.name}
+                            </label>
+                        `).join('')}
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Goal Type</label>
+                    <select id="goalType" onchange="toggleTargetMinutes()" style="width: 100%; padding: 8px; border: 1px solid #ddd; border-radius: 4px;">
+                        <option value="binary">Binary (Earned/Not Earned)</option>
+                        <option value="tracked">Tracked (Hours)</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label style="display: flex; align-items: center; gap: 8px;">
+                        <input type="checkbox" id="rolloverSundayCheckbox" style="width: 16px; height: 16px;">
+                        Apply Sunday's earned minutes to next week
+                    </label>
+                    <small style="color: #666;">If checked, Sunday completions roll into the following week's totals.</small>
+                </div>
+                <div class="form-group" id="rewardMinutesGroup">
+                    <label>Reward Minutes</label>
+                    <input type="number" id="rewardMinutes" placeholder="30" min="1">
+                </div>
+                <div class="form-group" id="rewardPerHourGroup" style="display: none;">
+                    <label>Reward Minutes per Hour</label>
+                    <input type="number" id="rewardPerHour" placeholder="30" min="1">
+                </div>
+                <div class="form-group" id="bonusMinutesGroup">
+                    <label>Bonus Minutes (without being asked) - Optional</label>
+                    <input type="number" id="bonusMinutes" placeholder="10" min="0" value="0">
+                </div>
+                <div class="form-group">
+                    <label>Applies to Days</label>
+                    <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 8px; margin-top: 8px;">
+                        ${['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun'].map(day => {
+                            const dayNames = {mon: 'Monday', tue: 'Tuesday', wed: 'Wednesday', thu: 'Thursday', fri: 'Friday', sat: 'Saturday', sun: 'Sunday'};
+                            return `<label style="display: flex; align-items: center;">
+                                <input type="checkbox" value="${day}" class="day-checkbox" ${['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun'].indexOf(day) < 5 ? 'checked' : ''} style="margin-right: 6px;">
+                                ${dayNames[day]}
+                            </label>`;
+                        }).join('')}
+                    </div>
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Create Goal</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="renderDashboard()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+}
+
+async function createGoal(e) {
+    e.preventDefault();
+    const selectedDays = Array.from(document.querySelectorAll('.day-checkbox:checked')).map(cb => cb.value).join(',');
+    const selectedChildren = Array.from(document.querySelectorAll('.child-checkbox:checked')).map(cb => parseInt(cb.value));
+    const goalType = document.getElementById('goalType').value;
+
+    if (!selectedChildren.length) {
+        alert('Please select at least one child');
+        return;
+    }
+
+    if (!selectedDays) {
+        alert('Please select at least one day');
+        return;
+    }
+
+    let rewardMinutes = 0;
+    let rewardPerHour = 0;
+    let bonusMinutes = 0;
+
+    if (goalType === 'binary') {
+        rewardMinutes = parseInt(document.getElementById('rewardMinutes').value) || 0;
+        bonusMinutes = parseInt(document.getElementById('bonusMinutes').value) || 0;
+        if (rewardMinutes <= 0) {
+            alert('Please enter a reward amount for this goal');
+            return;
+        }
+    } else {
+        rewardPerHour = parseInt(document.getElementById('rewardPerHour').value) || 0;
+        if (rewardPerHour <= 0) {
+            alert('Please enter a reward per hour amount for this goal');
+            return;
+        }
+    }
+
+    const payload = {
+        child_ids: selectedChildren,
+        name: document.getElementById('goalName').value,
+        goal_type: goalType,
+        reward_minutes: rewardMinutes,
+        reward_per_hour: rewardPerHour,
+        bonus_minutes: bonusMinutes,
+        target_minutes: 0,
+        applies_to_days: selectedDays,
+        rollover_sunday_to_next_week: document.getElementById('rolloverSundayCheckbox').checked,
+        is_active: true
+    };
+
+    try {
+        const response = await fetch(`${API_URL}/goals/`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCsrfToken()
+            },
+            body: JSON.stringify(payload)
+        });
+
+        if (response.ok) {
+            await loadGoals();
+            renderDashboard();
+        } else {
+            const contentType = response.headers.get('content-type');
+            if (contentType && contentType.includes('application/json')) {
+                const errorData = await response.json();
+                console.error('Error response:', errorData);
+                alert('Error creating goal: ' + JSON.stringify(errorData));
+            } else {
+                const text = await response.text();
+                console.error('Error response (text):', text);
+                alert('Error creating goal: ' + response.status + ' ' + response.statusText);
+            }
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error creating goal: ' + error.message);
+    }
+}
+
+function showEditGoalForm(goalId) {
+    hideChildSelector();
+    const goal = goals.find(g => g.id === goalId);
+    if (!goal) return;
+
+    const daysArray = goal.applies_to_days ? goal.applies_to_days.split(',').map(d => d.trim()) : [];
+    const goalChildIds = goal.children ? goal.children.map(c => c.id) : [];
+
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Edit Goal</h2>
+            <form onsubmit="updateGoal(event, ${goalId})" novalidate>
+                <div class="form-group">
+                    <label>Goal Name</label>
+                    <input type="text" id="goalName" placeholder="e.g., Math Practice, Read a book" value="${goal.name}">
+                </div>
+                <div class="form-group">
+                    <label>Applies to Children</label>
+                    <div style="display: flex; flex-direction: column; gap: 8px; margin-top: 8px;">
+                        ${children.map(child => `
+                            <label style="display: flex; align-items: center;">
+                                <input type="checkbox" value="${child.id}" class="child-checkbox" ${goalChildIds.includes(child.id) ? 'checked' : ''} style="margin-right: 6px;">
+                                ${child.name}
+                            </label>
+                        `).join('')}
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Goal Type</label>
+                    <select id="goalType" onchange="toggleTargetMinutes()" style="width: 100%; padding: 8px; border: 1px solid #ddd; border-radius: 4px;">
+                        <option value="binary" ${goal.goal_type === 'binary' ? 'selected' : ''}>Binary (Earned/Not Earned)</option>
+                        <option value="tracked" ${goal.goal_type === 'tracked' ? 'selected' : ''}>Tracked (Hours)</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label style="display: flex; align-items: center; gap: 8px;">
+                        <input type="checkbox" id="rolloverSundayCheckbox" style="width: 16px; height: 16px;" ${goal.rollover_sunday_to_next_week ? 'checked' : ''}>
+                        Apply Sunday's earned minutes to next week
+                    </label>
+                    <small style="color: #666;">If checked, Sunday completions roll into the following week's totals.</small>
+                </div>
+                <div class="form-group" id="rewardMinutesGroup" style="display: ${goal.goal_type === 'binary' ? 'block' : 'none'};">
+                    <label>Reward Minutes</label>
+                    <input type="number" id="rewardMinutes" placeholder="30" min="1" value="${goal.reward_minutes || 0}">
+                </div>
+                <div class="form-group" id="rewardPerHourGroup" style="display: ${goal.goal_type === 'tracked' ? 'block' : 'none'};">
+                    <label>Reward Minutes per Hour</label>
+                    <input type="number" id="rewardPerHour" placeholder="30" min="1" value="${goal.reward_per_hour || 0}">
+                </div>
+                <div class="form-group" id="bonusMinutesGroup" style="display: ${goal.goal_type === 'binary' ? 'block' : 'none'};">
+                    <label>Bonus Minutes (without being asked) - Optional</label>
+                    <input type="number" id="bonusMinutes" placeholder="10" min="0" value="${goal.bonus_minutes || 0}">
+                </div>
+                <div class="form-group">
+                    <label>Applies to Days</label>
+                    <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 8px; margin-top: 8px;">
+                        ${['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun'].map(day => {
+                            const dayNames = {mon: 'Monday', tue: 'Tuesday', wed: 'Wednesday', thu: 'Thursday', fri: 'Friday', sat: 'Saturday', sun: 'Sunday'};
+                            return `<label style="display: flex; align-items: center;">
+                                <input type="checkbox" value="${day}" class="day-checkbox" ${daysArray.includes(day) ? 'checked' : ''} style="margin-right: 6px;">
+                                ${dayNames[day]}
+                            </label>`;
+                        }).join('')}
+                    </div>
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Update Goal</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="renderDashboard()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+}
+
+async function updateGoal(e, goalId) {
+    e.preventDefault();
+    const selectedDays = Array.from(document.querySelectorAll('.day-checkbox:checked')).map(cb => cb.value).join(',');
+    const selectedChildren = Array.from(document.querySelectorAll('.child-checkbox:checked')).map(cb => parseInt(cb.value));
+    const goalType = document.getElementById('goalType').value;
+    const goalName = document.getElementById('goalName').value;
+
+    if (!goalName) {
+        alert('Please enter a goal name');
+        return;
+    }
+
+    if (!selectedChildren.length) {
+        alert('Please select at least one child');
+        return;
+    }
+
+    if (!selectedDays) {
+        alert('Please select at least one day');
+        return;
+    }
+
+    let rewardMinutes = 0;
+    let rewardPerHour = 0;
+    let bonusMinutes = 0;
+
+    if (goalType === 'binary') {
+        rewardMinutes = parseInt(document.getElementById('rewardMinutes').value) || 0;
+        bonusMinutes = parseInt(document.getElementById('bonusMinutes').value) || 0;
+        if (rewardMinutes <= 0) {
+            alert('Please enter a reward amount for this goal');
+            return;
+        }
+    } else {
+        rewardPerHour = parseInt(document.getElementById('rewardPerHour').value) || 0;
+        if (rewardPerHour <= 0) {
+            alert('Please enter a reward per hour amount for this goal');
+            return;
+        }
+    }
+
+    const payload = {
+        child_ids: selectedChildren,
+        name: goalName,
+        goal_type: goalType,
+        reward_minutes: rewardMinutes,
+        reward_per_hour: rewardPerHour,
+        bonus_minutes: bonusMinutes,
+        target_minutes: 0,
+        applies_to_days: selectedDays,
+        rollover_sunday_to_next_week: document.getElementById('rolloverSundayCheckbox').checked,
+        is_active: true
+    };
+
+    try {
+        const response = await fetch(`${API_URL}/goals/${goalId}/`, {
+            method: 'PATCH',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCsrfToken()
+            },
+            body: JSON.stringify(payload)
+        });
+
+        if (response.ok) {
+            await loadGoals();
+            renderDashboard();
+        } else {
+            const contentType = response.headers.get('content-type');
+            if (contentType && contentType.includes('application/json')) {
+                const errorData = await response.json();
+                console.error('Error response:', errorData);
+                alert('Error updating goal: ' + JSON.stringify(errorData));
+            } else {
+                const text = await response.text();
+                console.error('Error response (text):', text);
+                alert('Error updating goal: ' + response.status + ' ' + response.statusText);
+            }
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error updating goal: ' + error.message);
+    }
+}
+
+function toggleTargetMinutes() {
+    const goalType = document.getElementById('goalType').value;
+    const rewardMinutesGroup = document.getElementById('rewardMinutesGroup');
+    const rewardPerHourGroup = document.getElementById('rewardPerHourGroup');
+    const bonusMinutesGroup = document.getElementById('bonusMinutesGroup');
+
+    if (goalType === 'tracked') {
+        rewardMinutesGroup.style.display = 'none';
+        rewardPerHourGroup.style.display = 'block';
+        bonusMinutesGroup.style.display = 'none';
+    } else {
+        rewardMinutesGroup.style.display = 'block';
+        rewardPerHourGroup.style.display = 'none';
+        bonusMinutesGroup.style.display = 'block';
+    }
+}
+
+function showAdhocRewardForm() {
+    document.getElementById('childSelectorCard').style.display = 'none';
+
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Give Reward</h2>
+            <form onsubmit="createAdhocReward(event)">
+                <div class="form-group">
+                    <label>Select Child</label>
+                    <div style="display: flex; flex-direction: column; gap: 8px; margin-top: 8px;">
+                        ${children.map(child => `
+                            <label style="display: flex; align-items: center;">
+                                <input type="radio" name="bonusChild" value="${child.id}" class="bonus-child" ${children[0]?.id === child.id ? 'checked' : ''} style="margin-right: 6px;">
+                                ${child.name}
+                            </label>
+                        `).join('')}
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Reward Minutes</label>
+                    <input type="number" id="rewardMinutes" required placeholder="30" min="1">
+                    <div style="display: flex; gap: 8px; margin-top: 8px; flex-wrap: wrap;">
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('rewardMinutes').value=5">5</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('rewardMinutes').value=10">10</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('rewardMinutes').value=15">15</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('rewardMinutes').value=30">30</button>
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Reason</label>
+                    <input type="text" id="rewardReason" required placeholder="e.g., Great effort on homework">
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Give Reward</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="renderDashboard()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+    selectedChild = children[0];
+}
+
+
+
+async function createAdhocReward(e) {
+    e.preventDefault();
+
+    const selectedChildId = document.querySelector('input[name="bonusChild"]:checked')?.value;
+    if (!selectedChildId) {
+        alert('Please select a child');
+        return;
+    }
+
+    const payload = {
+        child: parseInt(selectedChildId),
+        minutes: parseInt(document.getElementById('rewardMinutes').value),
+        reason: document.getElementById('rewardReason').value,
+        awarded_date: formatDate(currentDate)
+    };
+
+    try {
+        await saveEntry('reward', 'create', null, payload);
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error creating reward: ' + error.message);
+    }
+}
+
+function showEditRewardForm(rewardId, minutes, reason) {
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Edit Reward</h2>
+            <form onsubmit="updateAdhocReward(event, ${rewardId})">
+                <div class="form-group">
+                    <label>Reward Minutes</label>
+                    <input type="number" id="editRewardMinutes" required value="${minutes}" min="1">
+                    <div style="display: flex; gap: 8px; margin-top: 8px; flex-wrap: wrap;">
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editRewardMinutes').value=5">5</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editRewardMinutes').value=10">10</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editRewardMinutes').value=15">15</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editRewardMinutes').value=30">30</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editRewardMinutes').value=60">60</button>
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Reason</label>
+                    <input type="text" id="editRewardReason" required value="${reason}">
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Update Reward</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="renderDashboard()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+}
+
+async function updateAdhocReward(e, rewardId) {
+    e.preventDefault();
+    const payload = {
+        minutes: parseInt(document.getElementById('editRewardMinutes').value),
+        reason: document.getElementById('editRewardReason').value
+    };
+
+    try {
+        await saveEntry('reward', 'update', rewardId, payload);
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error updating reward: ' + error.message);
+    }
+}
+
+async function deleteAdhocReward(rewardId) {
+    if (!confirm('Are you sure you want to delete this bonus?')) {
+        return;
+    }
+
+    try {
+        await saveEntry('reward', 'delete', rewardId);
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error deleting reward: ' + error.message);
+    }
+}
+
+function showAdhocPenaltyForm() {
+    document.getElementById('childSelectorCard').style.display = 'none';
+
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Give Penalty</h2>
+            <form onsubmit="createAdhocPenalty(event)">
+                <div class="form-group">
+                    <label>Select Child</label>
+                    <div style="display: flex; flex-direction: column; gap: 8px; margin-top: 8px;">
+                        ${children.map(child => `
+                            <label style="display: flex; align-items: center;">
+                                <input type="radio" name="penaltyChild" value="${child.id}" class="penalty-child" ${children[0]?.id === child.id ? 'checked' : ''} style="margin-right: 6px;">
+                                ${child.name}
+                            </label>
+                        `).join('')}
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Penalty Minutes</label>
+                    <input type="number" id="penaltyMinutes" required placeholder="15" min="1">
+                    <div style="display: flex; gap: 8px; margin-top: 8px; flex-wrap: wrap;">
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('penaltyMinutes').value=5">5</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('penaltyMinutes').value=10">10</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('penaltyMinutes').value=15">15</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('penaltyMinutes').value=30">30</button>
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Reason</label>
+                    <input type="text" id="penaltyReason" required placeholder="e.g., Did not follow instructions">
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Apply Penalty</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="renderDashboard()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+    selectedChild = children[0];
+}
+
+async function createAdhocPenalty(e) {
+    e.preventDefault();
+
+    const selectedChildId = document.querySelector('input[name="penaltyChild"]:checked')?.value;
+    if (!selectedChildId) {
+        alert('Please select a child');
+        return;
+    }
+
+    const payload = {
+        child: parseInt(selectedChildId),
+        minutes: parseInt(document.getElementById('penaltyMinutes').value),
+        reason: document.getElementById('penaltyReason').value,
+        applied_date: formatDate(currentDate)
+    };
+
+    try {
+        await saveEntry('penalty', 'create', null, payload);
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error creating penalty: ' + error.message);
+    }
+}
+
+function showEditPenaltyForm(penaltyId, minutes, reason) {
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Edit Penalty</h2>
+            <form onsubmit="updateAdhocPenalty(event, ${penaltyId})">
+                <div class="form-group">
+                    <label>Penalty Minutes</label>
+                    <input type="number" id="editPenaltyMinutes" required value="${minutes}" min="1">
+                    <div style="display: flex; gap: 8px; margin-top: 8px; flex-wrap: wrap;">
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editPenaltyMinutes').value=5">5</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editPenaltyMinutes').value=10">10</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editPenaltyMinutes').value=15">15</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editPenaltyMinutes').value=30">30</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editPenaltyMinutes').value=60">60</button>
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Reason</label>
+                    <input type="text" id="editPenaltyReason" required value="${reason}">
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Update Penalty</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="renderDashboard()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+}
+
+async function updateAdhocPenalty(e, penaltyId) {
+    e.preventDefault();
+    const payload = {
+        minutes: parseInt(document.getElementById('editPenaltyMinutes').value),
+        reason: document.getElementById('editPenaltyReason').value
+    };
+
+    try {
+        await saveEntry('penalty', 'update', penaltyId, payload);
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error updating penalty: ' + error.message);
+    }
+}
+
+async function deleteAdhocPenalty(penaltyId) {
+    if (!confirm('Are you sure you want to delete this penalty?')) {
+        return;
+    }
+
+    try {
+        await saveEntry('penalty', 'delete', penaltyId);
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error deleting penalty: ' + error.message);
+    }
+}
+
+function showEditUsageForm(usageId, minutes, notes) {
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Edit Usage</h2>
+            <form onsubmit="updateScreenTimeUsageEdit(event, ${usageId})">
+                <div class="form-group">
+                    <label>Minutes Used</label>
+                    <input type="number" id="editMinutesUsedInput" required value="${minutes}" min="0">
+                    <div style="display: flex; gap: 8px; margin-top: 8px; flex-wrap: wrap;">
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editMinutesUsedInput').value=5">5</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editMinutesUsedInput').value=10">10</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editMinutesUsedInput').value=15">15</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editMinutesUsedInput').value=30">30</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('editMinutesUsedInput').value=60">60</button>
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Notes (Optional)</label>
+                    <input type="text" id="editUsageNotesInput" value="${notes}">
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Update Usage</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="renderDashboard()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+}
+
+async function updateScreenTimeUsageEdit(e, usageId) {
+    e.preventDefault();
+    const payload = {
+        minutes_used: parseInt(document.getElementById('editMinutesUsedInput').value),
+        notes: document.getElementById('editUsageNotesInput').value
+    };
+
+    try {
+        await saveEntry('usage', 'update', usageId, payload);
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error updating usage: ' + error.message);
+    }
+}
+
+async function deleteScreenTimeUsage(usageId) {
+    if (!confirm('Are you sure you want to delete this usage entry?')) {
+        return;
+    }
+
+    try {
+        await saveEntry('usage', 'delete', usageId);
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error deleting usage: ' + error.message);
+    }
+}
+
+async function updateScreenTimeUsage(minutesUsed) {
+    const dateStr = formatDate(currentDate);
+
+    try {
+        // Try to find existing usage record
+        const existingResponse = await fetch(`${API_URL}/screen-time-usage/?child_id=${selectedChild.id}&date=${dateStr}`, {
+            headers: { 'Content-Type': 'application/json' }
+        });
+
+        const existingData = existingResponse.ok ? await existingResponse.json() : null;
+        const usageId = existingData?.results?.[0]?.id;
+
+        const method = usageId ? 'PATCH' : 'POST';
+        const url = usageId 
+            ? `${API_URL}/screen-time-usage/${usageId}/`
+            : `${API_URL}/screen-time-usage/`;
+
+        const payload = {
+            child: selectedChild.id,
+            date: dateStr,
+            minutes_used: minutesUsed
+        };
+
+        const response = await fetch(url, {
+            method: method,
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCsrfToken()
+            },
+            body: JSON.stringify(payload)
+        });
+
+        if (response.ok) {
+            renderDashboard();
+        } else {
+            alert('Error updating screen time usage');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error updating screen time usage: ' + error.message);
+    }
+}
+
+function showScreenTimeUsageForm() {
+    document.getElementById('childSelectorCard').style.display = 'none';
+
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Log Screen Time Usage</h2>
+            <form onsubmit="logScreenTimeUsage(event)">
+                <div class="form-group">
+                    <label>Minutes Used</label>
+                    <input type="number" id="minutesUsedInput" required placeholder="30" min="0" value="0">
+                    <div style="display: flex; gap: 8px; margin-top: 8px; flex-wrap: wrap;">
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('minutesUsedInput').value=30">30</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('minutesUsedInput').value=60">60</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('minutesUsedInput').value=90">90</button>
+                        <button type="button" class="btn-primary" style="padding: 12px 20px; font-size: 1.1rem;" onclick="document.getElementById('minutesUsedInput').value=120">120</button>
+                    </div>
+                </div>
+                <div class="form-group">
+                    <label>Notes (Optional)</label>
+                    <input type="text" id="usageNotesInput" placeholder="e.g., YouTube, Gaming">
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Log Usage</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="renderDashboard()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+}
+
+async function logScreenTimeUsage(e) {
+    e.preventDefault();
+
+    const minutesUsed = parseInt(document.getElementById('minutesUsedInput').value) || 0;
+    const notes = document.getElementById('usageNotesInput').value || '';
+    const dateStr = formatDate(currentDate);
+
+    try {
+        // Always create a new usage entry (do not overwrite existing)
+        await saveEntry('usage', 'create', null, {
+            child: selectedChild.id,
+            date: dateStr,
+            minutes_used: minutesUsed,
+            notes: notes
+        });
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error logging usage: ' + error.message);
+    }
+}
+
+function showAddChildForm() {
+    const form = `
+        <div class="card">
+            <h2 style="margin-bottom: 15px;">Add New Child</h2>
+            <form onsubmit="createChild(event)">
+                <div class="form-group">
+                    <label>Child's Name</label>
+                    <input type="text" id="childName" required placeholder="Enter name">
+                </div>
+                <button type="submit" class="btn-primary" style="width: 100%;">Add Child</button>
+                <button type="button" class="btn-primary" style="width: 100%; background: #999; margin-top: 10px;" onclick="init()">Cancel</button>
+            </form>
+        </div>
+    `;
+    document.getElementById('mainContent').innerHTML = form;
+}
+
+async function createChild(e) {
+    e.preventDefault();
+    const payload = {
+        name: document.getElementById('childName').value
+    };
+
+    try {
+        const response = await fetch(`${API_URL}/children/`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCsrfToken()
+            },
+            body: JSON.stringify(payload)
+        });
+
+        if (response.ok) {
+            await loadChildren();
+            const newChild = await response.json();
+            selectChild(newChild.id);
+        } else {
+            alert('Error creating child');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error creating child');
+    }
+}
+
+// Start the app
+init();
@@ -0,0 +1,98 @@
+// Queue of mutations made while offline (or before the server answered), kept in
+// IndexedDB so it survives reloads. Shared by the page and the service worker;
+// entries are replayed in order through the batch endpoint at /api/mutations/.
+const MutationQueue = (() => {
+    const DB_NAME = 'screen-time-tracker';
+    const STORE = 'mutations';
+    const SYNC_TAG = 'replay-mutations';
+    // Matches MAX_BATCH_SIZE in tracker/mutations.py
+    const BATCH_SIZE = 100;
+
+    function settle(request) {
+        return new Promise((resolve, reject) => {
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    function open() {
+        const request = indexedDB.open(DB_NAME, 1);
+        request.onupgradeneeded = () => {
+            request.result.createObjectStore(STORE, { keyPath: 'seq', autoIncrement: true });
+        };
+        return settle(request);
+    }
+
+    async function withStore(mode, work) {
+        const db = await open();
+        try {
+            const tx = db.transaction(STORE, mode);
+            const done = new Promise((resolve, reject) => {
+                tx.oncomplete = resolve;
+                tx.onerror = tx.onabort = () => reject(tx.error);
+            });
+            const result = await work(tx.objectStore(STORE));
+            await done;
+            return result;
+        } finally {
+            db.close();
+        }
+    }
+
+    // crypto.randomUUID is only available in secure contexts
+    function uuid() {
+        if (self.crypto.randomUUID) {
+            return self.crypto.randomUUID();
+        }
+        const bytes = self.crypto.getRandomValues(new Uint8Array(16));
+        bytes[6] = (bytes[6] & 0x0f) | 0x40;
+        bytes[8] = (bytes[8] & 0x3f) | 0x80;
+        const hex = Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+        return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+    }
+
+    // The CSRF token is stored with each entry because the service worker cannot read cookies
+    function enqueue(mutation, csrfToken) {
+        return withStore('readwrite', store => settle(store.add({ mutation: mutation, csrf: csrfToken })));
+    }
+
+    function pending() {
+        return withStore('readonly', store => settle(store.getAll()));
+    }
+
+    function remove(seqs) {
+        return withStore('readwrite', store => Promise.all(seqs.map(seq => settle(store.delete(seq)))));
+    }
+
+    // Send everything queued so far, oldest first, and resolve with the per-mutation results.
+    // Entries leave the queue only once the server has answered for them; a network error
+    // rejects and leaves the rest queued for the next attempt.
+    async function flush(url) {
+        const results = [];
+        let entries = await pending();
+        while (entries.length > 0) {
+            const batch = entries.slice(0, BATCH_SIZE);
+            const headers = { 'Content-Type': 'application/json' };
+            const csrf = batch[batch.length - 1].csrf;
+            if (csrf) {
+                headers['X-CSRFToken'] = csrf;
+            }
+            const response = await fetch(url, {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: headers,
+                body: JSON.stringify({ mutations: batch.map(entry => entry.mutation) })
+            });
+            if (!response.ok) {
+                throw new Error(`Replaying mutations failed with status ${response.status}`);
+            }
+            const data = await response.json();
+            results.push(...data.results);
+            await remove(batch.map(entry => entry.seq));
+            entries = entries.slice(BATCH_SIZE);
+        }
+        return results;
+    }
+
+    return { SYNC_TAG, uuid, enqueue, pending, flush };
+})();
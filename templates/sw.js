@@ -0,0 +1,93 @@
+// Service worker: serves the app shell and API reads from cache while
+// revalidating them, and replays queued mutations once back online.
+importScripts('{{ queue_script_url }}');
+
+const SHELL_CACHE = 'shell-{{ cache_version }}';
+const API_CACHE = 'api-{{ cache_version }}';
+const SHELL_URLS = {{ shell_urls|safe }};
+const MUTATIONS_URL = '{{ mutations_url }}';
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(SHELL_URLS))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(
+                names.filter(name => name !== SHELL_CACHE && name !== API_CACHE).map(name => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+// Answer from `cacheName` when possible and refresh the cached copy from the network either way
+function staleWhileRevalidate(event, cacheName, key) {
+    const network = fetch(event.request).then(async response => {
+        if (response.ok) {
+            const cache = await caches.open(cacheName);
+            await cache.put(key, response.clone());
+        }
+        return response;
+    });
+    event.waitUntil(network.catch(() => null));
+    return caches.match(key, { cacheName: cacheName }).then(cached => cached || network);
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+
+    if (request.headers.get('Accept') === 'text/event-stream') {
+        // Live update streams never end; leave them to the network
+        return;
+    }
+    if (url.pathname.startsWith('/api/')) {
+        if (request.method === 'GET') {
+            event.respondWith(staleWhileRevalidate(event, API_CACHE, request));
+        } else {
+            // A successful write makes every cached read suspect
+            event.respondWith(fetch(request).then(response => {
+                if (response.ok) {
+                    event.waitUntil(caches.delete(API_CACHE));
+                }
+                return response;
+            }));
+        }
+        return;
+    }
+
+    if (request.method !== 'GET') {
+        return;
+    }
+    if (request.mode === 'navigate' && url.pathname === '/') {
+        event.respondWith(staleWhileRevalidate(event, SHELL_CACHE, '/'));
+    } else if (SHELL_URLS.includes(url.pathname)) {
+        event.respondWith(staleWhileRevalidate(event, SHELL_CACHE, url.pathname));
+    }
+});
+
+async function replay() {
+    const results = await MutationQueue.flush(MUTATIONS_URL);
+    if (results.length === 0) {
+        return;
+    }
+    await caches.delete(API_CACHE);
+    const clients = await self.clients.matchAll({ type: 'window' });
+    clients.forEach(client => client.postMessage({ type: 'mutations-replayed', results: results }));
+}
+
+// Fired by the browser once connectivity returns, even if the app was closed meanwhile.
+// A rejected promise makes the browser retry later.
+self.addEventListener('sync', event => {
+    if (event.tag === MutationQueue.SYNC_TAG) {
+        event.waitUntil(replay());
+    }
+});
@@ -2,7 +2,7 @@
 Admin interface for the Screen Time Tracker.
 """
 from django.contrib import admin
-from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage
+from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage, WeeklyBalance, DailyRollup, GoalWeekRollup
 
 
 @admin.register(Child)
@@ -30,6 +30,9 @@ class ScreenTimeGoalAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     filter_horizontal = ['children']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('children')
+    
     def get_children(self, obj):
         return ', '.join([c.name for c in obj.children.all()])
     get_children.short_description = 'Children'
@@ -61,6 +64,10 @@ class DailyTrackingAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'date'
     
+    def get_queryset(self, request):
+        # The goal column renders ScreenTimeGoal.__str__, which lists its children
+        return super().get_queryset(request).select_related('child', 'goal').prefetch_related('goal__children')
+    
     fieldsets = (
         ('Goal & Date', {
             'fields': ('child', 'goal', 'date')
@@ -81,6 +88,7 @@ class AdhocRewardAdmin(admin.ModelAdmin):
     list_filter = ['awarded_date', 'child', 'created_at']
     search_fields = ['reason', 'child__name']
     readonly_fields = ['awarded_date', 'created_at', 'updated_at']
+    list_select_related = ['child']
     date_hierarchy = 'awarded_date'
     
     fieldsets = (
@@ -100,6 +108,7 @@ class AdhocPenaltyAdmin(admin.ModelAdmin):
     list_filter = ['applied_date', 'child', 'created_at']
     search_fields = ['reason', 'child__name']
     readonly_fields = ['applied_date', 'created_at', 'updated_at']
+    list_select_related = ['child']
     date_hierarchy = 'applied_date'
     
     fieldsets = (
@@ -119,6 +128,7 @@ class ScreenTimeUsageAdmin(admin.ModelAdmin):
     list_filter = ['date', 'child', 'created_at']
     search_fields = ['child__name', 'notes']
     readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ['child']
     date_hierarchy = 'date'
     
     fieldsets = (
@@ -130,3 +140,30 @@ class ScreenTimeUsageAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(WeeklyBalance)
+class WeeklyBalanceAdmin(admin.ModelAdmin):
+    list_display = ['child', 'week_start', 'earned_minutes', 'adhoc_reward_minutes', 'adhoc_penalty_minutes', 'used_minutes']
+    list_filter = ['week_start', 'child']
+    list_select_related = ['child']
+    readonly_fields = ['child', 'week_start', 'earned_minutes', 'adhoc_reward_minutes', 'adhoc_penalty_minutes', 'used_minutes', 'updated_at']
+    date_hierarchy = 'week_start'
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['child', 'date', 'earned_minutes', 'goals_earned', 'goals_applicable', 'adhoc_plus', 'adhoc_minus', 'used_minutes']
+    list_filter = ['date', 'child']
+    list_select_related = ['child']
+    readonly_fields = ['child', 'date', 'earned_minutes', 'goals_earned', 'goals_applicable', 'adhoc_plus', 'adhoc_minus', 'used_minutes', 'updated_at']
+    date_hierarchy = 'date'
+
+
+@admin.register(GoalWeekRollup)
+class GoalWeekRollupAdmin(admin.ModelAdmin):
+    list_display = ['child', 'goal', 'week_start', 'earned_days']
+    list_filter = ['week_start', 'child', 'goal']
+    list_select_related = ['child', 'goal']
+    readonly_fields = ['child', 'goal', 'week_start', 'earned_days', 'updated_at']
+    date_hierarchy = 'week_start'
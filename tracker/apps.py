@@ -7,3 +7,11 @@ from django.apps import AppConfig
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        from django.conf import settings
+        from . import signals  # noqa: F401
+        
+        if getattr(settings, 'REQUEST_METRICS', False):
+            from . import metrics
+            metrics.instrument()
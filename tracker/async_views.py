@@ -0,0 +1,235 @@
+"""
+Async read endpoints for serving the API under ASGI.
+
+These mirror the GET endpoints of the viewsets in `views`, reusing their
+querysets, serializers, permissions and pagination settings, but fetch rows
+with the async ORM so one worker can serve many requests at once.
+`child_events` streams live change notifications from `events.broker`.
+"""
+import asyncio
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions
+from rest_framework.permissions import AllowAny
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .conditional import add_validators, afingerprint, evaluate, request_variant
+from .events import broker
+from .models import Child
+from .summaries import adaily_summary, aweekly_ledger, aweekly_summary, week_bounds
+from .summary_cache import acached_summary
+from .views import (
+    ChildViewSet, ScreenTimeGoalViewSet, DailyTrackingViewSet, AdhocRewardViewSet,
+    AdhocPenaltyViewSet, ScreenTimeUsageViewSet,
+    child_pk, daily_summary_sources, requested_date, weekly_summary_sources,
+)
+
+
+def _json(data):
+    return JsonResponse(data, encoder=JSONEncoder, safe=False)
+
+
+def _error(view, exc):
+    """Render an APIException the way DRF's exception handler would."""
+    status = exc.status_code
+    response = _json({'detail': exc.detail} if not isinstance(exc.detail, (list, dict)) else exc.detail)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        header = view.get_authenticate_header(view.request)
+        if header:
+            response['WWW-Authenticate'] = header
+        else:
+            status = 403
+    response.status_code = status
+    return response
+
+
+async def _prepare(viewset_class, request, action, **kwargs):
+    """Build a viewset for `action` and run its authentication and permission checks.
+
+    Returns (view, error response or None). Checks only leave the event
+    loop when a permission class other than AllowAny is configured.
+    """
+    view = viewset_class(action_map={'get': action, 'head': action}, args=(), kwargs=kwargs, format_kwarg=None)
+    view.headers = {}
+    view.request = view.initialize_request(request, **kwargs)
+    if all(isinstance(permission, AllowAny) for permission in view.get_permissions()):
+        return view, None
+    try:
+        await sync_to_async(view.initial)(view.request, **kwargs)
+    except exceptions.APIException as exc:
+        return view, _error(view, exc)
+    return view, None
+
+
+async def _conditional(request, sources, extra, render):
+    """Answer 304 when the client's ETag matches `sources`, else await `render()`."""
+    etag, last_modified = await afingerprint(*sources, extra=extra)
+    response, etag, timestamp = evaluate(request, etag, last_modified)
+    if response is None:
+        response = await render()
+    return add_validators(response, etag, timestamp)
+
+
+async def _paginate(view, queryset):
+    """Page a queryset with the view's PageNumberPagination settings."""
+    paginator = view.paginator
+    if paginator is None:
+        return view.get_serializer([obj async for obj in queryset], many=True).data
+
+    page_size = paginator.get_page_size(view.request)
+    count = await queryset.acount()
+    pages = max(1, ceil(count / page_size))
+    number = view.request.query_params.get(paginator.page_query_param, 1)
+    if number in paginator.last_page_strings:
+        number = pages
+    try:
+        number = int(number)
+    except (TypeError, ValueError):
+        number = 0
+    if not 1 <= number <= pages:
+        raise exceptions.NotFound(paginator.invalid_page_message.format(page_number=number, message=''))
+
+    offset = (number - 1) * page_size
+    rows = [obj async for obj in queryset[offset:offset + page_size]]
+    url = view.request.build_absolute_uri()
+    if number == 1:
+        previous = None
+    elif number == 2:
+        previous = remove_query_param(url, paginator.page_query_param)
+    else:
+        previous = replace_query_param(url, paginator.page_query_param, number - 1)
+    return {
+        'count': count,
+        'next': replace_query_param(url, paginator.page_query_param, number + 1) if number < pages else None,
+        'previous': previous,
+        'results': view.get_serializer(rows, many=True).data,
+    }
+
+
+def list_view(viewset_class):
+    """Async `list` for a viewset, with the same filters, ETags and page shape."""
+    @require_safe
+    async def view_func(request):
+        view, error = await _prepare(viewset_class, request, 'list')
+        if error:
+            return error
+        try:
+            queryset = view.filter_queryset(view.get_queryset())
+        except exceptions.APIException as exc:
+            return _error(view, exc)
+
+        async def render():
+            try:
+                return _json(await _paginate(view, queryset))
+            except exceptions.APIException as exc:
+                return _error(view, exc)
+
+        sources = [queryset, *(model.objects.all() for model in view.etag_related_models)]
+        return await _conditional(request, sources, request_variant(view.request), render)
+
+    view_func.__name__ = f'{viewset_class.__name__}_list'
+    return view_func
+
+
+def summary_view(action, kind, summarize):
+    """Async child summary endpoint.
+
+    `kind` is 'daily' (keyed by date) or 'weekly'/'ledger' (keyed by the
+    week's Monday); `summarize(child, key_date)` is an async summary builder.
+    """
+    @require_safe
+    async def view_func(request, pk):
+        view, error = await _prepare(ChildViewSet, request, action, pk=pk)
+        if error:
+            return error
+        try:
+            child_id = child_pk(pk)
+        except Http404:
+            return _error(view, exceptions.NotFound())
+        key_date = requested_date(view.request)
+        if kind == 'daily':
+            sources = daily_summary_sources(child_id, key_date)
+        else:
+            key_date, _ = week_bounds(key_date)
+            sources = weekly_summary_sources(child_id, key_date)
+
+        async def render():
+            child = await Child.objects.filter(pk=child_id).afirst()
+            if child is None:
+                return _error(view, exceptions.NotFound('No Child matches the given query.'))
+            return _json(await acached_summary(kind, child.id, key_date, lambda: summarize(child, key_date)))
+
+        return await _conditional(request, sources, [*request_variant(view.request), key_date], render)
+
+    view_func.__name__ = action
+    return view_func
+
+
+# Seconds between keep-alive comments on an idle event stream
+HEARTBEAT_SECONDS = 25
+
+
+async def _event_stream(child_id):
+    subscription = broker.subscribe(child_id)
+    try:
+        yield 'retry: 5000\nevent: ready\ndata: {}\n\n'
+        while True:
+            try:
+                data = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if subscription.overflowed:
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.overflowed = False
+                yield 'event: resync\ndata: {}\n\n'
+                continue
+            yield f'event: change\ndata: {data}\n\n'
+    finally:
+        broker.unsubscribe(child_id, subscription)
+
+
+@require_safe
+async def child_events(request, pk):
+    """Server-sent events announcing writes to one child's trackings, ad-hoc entries and usage.
+
+    Each `change` event carries {type, op, id, date}; `resync` means events
+    were dropped and the client should refetch. An idle stream is a parked
+    coroutine with no database connection. Only available under ASGI.
+    """
+    view, error = await _prepare(ChildViewSet, request, 'retrieve', pk=pk)
+    if error:
+        return error
+    if not settings.ASYNC_API:
+        # A sync worker would be tied up for as long as the stream stays open
+        return _error(view, exceptions.NotFound('Live updates need the server running with SERVER_MODE=asgi.'))
+    try:
+        child_id = child_pk(pk)
+    except Http404:
+        return _error(view, exceptions.NotFound())
+    if not await Child.objects.filter(pk=child_id).aexists():
+        return _error(view, exceptions.NotFound('No Child matches the given query.'))
+
+    response = StreamingHttpResponse(_event_stream(child_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+children = list_view(ChildViewSet)
+goals = list_view(ScreenTimeGoalViewSet)
+daily_trackings = list_view(DailyTrackingViewSet)
+adhoc_rewards = list_view(AdhocRewardViewSet)
+adhoc_penalties = list_view(AdhocPenaltyViewSet)
+screen_time_usage = list_view(ScreenTimeUsageViewSet)
+
+daily_summary = summary_view('daily_summary', 'daily', adaily_summary)
+weekly_summary = summary_view('weekly_summary', 'weekly', aweekly_summary)
+weekly_ledger = summary_view('weekly_ledger', 'ledger', aweekly_ledger)
@@ -0,0 +1,166 @@
+"""
+Incremental maintenance of the materialized WeeklyBalance table.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import summary_cache
+from .models import Child, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage, WeeklyBalance
+from .summaries import BALANCE_FIELDS, compute_weekly_balances, earning_week, live_weekly_totals, week_bounds
+
+
+# model -> (date field, minutes field, balance field) for rows that count toward
+# the week they fall in
+DATED_SOURCES = {
+    AdhocReward: ('awarded_date', 'minutes', 'adhoc_reward_minutes'),
+    AdhocPenalty: ('applied_date', 'minutes', 'adhoc_penalty_minutes'),
+    ScreenTimeUsage: ('date', 'minutes_used', 'used_minutes'),
+}
+
+
+def _as_date(value):
+    return parse_date(value) if isinstance(value, str) else value
+
+
+def contributions(instance):
+    """Return the (child_id, week_start, field, minutes) entries a row adds to the balance table."""
+    if isinstance(instance, DailyTracking):
+        if instance.status != 'earned' or not instance.minutes_earned:
+            return []
+        goal = instance.goal
+        day = _as_date(instance.date)
+        if not goal.applies_on(day):
+            return []
+        week = earning_week(day, goal.rollover_sunday_to_next_week)
+        return [(instance.child_id, week, 'earned_minutes', instance.minutes_earned)]
+
+    date_field, minutes_field, balance_field = DATED_SOURCES[type(instance)]
+    minutes = getattr(instance, minutes_field)
+    if not minutes:
+        return []
+    monday, _ = week_bounds(_as_date(getattr(instance, date_field)))
+    return [(instance.child_id, monday, balance_field, minutes)]
+
+
+def _adjust(child_id, week_start, field, delta):
+    """Add `delta` to one balance field, creating the week's row when adding."""
+    rows = WeeklyBalance.objects.filter(child_id=child_id, week_start=week_start)
+    changes = {field: F(field) + delta, 'updated_at': timezone.now()}
+    if rows.update(**changes) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            WeeklyBalance.objects.create(child_id=child_id, week_start=week_start, **{field: delta})
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(**changes)
+
+
+def apply_change(before, after):
+    """Move the balance table from the `before` contributions to the `after` ones."""
+    net = defaultdict(int)
+    for child_id, week_start, field, minutes in before:
+        net[(child_id, week_start, field)] -= minutes
+    for child_id, week_start, field, minutes in after:
+        net[(child_id, week_start, field)] += minutes
+    for (child_id, week_start, field), delta in net.items():
+        if delta:
+            _adjust(child_id, week_start, field, delta)
+
+
+def refresh_balances(child_ids, start, end):
+    """Recompute stored balances for `child_ids` for the weeks from `start` to `end` (Mondays).
+
+    Cached summaries of those children are invalidated, since the rewrite
+    bypasses the write signals.
+    """
+    live = compute_weekly_balances(child_ids=child_ids, start=start, end=end)
+    now = timezone.now()
+    with transaction.atomic():
+        existing = WeeklyBalance.objects.filter(
+            child_id__in=child_ids, week_start__gte=start, week_start__lte=end
+        )
+        to_update = []
+        for balance in existing:
+            values = live.pop((balance.child_id, balance.week_start), dict.fromkeys(BALANCE_FIELDS, 0))
+            if any(getattr(balance, field) != values[field] for field in BALANCE_FIELDS):
+                for field in BALANCE_FIELDS:
+                    setattr(balance, field, values[field])
+                balance.updated_at = now
+                to_update.append(balance)
+        WeeklyBalance.objects.bulk_update(to_update, BALANCE_FIELDS + ['updated_at'])
+        WeeklyBalance.objects.bulk_create([
+            WeeklyBalance(child_id=child_id, week_start=week_start, **values)
+            for (child_id, week_start), values in live.items()
+        ])
+        summary_cache.invalidate(*child_ids)
+
+
+def refresh_rows(rows):
+    """Recompute the weeks touched by rows written without post_save signals."""
+    if not rows:
+        return
+    days = []
+    for row in rows:
+        date_field = DATED_SOURCES[type(row)][0] if type(row) in DATED_SOURCES else 'date'
+        days.append(_as_date(getattr(row, date_field)))
+    start, _ = week_bounds(min(days))
+    end, _ = week_bounds(max(days))
+    # Sunday rollover can push earnings into the following week
+    refresh_balances({row.child_id for row in rows}, start, end + timedelta(days=7))
+
+
+def refresh_goal_weeks(goal):
+    """Recompute every week touched by a goal's trackings after its schedule changed."""
+    trackings = DailyTracking.objects.filter(goal=goal)
+    span = trackings.aggregate(first=Min('date'), last=Max('date'))
+    if span['first'] is None:
+        return
+    child_ids = list(trackings.values_list('child_id', flat=True).distinct().order_by())
+    start, _ = week_bounds(span['first'])
+    end, _ = week_bounds(span['last'])
+    refresh_balances(child_ids, start, end + timedelta(days=7))
+
+
+def rebuild_all():
+    """Recreate the whole balance table from the source tables. Returns the row count.
+
+    Cached summaries of every child whose rows were dropped or written are
+    invalidated, since the rewrite bypasses the write signals.
+    """
+    live = compute_weekly_balances()
+    with transaction.atomic():
+        child_ids = set(WeeklyBalance.objects.values_list('child_id', flat=True).distinct().order_by())
+        child_ids.update(child_id for child_id, _ in live)
+        WeeklyBalance.objects.all().delete()
+        WeeklyBalance.objects.bulk_create([
+            WeeklyBalance(child_id=child_id, week_start=week_start, **values)
+            for (child_id, week_start), values in live.items()
+        ], batch_size=500)
+        summary_cache.invalidate(*child_ids)
+    return len(live)
+
+
+def verify():
+    """Compare stored balances with a week-by-week live calculation.
+
+    Returns a list of (child, week_start, stored, live) tuples for every
+    week where the two disagree.
+    """
+    stored = {(b.child_id, b.week_start): b for b in WeeklyBalance.objects.all()}
+    keys = set(stored) | set(compute_weekly_balances())
+    children = Child.objects.in_bulk({child_id for child_id, _ in keys})
+
+    mismatches = []
+    for child_id, week_start in sorted(keys):
+        balance = stored.get((child_id, week_start))
+        stored_values = {field: getattr(balance, field, 0) for field in BALANCE_FIELDS}
+        live_values = live_weekly_totals(children[child_id], week_start)
+        if stored_values != live_values:
+            mismatches.append((children[child_id], week_start, stored_values, live_values))
+    return mismatches
@@ -0,0 +1,88 @@
+"""
+Declared ceilings on the number of SQL queries each API action may run.
+
+A viewset using QueryBudgetMixin counts the statements each request
+executes and compares them with the action's budget, taken from the
+`query_budget` decorator on the action or from the viewset's
+`query_budgets` mapping (for inherited actions such as `list`). What
+happens when a budget is exceeded is set by QUERY_BUDGETS: 'log', 'raise'
+or 'off'. The test runner switches it to 'raise' so a new N+1 fails CI.
+
+Transaction control statements (BEGIN, COMMIT, savepoints) are not
+counted, so a view costs the same inside a test case's transaction as it
+does in production.
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_CONTROL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    """Declare that a viewset action runs at most `limit` queries."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+class QueryCounter:
+    """Execute wrapper counting the statements run through a connection."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_CONTROL):
+            self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+def enforce(label, limit, counter):
+    """Log or raise, as QUERY_BUDGETS says, when `counter` went over `limit`."""
+    if counter.count <= limit:
+        return
+    mode = getattr(settings, 'QUERY_BUDGETS', 'off')
+    message = f'{label} ran {counter.count} queries, over its budget of {limit}'
+    if mode == 'raise':
+        raise QueryBudgetExceeded(message + ':\n' + '\n'.join(counter.statements))
+    if mode == 'log':
+        logger.warning(message)
+
+
+class QueryBudgetMixin:
+    """Hold each viewset action to its declared query budget.
+
+    `query_budgets` maps action names to limits; a `query_budget`
+    decorator on the action method takes precedence.
+    """
+    query_budgets = {}
+
+    def get_query_budget(self):
+        handler = getattr(self, self.action, None) if self.action else None
+        limit = getattr(handler, 'query_budget', None)
+        return limit if limit is not None else self.query_budgets.get(self.action)
+
+    def dispatch(self, request, *args, **kwargs):
+        if getattr(settings, 'QUERY_BUDGETS', 'off') == 'off':
+            return super().dispatch(request, *args, **kwargs)
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+        limit = self.get_query_budget()
+        if limit is not None:
+            enforce(f'{type(self).__name__}.{self.action}', limit, counter)
+        return response
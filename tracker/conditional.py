@@ -0,0 +1,103 @@
+"""
+Conditional GET support (ETag / Last-Modified) for tracker API views.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def _combine(stats, extra):
+    parts = [str(value) for value in extra]
+    last_modified = None
+    for row in stats:
+        parts.append(f"{row['count']}@{row['latest'].isoformat() if row['latest'] else ''}")
+        if row['latest'] and (last_modified is None or row['latest'] > last_modified):
+            last_modified = row['latest']
+    etag = hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+    return etag, last_modified
+
+
+def fingerprint(*querysets, extra=()):
+    """Return (etag, last_modified) for the rows behind a response.
+
+    Each queryset contributes its row count and latest `updated_at`, read
+    with one aggregate query, so the body never has to be rendered to tell
+    whether it changed. `extra` values (e.g. the request path) are mixed
+    into the tag.
+    """
+    return _combine(
+        [queryset.order_by().aggregate(latest=Max('updated_at'), count=Count('pk')) for queryset in querysets],
+        extra,
+    )
+
+
+async def afingerprint(*querysets, extra=()):
+    """Async counterpart of `fingerprint`."""
+    return _combine(
+        [await queryset.order_by().aaggregate(latest=Max('updated_at'), count=Count('pk')) for queryset in querysets],
+        extra,
+    )
+
+
+def evaluate(request, etag, last_modified):
+    """Return (304 response or None, quoted etag, timestamp) for a request."""
+    etag = quote_etag(etag)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp), etag, timestamp
+
+
+def add_validators(response, etag, timestamp):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # Always revalidate rather than trusting heuristic freshness
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional(fingerprint_method):
+    """Decorate a viewset method so GET/HEAD requests honour If-None-Match.
+
+    `fingerprint_method(self, request, *args, **kwargs)` returns the
+    (etag, last_modified) pair for the response. When the client already
+    holds the current version a 304 is returned without calling the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(self, request, *args, **kwargs)
+            response, etag, timestamp = evaluate(request, *fingerprint_method(self, request, *args, **kwargs))
+            if response is None:
+                response = view(self, request, *args, **kwargs)
+            return add_validators(response, etag, timestamp)
+        return wrapper
+    return decorator
+
+
+def request_variant(request):
+    """Values that change the body for the same rows: path, query string and format."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    return [request.get_full_path(), getattr(renderer, 'format', '')]
+
+
+class ConditionalListMixin:
+    """Serve `list` with ETag/Last-Modified derived from the filtered queryset.
+
+    `etag_related_models` lists models whose rows are rendered into each
+    item (e.g. names of related objects) and so must also invalidate the tag.
+    """
+    etag_related_models = []
+
+    def list_fingerprint(self, request, *args, **kwargs):
+        querysets = [self.filter_queryset(self.get_queryset())]
+        querysets += [model.objects.all() for model in self.etag_related_models]
+        return fingerprint(*querysets, extra=request_variant(request))
+
+    @conditional(list_fingerprint)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
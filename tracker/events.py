@@ -0,0 +1,114 @@
+"""
+In-process broker pushing compact change events to live update streams.
+
+Signal receivers publish one small JSON event per committed write to the
+affected child; each open stream holds a bounded asyncio queue on its event
+loop. Events are built from the saved instance and encoded once, so the
+number of subscribers never adds database work. Only streams served by the
+same process receive an event.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage
+
+
+# Event type and the date field of each model that is pushed to subscribers
+EVENT_MODELS = {
+    DailyTracking: ('tracking', 'date'),
+    AdhocReward: ('reward', 'awarded_date'),
+    AdhocPenalty: ('penalty', 'applied_date'),
+    ScreenTimeUsage: ('usage', 'date'),
+}
+
+
+class Subscription:
+    """One stream's queue of encoded events, owned by the loop that created it."""
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, data):
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # The stream tells the client to refetch instead of replaying every event
+            self.overflowed = True
+
+
+class Broker:
+    """Fan out events per child to the subscriptions in this process.
+
+    `publish` may be called from any thread; delivery runs on each
+    subscription's own event loop.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, child_id):
+        """Subscribe to a child's events; call from the event loop that will read them."""
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[child_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, child_id, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(child_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[child_id]
+
+    def publish(self, child_id, data):
+        """Queue the encoded event `data` for every subscriber to `child_id`."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(child_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, data)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(child_id, subscription)
+
+    def subscriber_count(self, child_id=None):
+        with self._lock:
+            if child_id is not None:
+                return len(self._subscriptions.get(child_id, ()))
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+broker = Broker()
+
+
+def encode_change(instance, op):
+    """Compact JSON event for a saved or deleted instance of one of EVENT_MODELS."""
+    event_type, date_field = EVENT_MODELS[type(instance)]
+    return json.dumps({
+        'type': event_type,
+        'op': op,
+        'id': instance.pk,
+        # str() also covers dates assigned as 'YYYY-MM-DD' strings before a refresh
+        'date': str(getattr(instance, date_field)),
+    }, separators=(',', ':'))
+
+
+def publish_change(instance, op, *child_ids):
+    """Push a change to the instance's child (and any `child_ids`) once the write commits."""
+    data = encode_change(instance, op)
+    targets = {child_id for child_id in (instance.child_id, *child_ids) if child_id is not None}
+    
+    def send():
+        for child_id in targets:
+            broker.publish(child_id, data)
+    
+    transaction.on_commit(send)
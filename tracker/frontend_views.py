@@ -1,11 +1,75 @@
 """
 Views for serving the mobile frontend.
 """
+import hashlib
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
-from django.views.decorators.http import require_http_methods
+from django.template.loader import render_to_string
+from django.templatetags.static import static
+from django.urls import reverse
+from django.views.decorators.http import condition, require_http_methods
+
+
+# Static files the service worker pre-caches along with the index page
+SHELL_ASSETS = [
+    'css/app.css',
+    'js/app.js',
+    'js/mutation-queue.js',
+    'manifest.json',
+    'img/favicon.svg',
+    'img/favicon.ico',
+    'img/icon-192.png',
+    'img/apple-touch-icon.png',
+]
+
+# Bump to drop every client's cached shell and API reads on the next visit
+SERVICE_WORKER_CACHE_VERSION = 'v1'
+
+
+@lru_cache(maxsize=None)
+def _render_shell(read_api_path, live_events):
+    html = render_to_string('index.html', {'read_api_path': read_api_path, 'live_events': live_events})
+    return html, '"%s"' % hashlib.sha256(html.encode()).hexdigest()[:32]
+
+
+def app_shell():
+    """Return the rendered index page and its ETag.
+
+    The page only references hashed static assets and a couple of settings,
+    so it is rendered once per process; with APP_SHELL_CACHE off it is
+    rendered on each request to pick up template edits.
+    """
+    read_api_path = '/api/async' if settings.ASYNC_API else '/api'
+    # Event streams hold a connection open, which only the ASGI server can afford
+    live_events = settings.ASYNC_API
+    if not settings.APP_SHELL_CACHE:
+        return _render_shell.__wrapped__(read_api_path, live_events)
+    return _render_shell(read_api_path, live_events)
 
 
 @require_http_methods(["GET"])
+@condition(etag_func=lambda request: app_shell()[1])
 def index(request):
     """Serve the mobile app frontend."""
-    return render(request, 'index.html')
+    response = HttpResponse(app_shell()[0])
+    # Revalidate on every visit; unchanged pages come back as an empty 304
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@require_http_methods(["GET"])
+def service_worker(request):
+    """Serve the service worker from the site root so its scope covers the whole app."""
+    response = render(request, 'sw.js', {
+        'queue_script_url': static('js/mutation-queue.js'),
+        'cache_version': SERVICE_WORKER_CACHE_VERSION,
+        'shell_urls': json.dumps([reverse('index'), *(static(path) for path in SHELL_ASSETS)]),
+        'mutations_url': reverse('mutation-list'),
+    }, content_type='application/javascript')
+    # Browsers compare the worker byte for byte on each visit; never let a proxy hold an old one
+    response['Cache-Control'] = 'no-cache'
+    return response
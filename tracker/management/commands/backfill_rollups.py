@@ -0,0 +1,33 @@
+"""
+Rebuild the materialized daily and goal rollup tables from the source tables.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import rollups
+from tracker.models import Child
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily and goal rollups from trackings, ad-hoc entries and usage, a child and a chunk of days at a time'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--child', type=int, action='append', help='Child id to backfill (repeatable, default: all)')
+        parser.add_argument('--chunk-days', type=int, default=90, help='Days recomputed per transaction (default: 90)')
+    
+    def handle(self, *args, **options):
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days must be positive')
+        children = Child.objects.order_by('pk')
+        if options['child']:
+            children = children.filter(pk__in=options['child'])
+        child_ids = list(children.values_list('pk', flat=True))
+        
+        chunks = 0
+        for child_id, start, end in rollups.backfill(child_ids, options['chunk_days']):
+            chunks += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Child {child_id}: {start} to {end}')
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfilled daily rollups for {len(child_ids)} children in {chunks} chunks'
+        ))
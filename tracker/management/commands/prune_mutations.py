@@ -0,0 +1,21 @@
+"""
+Delete replayed offline mutation records past their retention period.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tracker.mutations import prune_mutations
+
+
+class Command(BaseCommand):
+    help = 'Delete replayed mutation records older than MUTATION_RETENTION_DAYS'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.MUTATION_RETENTION_DAYS,
+            help='Keep mutation records from this many days back (default: MUTATION_RETENTION_DAYS)'
+        )
+    
+    def handle(self, *args, **options):
+        count = prune_mutations(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} mutation records'))
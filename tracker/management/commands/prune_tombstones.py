@@ -0,0 +1,21 @@
+"""
+Delete delta sync tombstones past their retention period.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tracker.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help='Keep tombstones from this many days back (default: SYNC_TOMBSTONE_RETENTION_DAYS)'
+        )
+    
+    def handle(self, *args, **options):
+        count = prune_tombstones(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} tombstones'))
@@ -0,0 +1,28 @@
+"""
+Recompute the materialized weekly balance table.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import balances
+
+
+class Command(BaseCommand):
+    help = 'Rebuild weekly balances from scratch and verify them against the live calculation'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--verify-only', action='store_true', help='Only compare stored balances, do not rebuild')
+    
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            count = balances.rebuild_all()
+            self.stdout.write(f'Rebuilt {count} weekly balances')
+        
+        mismatches = balances.verify()
+        for child, week_start, stored, live in mismatches:
+            self.stdout.write(
+                self.style.WARNING(f'{child.name} week of {week_start}: stored {stored} != live {live}')
+            )
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} weekly balances do not match the live calculation')
+        
+        self.stdout.write(self.style.SUCCESS('Weekly balances match the live calculation'))
@@ -0,0 +1,44 @@
+"""
+Fill the database with generated households for benchmarking.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from tracker.seeding import seed_household
+
+
+class Command(BaseCommand):
+    help = 'Create children, goals and years of trackings, ad-hoc entries and usage with deterministic random data'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--children', type=int, default=3, help='Children to create (default: 3)')
+        parser.add_argument('--goals', type=int, default=6, help='Goals shared by the children (default: 6)')
+        parser.add_argument('--years', type=float, default=1, help='Years of history ending today (default: 1)')
+        parser.add_argument('--end', help='Last day of history as YYYY-MM-DD (default: today)')
+        parser.add_argument('--rewards-per-week', type=float, default=2, help='Average ad-hoc rewards per child per week')
+        parser.add_argument('--penalties-per-week', type=float, default=1, help='Average ad-hoc penalties per child per week')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed produces the same rows')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+    
+    def handle(self, *args, **options):
+        end = None
+        if options['end']:
+            end = parse_date(options['end'])
+            if end is None:
+                raise CommandError('--end must be a date in YYYY-MM-DD format')
+        if options['children'] < 0 or options['goals'] < 0 or options['years'] <= 0:
+            raise CommandError('--children and --goals must not be negative and --years must be positive')
+        
+        counts = seed_household(
+            children=options['children'],
+            goals=options['goals'],
+            days=max(1, round(options['years'] * 365)),
+            end=end,
+            rewards_per_week=options['rewards_per_week'],
+            penalties_per_week=options['penalties_per_week'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        for model_name, count in counts.items():
+            self.stdout.write(f'{model_name}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Created {sum(counts.values())} rows'))
@@ -0,0 +1,237 @@
+"""
+Per-request timing, query counts and their aggregation for /api/_metrics.
+
+RequestMetricsMiddleware opens a `Collector` for each request in a context
+variable. A database execute wrapper, installed on every connection as it
+is created, charges each SQL statement to the current collector, and the
+serializer hook charges the time spent building `serializer.data`. Context
+variables follow a request into the threads `sync_to_async` runs ORM calls
+in, so async views are measured too.
+
+Histograms are kept in memory, per process, labelled by route name (the
+URL name, e.g. `child-daily-summary`) and method; each worker exposes its
+own.
+"""
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger(__name__)
+
+# Statements kept per request for the slow request log
+SLOWEST_QUERIES = 5
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (help, buckets) of the histograms recorded for every request
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Wall time spent handling the request', DURATION_BUCKETS),
+    'http_request_db_queries': ('SQL statements executed for the request', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': ('Time spent in SQL statements', DURATION_BUCKETS),
+    'http_request_serializer_duration_seconds': ('Time spent building serializer data', DURATION_BUCKETS),
+    'http_response_size_bytes': ('Size of the response body', SIZE_BUCKETS),
+}
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Collector:
+    """Numbers gathered while one request is handled."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self._slowest = []
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        # Keep the slowest statements in a min-heap; the sequence number breaks ties
+        entry = (duration, self.queries, sql)
+        if len(self._slowest) < SLOWEST_QUERIES:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest_queries(self):
+        return [(duration, sql) for duration, _, sql in sorted(self._slowest, reverse=True)]
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def start():
+    """Begin collecting for the current request; pass the result to `stop`."""
+    collector = Collector()
+    return collector, _current.set(collector)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def _record_query(execute, sql, params, many, context):
+    collector = _current.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        collector.add_query(sql, time.perf_counter() - started)
+
+
+def _install_query_wrapper(sender, connection, **kwargs):
+    # Persistent connections reconnect on the same wrapper object
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+_instrumented = False
+
+
+def instrument():
+    """Hook SQL execution on every connection and DRF serializer data.
+
+    Connections opened later are hooked as they are created; call this
+    before serving requests (TrackerConfig.ready() does when REQUEST_METRICS
+    is on). Safe to call more than once.
+    """
+    global _instrumented
+    from django.db import connections
+    from rest_framework.serializers import BaseSerializer
+
+    for connection in connections.all(initialized_only=True):
+        _install_query_wrapper(None, connection)
+    if _instrumented:
+        return
+    connection_created.connect(_install_query_wrapper, dispatch_uid='tracker.metrics')
+
+    data = BaseSerializer.data
+
+    def timed_data(self):
+        collector = _current.get()
+        if collector is None:
+            return data.fget(self)
+        # Serializers used while building another serializer's data are already counted
+        collector.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            collector.serializer_depth -= 1
+            if not collector.serializer_depth:
+                collector.serializer_time += time.perf_counter() - started
+
+    BaseSerializer.data = property(timed_data)
+    _instrumented = True
+
+
+class Histogram:
+    """Cumulative Prometheus histogram for one label set."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class Registry:
+    """Per-process histograms and request counts keyed by route and method."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._requests = {}
+
+    def record(self, route, method, status, collector, size):
+        values = {
+            'http_request_duration_seconds': collector.elapsed(),
+            'http_request_db_queries': collector.queries,
+            'http_request_db_duration_seconds': collector.db_time,
+            'http_request_serializer_duration_seconds': collector.serializer_time,
+        }
+        if size is not None:
+            values['http_response_size_bytes'] = size
+        with self._lock:
+            for name, value in values.items():
+                key = (name, route, method)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(HISTOGRAMS[name][1])
+                self._histograms[key].observe(value)
+            key = (route, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = {key: (list(h.counts), h.total, h.buckets) for key, h in self._histograms.items()}
+            requests = dict(self._requests)
+
+        lines = [
+            '# HELP http_requests_total Requests handled, by route, method and status',
+            '# TYPE http_requests_total counter',
+        ]
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+        for name, (help_text, _) in HISTOGRAMS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, route, method), (counts, total, buckets) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                labels = f'route="{route}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip([*buckets, '+Inf'], counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{labels}}} {total:g}')
+                lines.append(f'{name}_count{{{labels}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def server_timing(collector):
+    """Server-Timing header value for a finished request."""
+    return ', '.join([
+        f'total;dur={collector.elapsed() * 1000:.1f}',
+        f'db;dur={collector.db_time * 1000:.1f};desc="{collector.queries} queries"',
+        f'serialize;dur={collector.serializer_time * 1000:.1f}',
+    ])
+
+
+def log_slow_request(request, status, collector, threshold_ms):
+    """Log a request slower than `threshold_ms` with its slowest SQL statements."""
+    elapsed_ms = collector.elapsed() * 1000
+    if elapsed_ms < threshold_ms:
+        return
+    statements = ''.join(
+        f'\n  {duration * 1000:.1f} ms: {sql[:500]}' for duration, sql in collector.slowest_queries()
+    )
+    logger.warning(
+        'Slow request %s %s -> %s took %.1f ms (%d queries, %.1f ms SQL, %.1f ms serializing)%s',
+        request.method, request.get_full_path(), status, elapsed_ms, collector.queries,
+        collector.db_time * 1000, collector.serializer_time * 1000, statements,
+    )
@@ -0,0 +1,54 @@
+"""
+Middleware for the tracker app.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+
+class RequestMetricsMiddleware:
+    """Measure each request's wall time, SQL, serializer time and response size.
+
+    Adds a `Server-Timing` header, aggregates the numbers per route for
+    `/api/_metrics` and logs requests slower than REQUEST_METRICS_SLOW_MS
+    with their slowest statements. Requests that match no URL (static
+    files, 404s) get the header but are not aggregated.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        metrics.instrument()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        collector, token = metrics.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.stop(token)
+        return self.finish(request, response, collector)
+
+    async def __acall__(self, request):
+        collector, token = metrics.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.stop(token)
+        return self.finish(request, response, collector)
+
+    def finish(self, request, response, collector):
+        response['Server-Timing'] = metrics.server_timing(collector)
+        match = request.resolver_match
+        if match is not None and match.url_name and match.url_name != 'metrics':
+            # Streamed bodies (live event streams) have no size up front
+            size = None if response.streaming else len(response.content)
+            metrics.registry.record(match.url_name, request.method, response.status_code, collector, size)
+        metrics.log_slow_request(request, response.status_code, collector, settings.REQUEST_METRICS_SLOW_MS)
+        return response
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.14 on 2026-10-17 03:55
+
+from collections import defaultdict
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+DAY_CODES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def populate_balances(apps, schema_editor):
+    """Fill the new table from existing rows, the same way writes maintain it."""
+    DailyTracking = apps.get_model('tracker', 'DailyTracking')
+    AdhocReward = apps.get_model('tracker', 'AdhocReward')
+    AdhocPenalty = apps.get_model('tracker', 'AdhocPenalty')
+    ScreenTimeUsage = apps.get_model('tracker', 'ScreenTimeUsage')
+    WeeklyBalance = apps.get_model('tracker', 'WeeklyBalance')
+
+    def monday(day):
+        return day - timedelta(days=day.weekday())
+
+    balances = defaultdict(lambda: defaultdict(int))
+    earned = (
+        DailyTracking.objects.filter(status='earned')
+        .values('child_id', 'date', 'goal__applies_to_days', 'goal__rollover_sunday_to_next_week')
+        .annotate(minutes=Sum('minutes_earned'))
+        .order_by()
+    )
+    for row in earned:
+        day = row['date']
+        if DAY_CODES[day.weekday()] not in [d.strip() for d in (row['goal__applies_to_days'] or '').split(',')]:
+            continue
+        week = monday(day)
+        if day.weekday() == 6 and row['goal__rollover_sunday_to_next_week']:
+            week += timedelta(days=7)
+        balances[(row['child_id'], week)]['earned_minutes'] += row['minutes'] or 0
+
+    sources = [
+        (AdhocReward, 'awarded_date', 'minutes', 'adhoc_reward_minutes'),
+        (AdhocPenalty, 'applied_date', 'minutes', 'adhoc_penalty_minutes'),
+        (ScreenTimeUsage, 'date', 'minutes_used', 'used_minutes'),
+    ]
+    for model, date_field, minutes_field, balance_field in sources:
+        rows = model.objects.values('child_id', date_field).annotate(total=Sum(minutes_field)).order_by()
+        for row in rows:
+            balances[(row['child_id'], monday(row[date_field]))][balance_field] += row['total'] or 0
+
+    WeeklyBalance.objects.bulk_create([
+        WeeklyBalance(child_id=child_id, week_start=week_start, **values)
+        for (child_id, week_start), values in balances.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_screentimegoal_rollover_sunday_to_next_week'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField(help_text='Monday of the week')),
+                ('earned_minutes', models.IntegerField(default=0, help_text='Goal earnings counted toward this week, including Sunday rollover')),
+                ('adhoc_reward_minutes', models.IntegerField(default=0, help_text='Ad-hoc rewards awarded this week')),
+                ('adhoc_penalty_minutes', models.IntegerField(default=0, help_text='Ad-hoc penalties applied this week')),
+                ('used_minutes', models.IntegerField(default=0, help_text='Screen time used this week')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_balances', to='tracker.child')),
+            ],
+            options={
+                'ordering': ['-week_start', 'child'],
+                'unique_together': {('child', 'week_start')},
+            },
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.14 on 2026-10-17 03:56
+
+from django.db import migrations, models
+
+WEEKDAY_BITS = {"mon": 1, "tue": 2, "wed": 4, "thu": 8, "fri": 16, "sat": 32, "sun": 64}
+
+
+def backfill_masks(apps, schema_editor):
+    ScreenTimeGoal = apps.get_model("tracker", "ScreenTimeGoal")
+    goals = list(ScreenTimeGoal.objects.only("id", "applies_to_days"))
+    for goal in goals:
+        goal.applies_to_days_mask = 0
+        for day in (goal.applies_to_days or "").split(","):
+            goal.applies_to_days_mask |= WEEKDAY_BITS.get(day.strip(), 0)
+    ScreenTimeGoal.objects.bulk_update(goals, ["applies_to_days_mask"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0008_weeklybalance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="screentimegoal",
+            name="applies_to_days_mask",
+            field=models.PositiveSmallIntegerField(
+                default=127,
+                editable=False,
+                help_text="Weekday bitmask kept in sync with applies_to_days (Monday is bit 0)",
+            ),
+        ),
+        migrations.RunPython(backfill_masks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="screentimegoal",
+            index=models.Index(
+                fields=["is_active", "applies_to_days_mask"],
+                name="tracker_scr_is_acti_ab2a17_idx",
+            ),
+        ),
+    ]
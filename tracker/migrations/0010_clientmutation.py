@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0009_screentimegoal_applies_to_days_mask"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClientMutation",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        help_text="Id the client generated for the mutation",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "result",
+                    models.JSONField(
+                        default=dict, help_text="Outcome returned to the client"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0010_clientmutation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "model",
+                    models.CharField(
+                        help_text="Model name of the deleted row, e.g. 'dailytracking'",
+                        max_length=50,
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["deleted_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="adhocpenalty",
+            index=models.Index(
+                fields=["updated_at"], name="tracker_adh_updated_e4310a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="adhocreward",
+            index=models.Index(
+                fields=["updated_at"], name="tracker_adh_updated_1b6eee_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="child",
+            index=models.Index(
+                fields=["updated_at"], name="tracker_chi_updated_d33252_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailytracking",
+            index=models.Index(
+                fields=["updated_at"], name="tracker_dai_updated_5c4fe5_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="screentimegoal",
+            index=models.Index(
+                fields=["updated_at"], name="tracker_scr_updated_aef08f_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="screentimeusage",
+            index=models.Index(
+                fields=["updated_at"], name="tracker_scr_updated_25f359_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["deleted_at"], name="tracker_tom_deleted_2d8996_idx"
+            ),
+        ),
+    ]
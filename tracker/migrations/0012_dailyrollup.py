@@ -0,0 +1,140 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:43
+
+from collections import defaultdict
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    """Fill the new table from existing rows, the same way writes maintain it."""
+    DailyTracking = apps.get_model("tracker", "DailyTracking")
+    AdhocReward = apps.get_model("tracker", "AdhocReward")
+    AdhocPenalty = apps.get_model("tracker", "AdhocPenalty")
+    ScreenTimeUsage = apps.get_model("tracker", "ScreenTimeUsage")
+    DailyRollup = apps.get_model("tracker", "DailyRollup")
+
+    rollups = defaultdict(lambda: defaultdict(int))
+    earned = Q(status="earned")
+    trackings = (
+        DailyTracking.objects.values(
+            "child_id", "date", "goal__applies_to_days_mask", "goal__rollover_sunday_to_next_week"
+        )
+        .annotate(
+            applicable=Count("pk"),
+            earned=Count("pk", filter=earned),
+            minutes=Sum("minutes_earned", filter=earned),
+        )
+        .order_by()
+    )
+    for row in trackings:
+        day = row["date"]
+        if not row["goal__applies_to_days_mask"] & (1 << day.weekday()):
+            continue
+        rollup = rollups[(row["child_id"], day)]
+        rollup["goals_applicable"] += row["applicable"]
+        rollup["goals_earned"] += row["earned"]
+        earned_on = day
+        if day.weekday() == 6 and row["goal__rollover_sunday_to_next_week"]:
+            earned_on += timedelta(days=1)
+        if row["minutes"]:
+            rollups[(row["child_id"], earned_on)]["earned_minutes"] += row["minutes"]
+
+    sources = [
+        (AdhocReward, "awarded_date", "minutes", "adhoc_plus"),
+        (AdhocPenalty, "applied_date", "minutes", "adhoc_minus"),
+        (ScreenTimeUsage, "date", "minutes_used", "used_minutes"),
+    ]
+    for model, date_field, minutes_field, rollup_field in sources:
+        rows = model.objects.values("child_id", date_field).annotate(total=Sum(minutes_field)).order_by()
+        for row in rows:
+            if row["total"]:
+                rollups[(row["child_id"], row[date_field])][rollup_field] += row["total"]
+
+    DailyRollup.objects.bulk_create(
+        [
+            DailyRollup(child_id=child_id, date=day, **values)
+            for (child_id, day), values in rollups.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0011_sync_indexes_tombstone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "earned_minutes",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Goal earnings counted toward this day; Sunday rollover earnings land on the Monday",
+                    ),
+                ),
+                (
+                    "goals_earned",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Trackings earned on a day their goal applies to",
+                    ),
+                ),
+                (
+                    "goals_applicable",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Trackings recorded on a day their goal applies to",
+                    ),
+                ),
+                (
+                    "adhoc_plus",
+                    models.IntegerField(
+                        default=0, help_text="Ad-hoc reward minutes awarded this day"
+                    ),
+                ),
+                (
+                    "adhoc_minus",
+                    models.IntegerField(
+                        default=0, help_text="Ad-hoc penalty minutes applied this day"
+                    ),
+                ),
+                (
+                    "used_minutes",
+                    models.IntegerField(
+                        default=0, help_text="Screen time used this day"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "child",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="tracker.child",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date", "child"],
+                "unique_together": {("child", "date")},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.0.14 on 2026-10-17 05:10
+
+from collections import defaultdict
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_goal_rollups(apps, schema_editor):
+    """Fill the new table from existing trackings, the same way writes maintain it."""
+    DailyTracking = apps.get_model("tracker", "DailyTracking")
+    GoalWeekRollup = apps.get_model("tracker", "GoalWeekRollup")
+
+    masks = defaultdict(int)
+    rows = (
+        DailyTracking.objects.filter(status="earned")
+        .values_list("child_id", "goal_id", "date", "goal__applies_to_days_mask")
+        .order_by()
+    )
+    for child_id, goal_id, day, applies_mask in rows.iterator():
+        bit = 1 << day.weekday()
+        if applies_mask & bit:
+            masks[(child_id, goal_id, day - timedelta(days=day.weekday()))] |= bit
+
+    GoalWeekRollup.objects.bulk_create(
+        [
+            GoalWeekRollup(child_id=child_id, goal_id=goal_id, week_start=week_start, earned_days=mask)
+            for (child_id, goal_id, week_start), mask in masks.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0012_dailyrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GoalWeekRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("week_start", models.DateField(help_text="Monday of the week")),
+                (
+                    "earned_days",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Weekday mask (Monday = 1) of days the goal was earned on a day it applies to",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "child",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="goal_week_rollups",
+                        to="tracker.child",
+                    ),
+                ),
+                (
+                    "goal",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="week_rollups",
+                        to="tracker.screentimegoal",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-week_start", "child", "goal"],
+                "unique_together": {("child", "goal", "week_start")},
+            },
+        ),
+        migrations.RunPython(populate_goal_rollups, migrations.RunPython.noop),
+    ]
@@ -2,10 +2,29 @@
 Models for the Screen Time Tracker application.
 """
 from django.db import models
+from django.db.models import Case, F, Value, When
 from django.utils import timezone
 from datetime import datetime, timedelta
 
 
+# Bit assigned to each weekday in ScreenTimeGoal.applies_to_days_mask (Monday is bit 0)
+WEEKDAY_BITS = {'mon': 1, 'tue': 2, 'wed': 4, 'thu': 8, 'fri': 16, 'sat': 32, 'sun': 64}
+ALL_DAYS_MASK = 127
+
+
+def days_to_mask(applies_to_days):
+    """Convert a comma-separated day list (e.g. 'mon,wed') to a weekday bitmask."""
+    mask = 0
+    for day in (applies_to_days or '').split(','):
+        mask |= WEEKDAY_BITS.get(day.strip(), 0)
+    return mask
+
+
+def weekday_bit(day):
+    """Return the mask bit for the weekday of `day`."""
+    return 1 << day.weekday()
+
+
 class Child(models.Model):
     """Model representing a child to track screen time for."""
     name = models.CharField(max_length=100)
@@ -19,6 +38,9 @@ class Child(models.Model):
     class Meta:
         ordering = ['name']
         verbose_name_plural = "children"
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return self.name
@@ -30,6 +52,13 @@ class Child(models.Model):
         return monday
 
 
+class ScreenTimeGoalQuerySet(models.QuerySet):
+    def applies_on(self, day):
+        """Goals scheduled for the weekday of `day`, filtered in SQL."""
+        bit = weekday_bit(day)
+        return self.alias(day_bit=F('applies_to_days_mask').bitand(bit)).filter(day_bit=bit)
+
+
 class ScreenTimeGoal(models.Model):
     """Model representing a daily screen time goal for children."""
     GOAL_TYPES = [
@@ -82,25 +111,66 @@ class ScreenTimeGoal(models.Model):
         default='mon,tue,wed,thu,fri,sat,sun',
         help_text="Comma-separated days (mon,tue,wed,thu,fri,sat,sun)"
     )
+    applies_to_days_mask = models.PositiveSmallIntegerField(
+        default=ALL_DAYS_MASK,
+        editable=False,
+        help_text="Weekday bitmask kept in sync with applies_to_days (Monday is bit 0)"
+    )
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0, help_text="Order of display for goals")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ScreenTimeGoalQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['is_active', 'applies_to_days_mask']),
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         child_names = ', '.join([c.name for c in self.children.all()])
         return f"{self.name} ({child_names})" if child_names else self.name
     
+    def save(self, *args, **kwargs):
+        self.applies_to_days_mask = days_to_mask(self.applies_to_days)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'applies_to_days' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'applies_to_days_mask'}
+        super().save(*args, **kwargs)
+    
+    def applies_on(self, day):
+        """Check if this goal applies on the weekday of `day`."""
+        return bool(self.applies_to_days_mask & weekday_bit(day))
+    
     def applies_today(self):
         """Check if this goal applies today."""
-        today = timezone.now().date()
-        day_map = {0: 'mon', 1: 'tue', 2: 'wed', 3: 'thu', 4: 'fri', 5: 'sat', 6: 'sun'}
-        today_code = day_map[today.weekday()]
-        days_list = [d.strip() for d in self.applies_to_days.split(',')]
-        return today_code in days_list
+        return self.applies_on(timezone.now().date())
+    
+    def minutes_for(self, status, actual_minutes=0, bonus_earned=False):
+        """Screen time minutes a tracking with these values earns for this goal."""
+        if status != 'earned':
+            return 0
+        if self.goal_type == 'tracked':
+            # Tracked goals pay per completed hour
+            return (actual_minutes // 60) * self.reward_per_hour
+        return self.reward_minutes + (self.bonus_minutes if bonus_earned else 0)
+
+
+class DailyTrackingQuerySet(models.QuerySet):
+    def on_applicable_days(self):
+        """Trackings whose goal is scheduled for the tracking's weekday, filtered in SQL."""
+        day_bit = Case(
+            *[When(date__iso_week_day=index + 1, then=Value(1 << index)) for index in range(7)],
+            output_field=models.IntegerField(),
+        )
+        return (
+            self.alias(day_bit=day_bit)
+            .alias(day_applies=F('goal__applies_to_days_mask').bitand(F('day_bit')))
+            .filter(day_applies__gt=0)
+        )
 
 
 class DailyTracking(models.Model):
@@ -124,12 +194,15 @@ class DailyTracking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = DailyTrackingQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-date', 'goal']
         unique_together = ['child', 'goal', 'date']
         indexes = [
             models.Index(fields=['child', 'date', 'goal']),
             models.Index(fields=['goal', 'date']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
@@ -149,6 +222,7 @@ class AdhocReward(models.Model):
         ordering = ['-awarded_date', '-created_at']
         indexes = [
             models.Index(fields=['child', 'awarded_date']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
@@ -168,6 +242,7 @@ class AdhocPenalty(models.Model):
         ordering = ['-applied_date', '-created_at']
         indexes = [
             models.Index(fields=['child', 'applied_date']),
+            models.Index(fields=['updated_at']),
         ]
         verbose_name_plural = "penalties"
     
@@ -188,8 +263,108 @@ class ScreenTimeUsage(models.Model):
         ordering = ['-date']
         indexes = [
             models.Index(fields=['child', 'date']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
         return f"{self.child.name} - {self.minutes_used} mins used on {self.date}"
 
+
+
+class WeeklyBalance(models.Model):
+    """Materialized weekly totals for a child, maintained on every write."""
+    child = models.ForeignKey(Child, on_delete=models.CASCADE, related_name='weekly_balances')
+    week_start = models.DateField(help_text="Monday of the week")
+    earned_minutes = models.IntegerField(
+        default=0,
+        help_text="Goal earnings counted toward this week, including Sunday rollover"
+    )
+    adhoc_reward_minutes = models.IntegerField(default=0, help_text="Ad-hoc rewards awarded this week")
+    adhoc_penalty_minutes = models.IntegerField(default=0, help_text="Ad-hoc penalties applied this week")
+    used_minutes = models.IntegerField(default=0, help_text="Screen time used this week")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-week_start', 'child']
+        unique_together = ['child', 'week_start']
+    
+    def __str__(self):
+        return f"{self.child.name} - week of {self.week_start}"
+
+
+class DailyRollup(models.Model):
+    """Materialized per-day totals for a child, maintained on every write.
+
+    A week or month of history is the sum of at most 7 or 31 of these rows.
+    """
+    child = models.ForeignKey(Child, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+    earned_minutes = models.IntegerField(
+        default=0,
+        help_text="Goal earnings counted toward this day; Sunday rollover earnings land on the Monday"
+    )
+    goals_earned = models.IntegerField(default=0, help_text="Trackings earned on a day their goal applies to")
+    goals_applicable = models.IntegerField(default=0, help_text="Trackings recorded on a day their goal applies to")
+    adhoc_plus = models.IntegerField(default=0, help_text="Ad-hoc reward minutes awarded this day")
+    adhoc_minus = models.IntegerField(default=0, help_text="Ad-hoc penalty minutes applied this day")
+    used_minutes = models.IntegerField(default=0, help_text="Screen time used this day")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date', 'child']
+        unique_together = ['child', 'date']
+    
+    def __str__(self):
+        return f"{self.child.name} - {self.date}"
+
+
+class GoalWeekRollup(models.Model):
+    """Days of one week a child earned a goal, maintained on every write.
+
+    Each goal's completion over a week or month of history is read from at
+    most 5 of these rows instead of its trackings.
+    """
+    child = models.ForeignKey(Child, on_delete=models.CASCADE, related_name='goal_week_rollups')
+    goal = models.ForeignKey(ScreenTimeGoal, on_delete=models.CASCADE, related_name='week_rollups')
+    week_start = models.DateField(help_text="Monday of the week")
+    earned_days = models.IntegerField(
+        default=0,
+        help_text="Weekday mask (Monday = 1) of days the goal was earned on a day it applies to"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-week_start', 'child', 'goal']
+        unique_together = ['child', 'goal', 'week_start']
+    
+    def __str__(self):
+        return f"{self.child.name} - {self.goal.name} - {self.week_start}"
+
+
+class Tombstone(models.Model):
+    """Marker left behind by a deleted row so delta sync clients can drop their copy."""
+    model = models.CharField(max_length=50, help_text="Model name of the deleted row, e.g. 'dailytracking'")
+    object_id = models.PositiveIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at}"
+
+
+class ClientMutation(models.Model):
+    """A mutation replayed from a client's offline queue, recorded so retries apply it once."""
+    id = models.UUIDField(primary_key=True, help_text="Id the client generated for the mutation")
+    result = models.JSONField(default=dict, help_text="Outcome returned to the client")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.id} ({self.result.get('status', 'pending')})"
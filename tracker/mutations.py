@@ -0,0 +1,193 @@
+"""
+Replay of mutations queued by offline clients.
+
+Each mutation carries the id the client queued it under and the version of
+the row it was based on. Mutations apply in order, each in its own
+transaction, and are recorded as ClientMutation rows so a batch retried
+after a lost response applies nothing twice. Records are kept for
+MUTATION_RETENTION_DAYS; `prune_mutations` removes older ones.
+
+Conflicts are settled with `updated_at`: when the stored row changed since
+the version the client edited, the server copy wins and is sent back. The
+version is the row's `updated_at` as the client last saw it, or a ref to an
+earlier mutation in the same queue that wrote the row, so a device's own
+queued edits never conflict with each other.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AdhocPenalty, AdhocReward, ClientMutation, DailyTracking, ScreenTimeUsage
+from .serializers import (
+    AdhocPenaltySerializer, AdhocRewardSerializer, DailyTrackingSerializer,
+    MutationSerializer, ScreenTimeUsageSerializer,
+)
+from .upserts import upsert_tracking, validate_upsert
+
+
+MAX_BATCH_SIZE = 100
+
+ENTRY_MODELS = {
+    'reward': (AdhocReward, AdhocRewardSerializer),
+    'penalty': (AdhocPenalty, AdhocPenaltySerializer),
+    'usage': (ScreenTimeUsage, ScreenTimeUsageSerializer),
+}
+
+
+def _result(mutation_id, status, obj=None, errors=None):
+    result = {'id': str(mutation_id) if mutation_id is not None else None, 'status': status, 'object': obj}
+    if errors:
+        result['errors'] = errors
+    return result
+
+
+def _applied_record(mutation_id):
+    """Return the applied ClientMutation with a stored object for `mutation_id`, or None."""
+    try:
+        record = ClientMutation.objects.filter(pk=mutation_id).first()
+    except ValidationError:
+        return None
+    if record is None or record.result.get('status') != 'applied' or not record.result.get('object'):
+        return None
+    return record
+
+
+def _is_stale(instance, base):
+    """Whether the stored row changed since the version the client edited.
+
+    `base` is the row's `updated_at` as the client last saw it (None when it
+    never saw the row), or {"ref": ...} to the earlier mutation in the queue
+    that wrote it. A ref to a mutation that did not apply is always stale:
+    the edit builds on a change the server never took.
+    """
+    if isinstance(base, dict):
+        record = _applied_record(base.get('ref'))
+        if record is None:
+            return True
+        stamp = record.result['object'].get('updated_at')
+        base = parse_datetime(stamp) if stamp else None
+    return base is not None and instance.updated_at > base
+
+
+def _resolve_pk(pk):
+    """Return the row id `pk` refers to, following {"ref": ...} to an earlier create."""
+    if isinstance(pk, dict):
+        record = _applied_record(pk.get('ref'))
+        return record.result['object']['id'] if record is not None else None
+    if isinstance(pk, int) and not isinstance(pk, bool):
+        return pk
+    return None
+
+
+def _apply_tracking(mutation):
+    data, child, goal, errors = validate_upsert(mutation['data'])
+    if errors:
+        return 'invalid', None, errors
+    stored = DailyTracking.objects.select_for_update().filter(child=child, goal=goal, date=data['date']).first()
+    if stored is not None and _is_stale(stored, mutation.get('base_updated_at')):
+        return 'conflict', DailyTrackingSerializer(stored).data, None
+    tracking, _ = upsert_tracking(child, goal, data['date'], data)
+    return 'applied', DailyTrackingSerializer(tracking).data, None
+
+
+def _apply_entry(mutation):
+    model, serializer_class = ENTRY_MODELS[mutation['model']]
+    op = mutation['op']
+    if op == 'create':
+        serializer = serializer_class(data=mutation['data'])
+        if not serializer.is_valid():
+            return 'invalid', None, serializer.errors
+        serializer.save()
+        return 'applied', serializer.data, None
+
+    pk = _resolve_pk(mutation['pk'])
+    if pk is None:
+        return 'invalid', None, {'pk': ['Does not match a row or an applied create.']}
+    instance = model.objects.select_for_update().filter(pk=pk).first()
+    if instance is None:
+        # Deleting a row that is already gone is a no-op; an update loses to the deletion
+        return ('applied' if op == 'delete' else 'conflict'), None, None
+    if _is_stale(instance, mutation.get('base_updated_at')):
+        return 'conflict', serializer_class(instance).data, None
+    if op == 'delete':
+        instance.delete()
+        return 'applied', None, None
+    serializer = serializer_class(instance, data=mutation['data'], partial=True)
+    if not serializer.is_valid():
+        return 'invalid', None, serializer.errors
+    serializer.save()
+    return 'applied', serializer.data, None
+
+
+def _apply(mutation):
+    """Apply a mutation in a savepoint and return its (status, object, errors).
+
+    An IntegrityError raised while applying, such as a row the change points
+    at being deleted meanwhile, is rolled back and reported as an 'error'
+    result for this item alone.
+    """
+    apply = _apply_tracking if mutation['model'] == 'tracking' else _apply_entry
+    try:
+        with transaction.atomic():
+            status, obj, errors = apply(mutation)
+    except IntegrityError:
+        return 'error', None, {'non_field_errors': ['The change clashes with stored data and was not applied.']}
+    return status, obj and dict(obj), errors
+
+
+def apply_mutation(mutation):
+    """Apply one validated mutation unless it was applied before, and return its result.
+
+    Results of replayed mutations are the stored ones, flagged `replayed`.
+    """
+    record = ClientMutation.objects.filter(pk=mutation['id']).first()
+    if record is None:
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    record = ClientMutation.objects.create(id=mutation['id'])
+            except IntegrityError as exc:
+                # A concurrent replay of the same mutation got there first
+                duplicate = exc
+            else:
+                record.result = _result(mutation['id'], *_apply(mutation))
+                record.save(update_fields=['result'])
+                return record.result
+        record = ClientMutation.objects.filter(pk=mutation['id']).first()
+        if record is None:
+            raise duplicate
+    return {**record.result, 'replayed': True}
+
+
+def prune_mutations(days=None):
+    """Delete mutation records older than the retention period; returns how many were removed.
+
+    A queue retried after its records are pruned would be applied again, so
+    keep them longer than a device is expected to stay offline.
+    """
+    if days is None:
+        days = getattr(settings, 'MUTATION_RETENTION_DAYS', 30)
+    count, _ = ClientMutation.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return count
+
+
+def apply_mutations(items):
+    """Apply a batch of queued mutations in order and return one result per item.
+
+    Each result has the mutation `id`, a `status` of 'applied', 'conflict',
+    'invalid' or 'error', the row as now stored in `object` (None when
+    deleted) and, for invalid and error items, `errors`.
+    """
+    results = []
+    for item in items:
+        serializer = MutationSerializer(data=item)
+        if not serializer.is_valid():
+            mutation_id = item.get('id') if isinstance(item, dict) else None
+            results.append(_result(mutation_id, 'invalid', errors=serializer.errors))
+            continue
+        results.append(apply_mutation(serializer.validated_data))
+    return results
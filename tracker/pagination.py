@@ -0,0 +1,43 @@
+"""
+Keyset (cursor) pagination helpers for the tracker API.
+"""
+import base64
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+class TrackingKeysetPagination:
+    """Keyset pagination over one child's trackings ordered by (date, goal_id).
+
+    Within a child, (date, goal_id) is unique, so the last row of a page
+    identifies the next page exactly and each page is a range scan on the
+    (child, date, goal) index, however deep into history it is.
+    """
+    page_size = 100
+    max_page_size = 500
+    
+    def encode_cursor(self, tracking):
+        position = f'{tracking.date.isoformat()}:{tracking.goal_id}'
+        return base64.urlsafe_b64encode(position.encode()).decode()
+    
+    def decode_cursor(self, cursor):
+        try:
+            day, goal_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+            return date.fromisoformat(day), int(goal_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({'cursor': ['Invalid cursor.']})
+    
+    def paginate(self, queryset, cursor=None, page_size=None):
+        """Return (rows, next_cursor) for the page after `cursor`."""
+        page_size = min(page_size or self.page_size, self.max_page_size)
+        queryset = queryset.order_by('date', 'goal_id')
+        if cursor:
+            day, goal_id = self.decode_cursor(cursor)
+            queryset = queryset.filter(Q(date__gt=day) | Q(date=day, goal_id__gt=goal_id))
+        rows = list(queryset[:page_size + 1])
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            return rows, self.encode_cursor(rows[-1])
+        return rows, None
@@ -0,0 +1,322 @@
+"""
+Incremental maintenance of the materialized DailyRollup and GoalWeekRollup tables.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import summary_cache
+from .models import DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage, DailyRollup, GoalWeekRollup, weekday_bit
+from .summaries import earning_week
+
+
+ROLLUP_FIELDS = ['earned_minutes', 'goals_earned', 'goals_applicable', 'adhoc_plus', 'adhoc_minus', 'used_minutes']
+
+# model -> (date field, minutes field, rollup field) for rows that count toward
+# the day they fall on
+DATED_SOURCES = {
+    AdhocReward: ('awarded_date', 'minutes', 'adhoc_plus'),
+    AdhocPenalty: ('applied_date', 'minutes', 'adhoc_minus'),
+    ScreenTimeUsage: ('date', 'minutes_used', 'used_minutes'),
+}
+
+
+def _as_date(value):
+    return parse_date(value) if isinstance(value, str) else value
+
+
+def earning_day(day, rollover):
+    """Return the day an earned tracking on `day` counts toward.
+
+    Sunday earnings for rollover goals land on the following Monday, so
+    summing a week's rows gives the same total as its weekly balance.
+    """
+    return day + timedelta(days=1) if earning_week(day, rollover) > day else day
+
+
+def contributions(instance):
+    """Return the (child_id, date, field, amount) entries a row adds to the rollup table."""
+    if isinstance(instance, DailyTracking):
+        goal = instance.goal
+        day = _as_date(instance.date)
+        if not goal.applies_on(day):
+            return []
+        entries = [(instance.child_id, day, 'goals_applicable', 1)]
+        if instance.status == 'earned':
+            entries.append((instance.child_id, day, 'goals_earned', 1))
+            if instance.minutes_earned:
+                earned_on = earning_day(day, goal.rollover_sunday_to_next_week)
+                entries.append((instance.child_id, earned_on, 'earned_minutes', instance.minutes_earned))
+        return entries
+
+    date_field, minutes_field, rollup_field = DATED_SOURCES[type(instance)]
+    minutes = getattr(instance, minutes_field)
+    if not minutes:
+        return []
+    return [(instance.child_id, _as_date(getattr(instance, date_field)), rollup_field, minutes)]
+
+
+def goal_contributions(instance):
+    """Return the (child_id, goal_id, week_start, bit) entries a row adds to the goal rollups."""
+    if not isinstance(instance, DailyTracking) or instance.status != 'earned':
+        return []
+    day = _as_date(instance.date)
+    if not instance.goal.applies_on(day):
+        return []
+    return [(instance.child_id, instance.goal_id, day - timedelta(days=day.weekday()), weekday_bit(day))]
+
+
+def _adjust(child_id, day, deltas):
+    """Add `deltas` to one day's rollup fields, creating the row when adding."""
+    rows = DailyRollup.objects.filter(child_id=child_id, date=day)
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    changes['updated_at'] = timezone.now()
+    if rows.update(**changes) or not any(delta > 0 for delta in deltas.values()):
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(child_id=child_id, date=day, **deltas)
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(**changes)
+
+
+def apply_change(before, after):
+    """Move the rollup table from the `before` contributions to the `after` ones.
+
+    Changes to the same day are folded into one UPDATE.
+    """
+    net = defaultdict(lambda: defaultdict(int))
+    for child_id, day, field, amount in before:
+        net[(child_id, day)][field] -= amount
+    for child_id, day, field, amount in after:
+        net[(child_id, day)][field] += amount
+    for (child_id, day), deltas in net.items():
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if deltas:
+            _adjust(child_id, day, deltas)
+
+
+def apply_goal_change(before, after):
+    """Move the goal rollups from the `before` contributions to the `after` ones.
+
+    A (child, goal, date) has one tracking, so adding and removing a day's
+    bit is the same as setting and clearing it.
+    """
+    net = defaultdict(int)
+    for child_id, goal_id, week_start, bit in before:
+        net[(child_id, goal_id, week_start)] -= bit
+    for child_id, goal_id, week_start, bit in after:
+        net[(child_id, goal_id, week_start)] += bit
+    now = timezone.now()
+    for (child_id, goal_id, week_start), delta in net.items():
+        if not delta:
+            continue
+        rows = GoalWeekRollup.objects.filter(child_id=child_id, goal_id=goal_id, week_start=week_start)
+        if rows.update(earned_days=F('earned_days') + delta, updated_at=now) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                GoalWeekRollup.objects.create(child_id=child_id, goal_id=goal_id, week_start=week_start, earned_days=delta)
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(earned_days=F('earned_days') + delta, updated_at=now)
+
+
+def compute_daily_rollups(child_ids, start, end):
+    """Compute rollup fields for every day from `start` to `end` with one grouped query per table.
+
+    Returns a mapping of (child_id, date) -> rollup fields for days with any
+    activity. The Sunday before `start` is scanned for rolled-over earnings.
+    """
+    rollups = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+    earned = Q(status='earned')
+    rows = (
+        DailyTracking.objects
+        .filter(child_id__in=child_ids, date__gte=start - timedelta(days=1), date__lte=end)
+        .on_applicable_days()
+        .values('child_id', 'date', 'goal__rollover_sunday_to_next_week')
+        .annotate(
+            applicable=Count('pk'),
+            earned=Count('pk', filter=earned),
+            minutes=Sum('minutes_earned', filter=earned),
+        )
+        .order_by()
+    )
+    for row in rows:
+        child_id, day = row['child_id'], row['date']
+        earned_on = earning_day(day, row['goal__rollover_sunday_to_next_week'])
+        if start <= earned_on <= end and row['minutes']:
+            rollups[(child_id, earned_on)]['earned_minutes'] += row['minutes']
+        if day >= start:
+            rollups[(child_id, day)]['goals_applicable'] += row['applicable']
+            rollups[(child_id, day)]['goals_earned'] += row['earned']
+
+    for model, (date_field, minutes_field, rollup_field) in DATED_SOURCES.items():
+        totals = (
+            model.objects
+            .filter(child_id__in=child_ids, **{f'{date_field}__gte': start, f'{date_field}__lte': end})
+            .values('child_id', date_field)
+            .annotate(total=Sum(minutes_field))
+            .order_by()
+        )
+        for row in totals:
+            if row['total']:
+                rollups[(row['child_id'], row[date_field])][rollup_field] += row['total']
+    return dict(rollups)
+
+
+def compute_goal_rollups(child_ids, first_week, last_week):
+    """Compute the earned-day masks of every goal for the weeks from `first_week` to `last_week` (Mondays).
+
+    Returns a mapping of (child_id, goal_id, week_start) -> mask for weeks
+    with any earned day.
+    """
+    masks = defaultdict(int)
+    rows = (
+        DailyTracking.objects
+        .filter(child_id__in=child_ids, status='earned', date__gte=first_week, date__lte=last_week + timedelta(days=6))
+        .on_applicable_days()
+        .values_list('child_id', 'goal_id', 'date')
+        .order_by()
+    )
+    for child_id, goal_id, day in rows:
+        masks[(child_id, goal_id, day - timedelta(days=day.weekday()))] |= weekday_bit(day)
+    return dict(masks)
+
+
+def refresh_goal_rollups(child_ids, start, end):
+    """Recompute stored goal rollups for `child_ids` for the weeks overlapping `start` to `end`."""
+    first_week = start - timedelta(days=start.weekday())
+    last_week = end - timedelta(days=end.weekday())
+    live = compute_goal_rollups(child_ids, first_week, last_week)
+    now = timezone.now()
+    with transaction.atomic():
+        existing = GoalWeekRollup.objects.filter(
+            child_id__in=child_ids, week_start__gte=first_week, week_start__lte=last_week
+        )
+        for rollup in existing:
+            key = (rollup.child_id, rollup.goal_id, rollup.week_start)
+            if rollup.earned_days == live.get(key, 0):
+                live.pop(key, None)
+            else:
+                live[key] = live.get(key, 0)
+        if not live:
+            return
+        conflict_target = {}
+        if connection.features.supports_update_conflicts_with_target:
+            conflict_target['unique_fields'] = ['child', 'goal', 'week_start']
+        GoalWeekRollup.objects.bulk_create(
+            [
+                GoalWeekRollup(
+                    child_id=child_id, goal_id=goal_id, week_start=week_start, earned_days=mask, updated_at=now
+                )
+                for (child_id, goal_id, week_start), mask in live.items()
+            ],
+            update_conflicts=True,
+            update_fields=['earned_days', 'updated_at'],
+            **conflict_target
+        )
+
+
+def refresh_rollups(child_ids, start, end):
+    """Recompute stored rollups for `child_ids` for the days from `start` to `end`.
+
+    Changed and missing days are written with one upsert, so the number of
+    queries does not depend on which days already had a row. The goal
+    rollups of the weeks those days fall in are recomputed too, and cached
+    summaries of `child_ids` are invalidated.
+    """
+    refresh_goal_rollups(child_ids, start, end)
+    live = compute_daily_rollups(child_ids, start, end)
+    now = timezone.now()
+    with transaction.atomic():
+        summary_cache.invalidate(*child_ids)
+        existing = DailyRollup.objects.filter(child_id__in=child_ids, date__gte=start, date__lte=end)
+        for rollup in existing:
+            values = live.get((rollup.child_id, rollup.date), dict.fromkeys(ROLLUP_FIELDS, 0))
+            if all(getattr(rollup, field) == values[field] for field in ROLLUP_FIELDS):
+                live.pop((rollup.child_id, rollup.date), None)
+            else:
+                live[(rollup.child_id, rollup.date)] = values
+        if not live:
+            return
+        conflict_target = {}
+        if connection.features.supports_update_conflicts_with_target:
+            conflict_target['unique_fields'] = ['child', 'date']
+        DailyRollup.objects.bulk_create(
+            [
+                DailyRollup(child_id=child_id, date=day, updated_at=now, **values)
+                for (child_id, day), values in live.items()
+            ],
+            update_conflicts=True,
+            update_fields=ROLLUP_FIELDS + ['updated_at'],
+            **conflict_target
+        )
+
+
+def refresh_rows(rows):
+    """Recompute the days touched by rows written without post_save signals."""
+    if not rows:
+        return
+    days = []
+    for row in rows:
+        date_field = DATED_SOURCES[type(row)][0] if type(row) in DATED_SOURCES else 'date'
+        days.append(_as_date(getattr(row, date_field)))
+    # Sunday rollover can push earnings onto the following Monday
+    refresh_rollups({row.child_id for row in rows}, min(days), max(days) + timedelta(days=1))
+
+
+def refresh_goal_days(goal):
+    """Recompute every day touched by a goal's trackings after its schedule changed."""
+    trackings = DailyTracking.objects.filter(goal=goal)
+    span = trackings.aggregate(first=Min('date'), last=Max('date'))
+    if span['first'] is None:
+        return
+    child_ids = list(trackings.values_list('child_id', flat=True).distinct().order_by())
+    refresh_rollups(child_ids, span['first'], span['last'] + timedelta(days=1))
+
+
+def activity_span(child_id):
+    """Return the first and last day with any source row for a child, or None."""
+    spans = [DailyTracking.objects.filter(child_id=child_id).aggregate(first=Min('date'), last=Max('date'))]
+    for model, (date_field, _, _) in DATED_SOURCES.items():
+        spans.append(model.objects.filter(child_id=child_id).aggregate(first=Min(date_field), last=Max(date_field)))
+    firsts = [span['first'] for span in spans if span['first']]
+    lasts = [span['last'] for span in spans if span['last']]
+    if not firsts:
+        return None
+    return min(firsts), max(lasts) + timedelta(days=1)
+
+
+def backfill(child_ids, chunk_days):
+    """Rebuild the rollups of `child_ids` a child and `chunk_days` days at a time.
+
+    Only one chunk's source aggregates and rollup rows are held in memory at
+    once, and each chunk is written in its own transaction. Rollups outside
+    a child's activity are removed. Yields (child_id, chunk_start, chunk_end)
+    after each chunk.
+    """
+    for child_id in child_ids:
+        span = activity_span(child_id)
+        stale = DailyRollup.objects.filter(child_id=child_id)
+        stale_goals = GoalWeekRollup.objects.filter(child_id=child_id)
+        if span is None:
+            stale.delete()
+            stale_goals.delete()
+            continue
+        first, last = span
+        stale.exclude(date__gte=first, date__lte=last).delete()
+        stale_goals.exclude(
+            week_start__gte=first - timedelta(days=first.weekday()), week_start__lte=last
+        ).delete()
+        start = first
+        while start <= last:
+            end = min(start + timedelta(days=chunk_days - 1), last)
+            refresh_rollups([child_id], start, end)
+            yield child_id, start, end
+            start = end + timedelta(days=1)
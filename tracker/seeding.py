@@ -0,0 +1,175 @@
+"""
+Generate realistic households for benchmarks and local testing.
+
+Children and goals are created one by one (bulk_create cannot return ids on
+MySQL); the dated rows are bulk inserted in batches, which skips the signal
+receivers, so weekly balances and cached summaries for the new children are
+refreshed once at the end. `endpoint_requests` lists a request for every
+API endpoint, for timing or counting queries against a seeded household.
+"""
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import balances, rollups, summary_cache
+from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage
+from .summaries import week_bounds
+
+
+GOAL_NAMES = ['Reading', 'Math Practice', 'Homework', 'Piano', 'Chores', 'Exercise', 'Tidy Room', 'Brush Teeth']
+SCHEDULES = ['mon,tue,wed,thu,fri,sat,sun', 'mon,tue,wed,thu,fri', 'sat,sun', 'mon,wed,fri']
+REWARD_REASONS = ['Helped with dinner', 'Kind to sibling', 'Extra chores', 'Good report']
+PENALTY_REASONS = ['Late to bed', 'Screen time overrun', 'Argued', 'Left a mess']
+
+
+def _insert(model, rows, batch_size):
+    """Bulk insert rows from an iterator without holding them all in memory; returns the count."""
+    count = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return count
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        count += len(batch)
+
+
+def _goal_name(index):
+    """'Reading', ..., 'Brush Teeth', then 'Reading 2' and so on."""
+    name = GOAL_NAMES[index % len(GOAL_NAMES)]
+    cycle = index // len(GOAL_NAMES)
+    return f'{name} {cycle + 1}' if cycle else name
+
+
+def _trackings(rng, children, goals, days):
+    for day in days:
+        for goal in goals:
+            if not goal.applies_on(day):
+                continue
+            for child in children:
+                status = 'earned' if rng.random() < 0.7 else 'not_earned'
+                actual = rng.randrange(0, 150, 15) if goal.goal_type == 'tracked' else 0
+                bonus = status == 'earned' and rng.random() < 0.3
+                yield DailyTracking(
+                    child=child, goal=goal, date=day, status=status, actual_minutes=actual,
+                    bonus_earned=bonus, minutes_earned=goal.minutes_for(status, actual, bonus),
+                )
+
+
+def _entries(rng, children, days, rewards_per_week, penalties_per_week):
+    for day in days:
+        for child in children:
+            if rng.random() < rewards_per_week / 7:
+                yield AdhocReward(
+                    child=child, awarded_date=day, minutes=rng.choice([5, 10, 15, 30]),
+                    reason=rng.choice(REWARD_REASONS),
+                )
+            if rng.random() < penalties_per_week / 7:
+                yield AdhocPenalty(
+                    child=child, applied_date=day, minutes=rng.choice([5, 10, 15]),
+                    reason=rng.choice(PENALTY_REASONS),
+                )
+
+
+def _usage(rng, children, days):
+    for day in days:
+        for child in children:
+            yield ScreenTimeUsage(child=child, date=day, minutes_used=rng.randrange(0, 181, 5))
+
+
+def seed_household(children=3, goals=6, days=365, end=None, rewards_per_week=2, penalties_per_week=1,
+                   seed=0, batch_size=1000):
+    """Create a household of `children` sharing `goals`, with `days` of history ending on `end`.
+
+    Every child gets a tracking for each goal on each day the goal applies,
+    a usage entry every day, and ad-hoc rewards and penalties at about the
+    given weekly rates. The same `seed` always produces the same rows.
+    Returns the number of rows created per model name.
+    """
+    rng = random.Random(seed)
+    end = end or timezone.now().date()
+    first = end - timedelta(days=days - 1)
+    dates = [first + timedelta(days=offset) for offset in range(days)]
+
+    with transaction.atomic():
+        offset = Child.objects.count()
+        household = [
+            Child.objects.create(name=f'Child {offset + index + 1}', baseline_weekly_minutes=rng.choice([60, 90, 120]))
+            for index in range(children)
+        ]
+        goal_list = []
+        for index in range(goals):
+            tracked = index % 3 == 2
+            goal = ScreenTimeGoal.objects.create(
+                name=_goal_name(index),
+                goal_type='tracked' if tracked else 'binary',
+                reward_minutes=0 if tracked else rng.choice([5, 10, 15]),
+                reward_per_hour=30 if tracked else 0,
+                target_minutes=60 if tracked else 0,
+                applies_to_days=SCHEDULES[index % len(SCHEDULES)],
+                rollover_sunday_to_next_week=index % 4 == 1,
+                order=index,
+            )
+            goal.children.set(household)
+            goal_list.append(goal)
+
+        counts = {
+            'child': len(household),
+            'screentimegoal': len(goal_list),
+            'dailytracking': _insert(DailyTracking, _trackings(rng, household, goal_list, dates), batch_size),
+            'adhocreward': 0,
+            'adhocpenalty': 0,
+            'screentimeusage': _insert(ScreenTimeUsage, _usage(rng, household, dates), batch_size),
+        }
+        entries = list(_entries(rng, household, dates, rewards_per_week, penalties_per_week))
+        for model in (AdhocReward, AdhocPenalty):
+            counts[model._meta.model_name] = _insert(
+                model, (entry for entry in entries if isinstance(entry, model)), batch_size
+            )
+
+        if household and dates:
+            start, _ = week_bounds(first)
+            last, _ = week_bounds(end)
+            # Sunday rollover can push earnings into the following week
+            balances.refresh_balances([child.pk for child in household], start, last + timedelta(days=7))
+            rollups.refresh_rollups([child.pk for child in household], first, end + timedelta(days=1))
+        summary_cache.invalidate(*[child.pk for child in household])
+    return counts
+
+
+def endpoint_requests(child, goal_ids, day):
+    """(name, method, url, JSON body) exercising every API endpoint for one child and day.
+
+    `goal_ids` are the child's goals in display order. The writes leave the
+    data as they found it, so the requests can be repeated.
+    """
+    week_ago = day - timedelta(days=6)
+    month_ago = day - timedelta(days=27)
+    year_ago = day - timedelta(days=364)
+    return [
+        ('children_list', 'get', '/api/children/', None),
+        ('child_detail', 'get', f'/api/children/{child}/', None),
+        ('daily_summary', 'get', f'/api/children/{child}/daily_summary/?date={day}', None),
+        ('weekly_summary', 'get', f'/api/children/{child}/weekly_summary/?date={day}', None),
+        ('weekly_ledger', 'get', f'/api/children/{child}/weekly_ledger/?date={day}', None),
+        ('history_weeks', 'get', f'/api/children/{child}/history/?start={year_ago}&end={day}&bucket=week', None),
+        ('history_months', 'get', f'/api/children/{child}/history/?start={year_ago}&end={day}&bucket=month', None),
+        ('dashboard', 'get', f'/api/children/dashboard/?date={day}', None),
+        ('bootstrap', 'get', f'/api/bootstrap/?child_id={child}&date={day}', None),
+        ('goals_list', 'get', f'/api/goals/?child_id={child}', None),
+        ('tracking_list_day', 'get', f'/api/daily-tracking/?child_id={child}&date={day}', None),
+        ('tracking_list_page', 'get', f'/api/daily-tracking/?child_id={child}', None),
+        ('tracking_batch_week', 'post', '/api/daily-tracking/batch/',
+         {'child_id': child, 'start': str(week_ago), 'end': str(day)}),
+        ('tracking_batch_month', 'post', '/api/daily-tracking/batch/',
+         {'child_id': child, 'start': str(month_ago), 'end': str(day), 'page_size': 500}),
+        ('adhoc_rewards_list', 'get', f'/api/adhoc-rewards/?child_id={child}&date={day}', None),
+        ('adhoc_penalties_list', 'get', f'/api/adhoc-penalties/?child_id={child}&date={day}', None),
+        ('usage_list', 'get', f'/api/screen-time-usage/?child_id={child}&date={day}', None),
+        ('sync_full', 'get', '/api/sync/', None),
+        ('tracking_upsert', 'put', '/api/daily-tracking/upsert/',
+         {'child': child, 'goal': goal_ids[0], 'date': str(day), 'status': 'earned'}),
+        ('goal_reorder', 'post', '/api/goals/reorder/', {'goals': goal_ids}),
+    ]
@@ -1,8 +1,11 @@
 """
 Serializers for the Screen Time Tracker API.
 """
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage
+from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage, WEEKDAY_BITS
 
 
 class ScreenTimeGoalSerializer(serializers.ModelSerializer):
@@ -18,16 +21,28 @@ class ScreenTimeGoalSerializer(serializers.ModelSerializer):
         model = ScreenTimeGoal
         fields = [
             'id', 'name', 'goal_type', 'reward_minutes', 'reward_per_hour', 'bonus_minutes',
-            'target_minutes', 'applies_to_days', 'rollover_sunday_to_next_week',
+            'target_minutes', 'applies_to_days', 'applies_to_days_mask', 'rollover_sunday_to_next_week',
             'is_active', 'order', 'children', 'child_ids'
         ]
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'applies_to_days_mask']
+    
+    def validate_applies_to_days(self, value):
+        days = [d.strip() for d in value.split(',') if d.strip()]
+        unknown = [d for d in days if d not in WEEKDAY_BITS]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown day codes: {', '.join(unknown)}")
+        return ','.join(days)
     
     def get_children(self, obj):
         return [{'id': child.id, 'name': child.name} for child in obj.children.all()]
 
 
 class DailyTrackingSerializer(serializers.ModelSerializer):
+    """Reads and writes single trackings.
+
+    `minutes_earned` is read-only: like every other tracking write path it is
+    computed on the server from the goal's reward settings.
+    """
     goal_name = serializers.CharField(source='goal.name', read_only=True)
     child_name = serializers.CharField(source='child.name', read_only=True)
     
@@ -35,9 +50,86 @@ class DailyTrackingSerializer(serializers.ModelSerializer):
         model = DailyTracking
         fields = [
             'id', 'child', 'child_name', 'goal', 'goal_name', 'date', 'status', 
-            'minutes_earned', 'actual_minutes', 'bonus_earned', 'notes'
+            'minutes_earned', 'actual_minutes', 'bonus_earned', 'notes', 'updated_at'
         ]
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'minutes_earned', 'updated_at']
+    
+    def validate(self, attrs):
+        def value(field):
+            if field in attrs:
+                return attrs[field]
+            if self.instance is not None:
+                return getattr(self.instance, field)
+            return DailyTracking._meta.get_field(field).get_default()
+        
+        attrs['minutes_earned'] = value('goal').minutes_for(
+            value('status'), value('actual_minutes'), value('bonus_earned')
+        )
+        return attrs
+
+
+class DailyTrackingUpsertSerializer(serializers.ModelSerializer):
+    """Validates one bulk upsert item without per-row database lookups.
+
+    Child and goal ids are checked for the whole batch at once, and the
+    (child, goal, date) uniqueness is the upsert key rather than an error.
+    `minutes_earned` is not accepted; the server computes it.
+    """
+    id = serializers.IntegerField(required=False)
+    child = serializers.IntegerField(required=False)
+    goal = serializers.IntegerField(required=False)
+    
+    class Meta:
+        model = DailyTracking
+        fields = [
+            'id', 'child', 'goal', 'date', 'status',
+            'actual_minutes', 'bonus_earned', 'notes'
+        ]
+        validators = []
+
+
+class TrackingBatchSerializer(serializers.Serializer):
+    """Parameters for fetching one child's trackings a page at a time."""
+    child_id = serializers.IntegerField()
+    goal_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    cursor = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    page_size = serializers.IntegerField(required=False, min_value=1)
+    
+    def validate(self, attrs):
+        if 'start' in attrs and 'end' in attrs and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({'end': ['Must not be before start.']})
+        return attrs
+
+
+class GoalReorderSerializer(serializers.Serializer):
+    """Goal ids in their new display order."""
+    goals = serializers.ListField(child=serializers.IntegerField(), allow_empty=True)
+    
+    def validate_goals(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError('Each goal may appear only once.')
+        return value
+
+
+class HistoryQuerySerializer(serializers.Serializer):
+    """Query parameters of a child's history: a date range and bucket size."""
+    # Roughly ten years, which keeps a weekly series to ~520 buckets
+    MAX_DAYS = 3660
+    
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    bucket = serializers.ChoiceField(choices=['week', 'month'], default='week')
+    
+    def validate(self, attrs):
+        end = attrs.setdefault('end', timezone.now().date())
+        start = attrs.setdefault('start', end - timedelta(days=364))
+        if start > end:
+            raise serializers.ValidationError({'end': ['Must not be before start.']})
+        if (end - start).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'start': [f'The range may span at most {self.MAX_DAYS} days.']})
+        return attrs
 
 
 class ChildDetailSerializer(serializers.ModelSerializer):
@@ -46,7 +138,7 @@ class ChildDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Child
         fields = ['id', 'name', 'baseline_weekly_minutes', 'goals', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
 
 
 class ChildListSerializer(serializers.ModelSerializer):
@@ -73,18 +165,18 @@ class AdhocRewardSerializer(serializers.ModelSerializer):
     class Meta:
         model = AdhocReward
         fields = [
-            'id', 'child', 'minutes', 'reason', 'awarded_date', 'created_at'
+            'id', 'child', 'minutes', 'reason', 'awarded_date', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
 
 
 class AdhocPenaltySerializer(serializers.ModelSerializer):
     class Meta:
         model = AdhocPenalty
         fields = [
-            'id', 'child', 'minutes', 'reason', 'applied_date', 'created_at'
+            'id', 'child', 'minutes', 'reason', 'applied_date', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
 
 
 class ScreenTimeUsageSerializer(serializers.ModelSerializer):
@@ -93,6 +185,40 @@ class ScreenTimeUsageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScreenTimeUsage
         fields = [
-            'id', 'child', 'child_name', 'date', 'minutes_used', 'notes', 'created_at'
+            'id', 'child', 'child_name', 'date', 'minutes_used', 'notes', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class MutationSerializer(serializers.Serializer):
+    """One entry of a client's offline mutation queue.
+
+    Trackings are replayed as upserts keyed on (child, goal, date); rewards,
+    penalties and usage entries are created, updated or deleted by `pk`,
+    which may be {"ref": <id of an earlier create mutation>} for rows
+    created while offline. `base_updated_at` is the version the edit was
+    made against: the row's `updated_at` as last fetched, or
+    {"ref": <id of an earlier mutation that wrote the row>}.
+    """
+    id = serializers.UUIDField()
+    model = serializers.ChoiceField(choices=['tracking', 'reward', 'penalty', 'usage'])
+    op = serializers.ChoiceField(choices=['upsert', 'create', 'update', 'delete'])
+    pk = serializers.JSONField(required=False)
+    data = serializers.DictField(required=False, default=dict)
+    base_updated_at = serializers.JSONField(required=False, allow_null=True)
+    
+    def validate_base_updated_at(self, value):
+        if isinstance(value, dict):
+            if 'ref' not in value:
+                raise serializers.ValidationError('Expected a timestamp or {"ref": <mutation id>}.')
+            return value
+        if value is None:
+            return None
+        return serializers.DateTimeField().to_internal_value(value)
+    
+    def validate(self, attrs):
+        if (attrs['model'] == 'tracking') != (attrs['op'] == 'upsert'):
+            raise serializers.ValidationError({'op': ['Trackings only support upsert; other models do not.']})
+        if attrs['op'] in ('update', 'delete') and 'pk' not in attrs:
+            raise serializers.ValidationError({'pk': ['This field is required.']})
+        return attrs
@@ -0,0 +1,167 @@
+"""
+Signal receivers keeping derived tracker data in sync with writes.
+"""
+from django.db.models.signals import m2m_changed, pre_delete, pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import balances, events, rollups, summary_cache
+from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage, Tombstone
+
+
+BALANCE_SOURCES = [DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage]
+
+# Sent by set-based writes (bulk_create/bulk_update) that bypass post_save.
+# Provides `instances` (rows as written) and `previous` (rows as they were).
+bulk_saved = Signal()
+
+
+def _snapshot_balance(sender, instance, **kwargs):
+    """Remember what the stored row contributed before it is overwritten."""
+    before = []
+    rollups_before = []
+    goal_rollups_before = []
+    instance._child_before = None
+    if instance.pk:
+        queryset = sender.objects.filter(pk=instance.pk)
+        if sender is DailyTracking:
+            queryset = queryset.select_related('goal')
+        old = queryset.first()
+        if old is not None:
+            before = balances.contributions(old)
+            rollups_before = rollups.contributions(old)
+            goal_rollups_before = rollups.goal_contributions(old)
+            instance._child_before = old.child_id
+    instance._balance_before = before
+    instance._rollups_before = rollups_before
+    instance._goal_rollups_before = goal_rollups_before
+
+
+def _update_balance(sender, instance, **kwargs):
+    before = getattr(instance, '_balance_before', [])
+    instance._balance_before = []
+    balances.apply_change(before, balances.contributions(instance))
+    rollups_before = getattr(instance, '_rollups_before', [])
+    instance._rollups_before = []
+    rollups.apply_change(rollups_before, rollups.contributions(instance))
+    goal_rollups_before = getattr(instance, '_goal_rollups_before', [])
+    instance._goal_rollups_before = []
+    rollups.apply_goal_change(goal_rollups_before, rollups.goal_contributions(instance))
+
+
+def _remove_balance(sender, instance, **kwargs):
+    balances.apply_change(balances.contributions(instance), [])
+    rollups.apply_change(rollups.contributions(instance), [])
+    rollups.apply_goal_change(rollups.goal_contributions(instance), [])
+
+
+for model in BALANCE_SOURCES:
+    pre_save.connect(_snapshot_balance, sender=model, dispatch_uid=f'balance-snapshot-{model.__name__}')
+    post_save.connect(_update_balance, sender=model, dispatch_uid=f'balance-update-{model.__name__}')
+    post_delete.connect(_remove_balance, sender=model, dispatch_uid=f'balance-remove-{model.__name__}')
+
+
+@receiver(bulk_saved)
+def refresh_bulk_balances(sender, instances, previous=(), **kwargs):
+    if sender in BALANCE_SOURCES:
+        balances.refresh_rows([*instances, *previous])
+        rollups.refresh_rows([*instances, *previous])
+        summary_cache.invalidate(*{row.child_id for row in [*instances, *previous]})
+        for instance in instances:
+            events.publish_change(instance, 'saved')
+
+
+def _invalidate_child_row(sender, instance, **kwargs):
+    summary_cache.invalidate(instance.child_id, getattr(instance, '_child_before', None))
+
+
+for model in BALANCE_SOURCES:
+    post_save.connect(_invalidate_child_row, sender=model, dispatch_uid=f'summary-save-{model.__name__}')
+    post_delete.connect(_invalidate_child_row, sender=model, dispatch_uid=f'summary-delete-{model.__name__}')
+
+
+def _publish_saved(sender, instance, **kwargs):
+    events.publish_change(instance, 'saved', getattr(instance, '_child_before', None))
+
+
+def _publish_deleted(sender, instance, **kwargs):
+    events.publish_change(instance, 'deleted')
+
+
+for model in BALANCE_SOURCES:
+    post_save.connect(_publish_saved, sender=model, dispatch_uid=f'events-save-{model.__name__}')
+    post_delete.connect(_publish_deleted, sender=model, dispatch_uid=f'events-delete-{model.__name__}')
+
+
+@receiver(post_save, sender=Child)
+@receiver(post_delete, sender=Child)
+def invalidate_child_summaries(sender, instance, **kwargs):
+    summary_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=ScreenTimeGoal)
+@receiver(pre_delete, sender=ScreenTimeGoal)
+def invalidate_goal_summaries(sender, instance, **kwargs):
+    # pre_delete: the goal's child links are gone by post_delete
+    summary_cache.invalidate(*instance.children.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=ScreenTimeGoal.children.through)
+def invalidate_assignment_summaries(sender, instance, action, reverse, pk_set, **kwargs):
+    """Goal/child assignments changed from either side of the relation."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # child.goals.add(...): `instance` is the child
+        summary_cache.invalidate(instance.pk)
+    elif action == 'pre_clear':
+        summary_cache.invalidate(*instance.children.values_list('pk', flat=True))
+    else:
+        summary_cache.invalidate(*pk_set)
+
+
+@receiver(pre_save, sender=ScreenTimeGoal)
+def snapshot_goal_schedule(sender, instance, **kwargs):
+    instance._schedule_before = None
+    if instance.pk:
+        instance._schedule_before = (
+            ScreenTimeGoal.objects
+            .filter(pk=instance.pk)
+            .values_list('applies_to_days_mask', 'rollover_sunday_to_next_week')
+            .first()
+        )
+
+
+@receiver(post_save, sender=ScreenTimeGoal)
+def refresh_goal_balances(sender, instance, created, **kwargs):
+    """Re-attribute existing earnings when a goal's days or rollover flag change."""
+    before = getattr(instance, '_schedule_before', None)
+    if created or before is None:
+        return
+    if before != (instance.applies_to_days_mask, instance.rollover_sunday_to_next_week):
+        balances.refresh_goal_weeks(instance)
+        rollups.refresh_goal_days(instance)
+
+
+def _record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(model=sender._meta.model_name, object_id=instance.pk)
+
+
+for model in [Child, ScreenTimeGoal, *BALANCE_SOURCES]:
+    post_delete.connect(_record_tombstone, sender=model, dispatch_uid=f'sync-tombstone-{model.__name__}')
+
+
+@receiver(m2m_changed, sender=ScreenTimeGoal.children.through)
+def touch_assigned_goals(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bump `updated_at` on goals whose children changed, so the sync feed resends them."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        goal_ids = [instance.pk]
+    elif action == 'pre_clear':
+        # child.goals.clear(): `instance` is the child
+        goal_ids = list(instance.goals.values_list('pk', flat=True))
+    else:
+        goal_ids = list(pk_set)
+    if goal_ids:
+        ScreenTimeGoal.objects.filter(pk__in=goal_ids).update(updated_at=timezone.now())
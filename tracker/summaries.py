@@ -0,0 +1,482 @@
+"""
+Summary calculations shared by the Screen Time Tracker API views.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import (
+    ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage, WeeklyBalance, DailyRollup,
+    GoalWeekRollup,
+)
+from .serializers import (
+    AdhocPenaltySerializer, AdhocRewardSerializer, ChildListSerializer, DailyTrackingSerializer,
+    ScreenTimeGoalSerializer, ScreenTimeUsageSerializer,
+)
+
+
+BALANCE_FIELDS = ['earned_minutes', 'adhoc_reward_minutes', 'adhoc_penalty_minutes', 'used_minutes']
+
+
+def week_bounds(ref_date):
+    """Return the (monday, sunday) pair for the week containing `ref_date`."""
+    monday = ref_date - timedelta(days=ref_date.weekday())
+    return monday, monday + timedelta(days=6)
+
+
+def earning_week(day, rollover):
+    """Return the Monday of the week an earned tracking on `day` counts toward.
+
+    Sunday earnings for goals flagged `rollover_sunday_to_next_week` count
+    toward the following week.
+    """
+    monday = day - timedelta(days=day.weekday())
+    if day.weekday() == 6 and rollover:
+        monday += timedelta(days=7)
+    return monday
+
+
+def goal_earnings_by_week(trackings):
+    """Sum earned goal minutes per (child_id, week_start) for a DailyTracking queryset.
+
+    Only trackings whose goal applies to the tracking's weekday are counted.
+    Rows are filtered and grouped by date in the database, so the result set
+    is bounded by the number of days rather than by row count.
+    """
+    rows = (
+        trackings
+        .on_applicable_days()
+        .filter(status='earned')
+        .values('child_id', 'date', 'goal__rollover_sunday_to_next_week')
+        .annotate(minutes=Sum('minutes_earned'))
+        .order_by()
+    )
+    totals = defaultdict(int)
+    for row in rows:
+        week = earning_week(row['date'], row['goal__rollover_sunday_to_next_week'])
+        totals[(row['child_id'], week)] += row['minutes'] or 0
+    return totals
+
+
+def weekly_goal_earnings(child, monday):
+    """Minutes earned from goals during the week starting on `monday`.
+
+    The previous Sunday is included in the scan so rolled-over earnings are
+    picked up.
+    """
+    trackings = DailyTracking.objects.filter(
+        child=child,
+        date__gte=monday - timedelta(days=1),
+        date__lte=monday + timedelta(days=6)
+    )
+    return goal_earnings_by_week(trackings).get((child.id, monday), 0)
+
+
+def live_weekly_totals(child, monday):
+    """Compute one week's balance fields directly from the source tables."""
+    sunday = monday + timedelta(days=6)
+    return {
+        'earned_minutes': weekly_goal_earnings(child, monday),
+        'adhoc_reward_minutes': AdhocReward.objects.filter(
+            child=child, awarded_date__gte=monday, awarded_date__lte=sunday
+        ).aggregate(total=Sum('minutes'))['total'] or 0,
+        'adhoc_penalty_minutes': AdhocPenalty.objects.filter(
+            child=child, applied_date__gte=monday, applied_date__lte=sunday
+        ).aggregate(total=Sum('minutes'))['total'] or 0,
+        'used_minutes': ScreenTimeUsage.objects.filter(
+            child=child, date__gte=monday, date__lte=sunday
+        ).aggregate(total=Sum('minutes_used'))['total'] or 0,
+    }
+
+
+def compute_weekly_balances(child_ids=None, start=None, end=None):
+    """Compute balance fields for many weeks with one grouped query per table.
+
+    Returns a mapping of (child_id, week_start) -> balance fields for weeks
+    with any activity. `start` and `end` are optional Mondays bounding the
+    weeks of interest (inclusive).
+    """
+    def scoped(queryset, date_field, first_day):
+        if child_ids is not None:
+            queryset = queryset.filter(child_id__in=child_ids)
+        if first_day is not None:
+            queryset = queryset.filter(**{f'{date_field}__gte': first_day})
+        if end is not None:
+            queryset = queryset.filter(**{f'{date_field}__lte': end + timedelta(days=6)})
+        return queryset
+
+    balances = defaultdict(lambda: dict.fromkeys(BALANCE_FIELDS, 0))
+    prev_sunday = start - timedelta(days=1) if start is not None else None
+    for key, minutes in goal_earnings_by_week(scoped(DailyTracking.objects.all(), 'date', prev_sunday)).items():
+        if (start is None or key[1] >= start) and (end is None or key[1] <= end):
+            balances[key]['earned_minutes'] += minutes
+
+    sources = [
+        (AdhocReward.objects.all(), 'awarded_date', 'minutes', 'adhoc_reward_minutes'),
+        (AdhocPenalty.objects.all(), 'applied_date', 'minutes', 'adhoc_penalty_minutes'),
+        (ScreenTimeUsage.objects.all(), 'date', 'minutes_used', 'used_minutes'),
+    ]
+    for queryset, date_field, minutes_field, balance_field in sources:
+        rows = (
+            scoped(queryset, date_field, start)
+            .values('child_id', date_field)
+            .annotate(total=Sum(minutes_field))
+            .order_by()
+        )
+        for row in rows:
+            monday, _ = week_bounds(row[date_field])
+            balances[(row['child_id'], monday)][balance_field] += row['total'] or 0
+    return dict(balances)
+
+
+def build_daily_summary(child, day, goals, trackings):
+    """Assemble a child's daily summary from already-fetched rows.
+
+    `goals` are the goals applicable to the child on `day`, in display order;
+    `trackings` are the child's trackings on `day`. Goals without a tracking
+    get a synthetic 'not_earned' entry.
+    """
+    tracking_map = {t.goal_id: t for t in trackings}
+
+    goals_list = []
+    earned = 0
+    not_earned = 0
+    total_target = 0
+    total_earned = 0
+
+    for g in goals:
+        total_target += g.target_minutes or 0
+        t = tracking_map.get(g.id)
+        if t:
+            t.child, t.goal = child, g
+            goals_list.append(t)
+            total_earned += t.minutes_earned or 0
+            if t.status == 'earned':
+                earned += 1
+            elif t.status == 'not_earned':
+                not_earned += 1
+        else:
+            # synthetic 'not_earned' tracking (default)
+            not_earned += 1
+            goals_list.append(DailyTracking(child=child, goal=g, date=day, status='not_earned', minutes_earned=0, actual_minutes=0, bonus_earned=False))
+
+    return {
+        'date': day,
+        'child_id': child.id,
+        'child_name': child.name,
+        'total_target_minutes': total_target,
+        'total_earned_minutes': total_earned,
+        'pending_goals': 0,
+        'earned_goals': earned,
+        'not_earned_goals': not_earned,
+        'goals': DailyTrackingSerializer(goals_list, many=True).data
+    }
+
+
+def build_weekly_summary(child, monday, balance):
+    """Assemble a child's weekly summary from its WeeklyBalance row (or None)."""
+    total_earned = balance.earned_minutes if balance else 0
+    return {
+        'child_id': child.id,
+        'child_name': child.name,
+        'week_start': monday,
+        'week_end': monday + timedelta(days=6),
+        'total_baseline_minutes': child.baseline_weekly_minutes,
+        'total_earned_minutes': total_earned,
+        'total_available_minutes': child.baseline_weekly_minutes + total_earned,
+    }
+
+
+def build_weekly_ledger(child, monday, balance):
+    """Assemble a child's full weekly balance from its WeeklyBalance row (or None)."""
+    totals = {field: getattr(balance, field, 0) for field in BALANCE_FIELDS}
+    available = (
+        child.baseline_weekly_minutes + totals['earned_minutes']
+        + totals['adhoc_reward_minutes'] - totals['adhoc_penalty_minutes']
+    )
+    return {
+        'child_id': child.id,
+        'child_name': child.name,
+        'week_start': monday,
+        'week_end': monday + timedelta(days=6),
+        'baseline_minutes': child.baseline_weekly_minutes,
+        'goal_earned_minutes': totals['earned_minutes'],
+        'adhoc_reward_minutes': totals['adhoc_reward_minutes'],
+        'adhoc_penalty_minutes': totals['adhoc_penalty_minutes'],
+        'used_minutes': totals['used_minutes'],
+        'total_available_minutes': available,
+        'remaining_minutes': available - totals['used_minutes'],
+    }
+
+
+def daily_summary(child, day):
+    """Daily summary for one child."""
+    goals = list(ScreenTimeGoal.objects.filter(children=child, is_active=True).applies_on(day).order_by('order', 'name'))
+    trackings = DailyTracking.objects.filter(child=child, goal__in=goals, date=day)
+    return build_daily_summary(child, day, goals, trackings)
+
+
+def weekly_summary(child, ref_date):
+    """Weekly summary for one child in the week containing `ref_date`."""
+    monday, _ = week_bounds(ref_date)
+    balance = WeeklyBalance.objects.filter(child=child, week_start=monday).first()
+    return build_weekly_summary(child, monday, balance)
+
+
+def weekly_ledger(child, ref_date):
+    """Full weekly balance for one child in the week containing `ref_date`."""
+    monday, _ = week_bounds(ref_date)
+    balance = WeeklyBalance.objects.filter(child=child, week_start=monday).first()
+    return build_weekly_ledger(child, monday, balance)
+
+
+async def adaily_summary(child, day):
+    """Async counterpart of `daily_summary`."""
+    goals = [
+        goal async for goal in
+        ScreenTimeGoal.objects.filter(children=child, is_active=True).applies_on(day).order_by('order', 'name')
+    ]
+    trackings = [tracking async for tracking in DailyTracking.objects.filter(child=child, goal__in=goals, date=day)]
+    return build_daily_summary(child, day, goals, trackings)
+
+
+async def aweekly_summary(child, ref_date):
+    """Async counterpart of `weekly_summary`."""
+    monday, _ = week_bounds(ref_date)
+    balance = await WeeklyBalance.objects.filter(child=child, week_start=monday).afirst()
+    return build_weekly_summary(child, monday, balance)
+
+
+async def aweekly_ledger(child, ref_date):
+    """Async counterpart of `weekly_ledger`."""
+    monday, _ = week_bounds(ref_date)
+    balance = await WeeklyBalance.objects.filter(child=child, week_start=monday).afirst()
+    return build_weekly_ledger(child, monday, balance)
+
+
+def household_dashboard(children, day):
+    """Daily and weekly summaries for every child, batched across children.
+
+    Uses a fixed number of queries regardless of how many children there are:
+    one for goal assignments, one for the day's trackings and one for the
+    week's balances.
+    """
+    children = list(children)
+    child_ids = [child.id for child in children]
+    monday, _ = week_bounds(day)
+
+    goals_by_child = defaultdict(list)
+    assigned = (
+        ScreenTimeGoal.objects
+        .filter(children__in=child_ids, is_active=True)
+        .applies_on(day)
+        .annotate(member_id=F('children'))
+        .order_by('order', 'name')
+    )
+    for goal in assigned:
+        goals_by_child[goal.member_id].append(goal)
+
+    trackings_by_child = defaultdict(list)
+    for tracking in DailyTracking.objects.filter(child_id__in=child_ids, date=day):
+        trackings_by_child[tracking.child_id].append(tracking)
+
+    balances = {
+        balance.child_id: balance
+        for balance in WeeklyBalance.objects.filter(child_id__in=child_ids, week_start=monday)
+    }
+
+    return {
+        'date': day,
+        'week_start': monday,
+        'children': [
+            {
+                'child_id': child.id,
+                'child_name': child.name,
+                'daily_summary': build_daily_summary(
+                    child, day, goals_by_child[child.id], trackings_by_child[child.id]
+                ),
+                'weekly_summary': build_weekly_summary(child, monday, balances.get(child.id)),
+                'weekly_ledger': build_weekly_ledger(child, monday, balances.get(child.id)),
+            }
+            for child in children
+        ],
+    }
+
+
+def bootstrap(children, child, day):
+    """Everything the dashboard needs for `child` on `day`, in one payload.
+
+    Uses a fixed number of queries: children, the child's goals and their
+    children, the day's trackings, the week's balance and the day's
+    rewards, penalties and usage. `child` may be None when there are no
+    children yet.
+    """
+    payload = {
+        'date': day,
+        'child_id': child.id if child else None,
+        'children': ChildListSerializer(children, many=True).data,
+        'goals': [],
+        'trackings': [],
+        'daily_summary': None,
+        'weekly_ledger': None,
+        'adhoc_rewards': [],
+        'adhoc_penalties': [],
+        'screen_time_usage': [],
+    }
+    if child is None:
+        return payload
+
+    goals = list(ScreenTimeGoal.objects.filter(children=child).prefetch_related('children').order_by('order', 'name'))
+    goals_by_id = {goal.id: goal for goal in goals}
+    trackings = list(DailyTracking.objects.filter(child=child, date=day).select_related('goal'))
+    for tracking in trackings:
+        tracking.child = child
+        tracking.goal = goals_by_id.get(tracking.goal_id, tracking.goal)
+    monday, _ = week_bounds(day)
+    balance = WeeklyBalance.objects.filter(child=child, week_start=monday).first()
+    day_goals = [goal for goal in goals if goal.is_active and goal.applies_on(day)]
+
+    usage = list(ScreenTimeUsage.objects.filter(child=child, date=day))
+    for entry in usage:
+        entry.child = child
+
+    payload.update({
+        'goals': ScreenTimeGoalSerializer(goals, many=True).data,
+        'trackings': DailyTrackingSerializer(trackings, many=True).data,
+        'daily_summary': build_daily_summary(
+            child, day, day_goals, [t for t in trackings if t.goal_id in goals_by_id]
+        ),
+        'weekly_ledger': build_weekly_ledger(child, monday, balance),
+        'adhoc_rewards': AdhocRewardSerializer(AdhocReward.objects.filter(child=child, awarded_date=day), many=True).data,
+        'adhoc_penalties': AdhocPenaltySerializer(AdhocPenalty.objects.filter(child=child, applied_date=day), many=True).data,
+        'screen_time_usage': ScreenTimeUsageSerializer(usage, many=True).data,
+    })
+    return payload
+
+
+HISTORY_TRUNCATE = {'week': TruncWeek, 'month': TruncMonth}
+
+
+def bucket_bounds(day, bucket):
+    """Return the first and last day of the week or month containing `day`."""
+    if bucket == 'week':
+        return week_bounds(day)
+    first = day.replace(day=1)
+    following = (first + timedelta(days=31)).replace(day=1)
+    return first, following - timedelta(days=1)
+
+
+# History period field -> DailyRollup field it sums
+HISTORY_FIELDS = {
+    'goal_earned_minutes': 'earned_minutes',
+    'goals_earned': 'goals_earned',
+    'goals_applicable': 'goals_applicable',
+    'adhoc_reward_minutes': 'adhoc_plus',
+    'adhoc_penalty_minutes': 'adhoc_minus',
+    'used_minutes': 'used_minutes',
+}
+
+
+def history(child, start, end, bucket):
+    """Week- or month-bucketed series for one child between `start` and `end`.
+
+    Period totals are summed from the DailyRollup table in the database,
+    grouped by the truncated date, so a week or month reads at most 7 or 31
+    rows whatever the number of trackings. Earned goal minutes follow the
+    weekly ledger: the rollups already move Sunday earnings of rollover
+    goals to the following Monday. Completion rates are earned days over
+    the days in the range the goal was scheduled for; earned days are read
+    from the GoalWeekRollup masks, one row per goal and week.
+    """
+    truncate = HISTORY_TRUNCATE[bucket]
+    periods = {}
+    day = bucket_bounds(start, bucket)[0]
+    while day <= end:
+        first, last = bucket_bounds(day, bucket)
+        weekdays = [0] * 7
+        for offset in range((min(last, end) - max(first, start)).days + 1):
+            weekdays[(max(first, start) + timedelta(days=offset)).weekday()] += 1
+        periods[first] = {
+            'period_start': first,
+            'period_end': last,
+            'days': sum(weekdays),
+            'weekdays': weekdays,
+            'baseline_minutes': 0,
+            **dict.fromkeys(HISTORY_FIELDS, 0),
+        }
+        day = last + timedelta(days=1)
+
+    totals = (
+        DailyRollup.objects
+        .filter(child=child, date__gte=start, date__lte=end)
+        .annotate(period=truncate('date'))
+        .values('period')
+        .annotate(**{field: Sum(rollup_field) for field, rollup_field in HISTORY_FIELDS.items()})
+        .order_by()
+    )
+    for row in totals:
+        for field in HISTORY_FIELDS:
+            periods[row['period']][field] += row[field] or 0
+
+    # Each goal's earned days come from its weekly masks, cut to the range
+    earned_days = defaultdict(int)
+    rows = (
+        GoalWeekRollup.objects
+        .filter(child=child, week_start__gte=start - timedelta(days=start.weekday()), week_start__lte=end)
+        .exclude(earned_days=0)
+        .values_list('goal_id', 'week_start', 'earned_days')
+        .order_by()
+    )
+    for goal_id, week_start, mask in rows:
+        for index in range(7):
+            day = week_start + timedelta(days=index)
+            if mask & (1 << index) and start <= day <= end:
+                earned_days[(goal_id, bucket_bounds(day, bucket)[0])] += 1
+
+    goals = (
+        ScreenTimeGoal.objects
+        .filter(Q(children=child) | Q(pk__in={goal_id for goal_id, _ in earned_days}))
+        .distinct()
+        .order_by('order', 'name')
+    )
+    goal_series = []
+    for goal in goals:
+        series = []
+        for period in periods.values():
+            scheduled = sum(
+                count for index, count in enumerate(period['weekdays']) if goal.applies_to_days_mask & (1 << index)
+            )
+            earned = earned_days.get((goal.id, period['period_start']), 0)
+            series.append({
+                'period_start': period['period_start'],
+                'earned_days': earned,
+                'scheduled_days': scheduled,
+                'completion_rate': round(earned / scheduled, 3) if scheduled else None,
+            })
+        goal_series.append({'goal_id': goal.id, 'goal_name': goal.name, 'periods': series})
+
+    for period in periods.values():
+        del period['weekdays']
+        # The weekly baseline is prorated over the bucket's days inside the range
+        baseline = round(child.baseline_weekly_minutes * period['days'] / 7)
+        available = (
+            baseline + period['goal_earned_minutes']
+            + period['adhoc_reward_minutes'] - period['adhoc_penalty_minutes']
+        )
+        period.update({
+            'baseline_minutes': baseline,
+            'total_available_minutes': available,
+            'remaining_minutes': available - period['used_minutes'],
+        })
+
+    return {
+        'child_id': child.id,
+        'child_name': child.name,
+        'bucket': bucket,
+        'start': start,
+        'end': end,
+        'periods': list(periods.values()),
+        'goals': goal_series,
+    }
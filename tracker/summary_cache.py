@@ -0,0 +1,118 @@
+"""
+Cache for per-child summary payloads, invalidated by writes.
+
+Entries are keyed by (kind, child, generation, date). Every write touching a
+child replaces that child's generation token, so older entries can no longer
+be reached and simply expire.
+"""
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _cache():
+    return caches[getattr(settings, 'SUMMARY_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(child_id):
+    return f'tracker:summary-generation:{child_id}'
+
+
+def _generation(cache, child_id):
+    """Return the child's current generation token, creating one if missing or evicted."""
+    key = _generation_key(child_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not cache.add(key, generation, timeout=None):
+            generation = cache.get(key) or generation
+    return generation
+
+
+async def _ageneration(cache, child_id):
+    key = _generation_key(child_id)
+    generation = await cache.aget(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not await cache.aadd(key, generation, timeout=None):
+            generation = await cache.aget(key) or generation
+    return generation
+
+
+def _summary_key(kind, child_id, generation, key_date):
+    return f'tracker:summary:{kind}:{child_id}:{generation}:{key_date.isoformat()}'
+
+
+def _count(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def cached_summary(kind, child_id, key_date, compute):
+    """Return the cached `kind` summary for (child, key_date), computing it on a miss.
+
+    The generation is read before `compute()` runs, so a payload built from
+    rows that a concurrent write is replacing is stored under the old
+    generation and never served after that write.
+    """
+    cache = _cache()
+    key = _summary_key(kind, child_id, _generation(cache, child_id), key_date)
+    payload = cache.get(key)
+    if payload is not None:
+        _count('hits')
+        return payload
+    _count('misses')
+    payload = compute()
+    cache.set(key, payload, timeout=getattr(settings, 'SUMMARY_CACHE_TIMEOUT', 600))
+    return payload
+
+
+async def acached_summary(kind, child_id, key_date, compute):
+    """Async counterpart of `cached_summary`; `compute()` returns an awaitable."""
+    cache = _cache()
+    key = _summary_key(kind, child_id, await _ageneration(cache, child_id), key_date)
+    payload = await cache.aget(key)
+    if payload is not None:
+        _count('hits')
+        return payload
+    _count('misses')
+    payload = await compute()
+    await cache.aset(key, payload, timeout=getattr(settings, 'SUMMARY_CACHE_TIMEOUT', 600))
+    return payload
+
+
+def _bump(child_ids):
+    _cache().set_many({_generation_key(child_id): uuid.uuid4().hex for child_id in child_ids}, timeout=None)
+
+
+def invalidate(*child_ids):
+    """Drop every cached summary for the given children.
+
+    Runs immediately and again once the surrounding transaction commits, so
+    a read racing the commit cannot leave an old payload under the live
+    generation.
+    """
+    child_ids = {child_id for child_id in child_ids if child_id is not None}
+    if not child_ids:
+        return
+    _bump(child_ids)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(child_ids))
+
+
+def stats():
+    """Return a copy of this process's hit/miss counters."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.update(hits=0, misses=0)
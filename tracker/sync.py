@@ -0,0 +1,92 @@
+"""
+"Changes since" feed that lets clients keep a local copy of the tracker data.
+
+A sync token is the server time, in microseconds, at which a feed was read.
+The next read returns rows whose `updated_at` is at or after the token, less
+`OVERLAP`, so a write stamped just before the token but committed after the
+read is not lost; clients apply rows by id, so receiving one twice is
+harmless. Deletions are read from Tombstone rows, which are kept for
+SYNC_TOMBSTONE_RETENTION_DAYS; a token older than that gets a full resync.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage, Tombstone
+from .serializers import (
+    ChildListSerializer, ScreenTimeGoalSerializer, DailyTrackingSerializer,
+    AdhocRewardSerializer, AdhocPenaltySerializer, ScreenTimeUsageSerializer,
+)
+
+
+OVERLAP = timedelta(seconds=5)
+
+# Feed key, model and serializer for each synced model, in the order clients should apply them
+SYNC_MODELS = [
+    ('children', Child, ChildListSerializer),
+    ('goals', ScreenTimeGoal, ScreenTimeGoalSerializer),
+    ('trackings', DailyTracking, DailyTrackingSerializer),
+    ('adhoc_rewards', AdhocReward, AdhocRewardSerializer),
+    ('adhoc_penalties', AdhocPenalty, AdhocPenaltySerializer),
+    ('screen_time_usage', ScreenTimeUsage, ScreenTimeUsageSerializer),
+]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def make_token(moment):
+    return str((moment - _EPOCH) // timedelta(microseconds=1))
+
+
+def parse_token(token):
+    """Return the datetime a token was issued at; raises ValueError for junk."""
+    micros = int(token)
+    if micros < 0:
+        raise ValueError(token)
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _queryset(model):
+    if model is ScreenTimeGoal:
+        return model.objects.prefetch_related('children')
+    if model is DailyTracking:
+        return model.objects.select_related('child', 'goal')
+    if model is ScreenTimeUsage:
+        return model.objects.select_related('child')
+    return model.objects.all()
+
+
+def changes_since(since=None):
+    """Rows created, updated or deleted since the `since` datetime.
+
+    With `since` None, or older than the tombstone retention, every row is
+    returned and `reset` is True: the client should replace its copy.
+    """
+    now = timezone.now()
+    retention = timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+    reset = since is None or since < now - retention
+    changes, deleted = {}, {}
+    for key, model, serializer_class in SYNC_MODELS:
+        queryset = _queryset(model)
+        if not reset:
+            queryset = queryset.filter(updated_at__gte=since - OVERLAP)
+        changes[key] = serializer_class(queryset.order_by('updated_at', 'pk'), many=True).data
+        deleted[key] = []
+
+    if not reset:
+        keys = {model._meta.model_name: key for key, model, _ in SYNC_MODELS}
+        tombstones = Tombstone.objects.filter(deleted_at__gte=since - OVERLAP).values_list('model', 'object_id')
+        for model_name, object_id in tombstones:
+            if model_name in keys:
+                deleted[keys[model_name]].append(object_id)
+
+    return {'token': make_token(now), 'reset': reset, 'changes': changes, 'deleted': deleted}
+
+
+def prune_tombstones(days=None):
+    """Delete tombstones older than the retention period; returns how many were removed."""
+    if days is None:
+        days = getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90)
+    count, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return count
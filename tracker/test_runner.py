@@ -0,0 +1,36 @@
+"""
+Test runner that holds every API request made by the suite to its query
+budget and keeps the suite's cache apart from any running server.
+"""
+import uuid
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """DiscoverRunner with QUERY_BUDGETS forced to 'raise' and a private cache.
+
+    Any test whose requests push a viewset action past its declared budget
+    fails with QueryBudgetExceeded, whatever the environment sets. The
+    summary cache is a LocMemCache unique to the run, so entries never
+    leak between test runs or into the development server's cache.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._saved_query_budgets = getattr(settings, 'QUERY_BUDGETS', 'off')
+        settings.QUERY_BUDGETS = 'raise'
+        self._cache_override = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': f'tracker-tests-{uuid.uuid4().hex}',
+            },
+        })
+        self._cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        settings.QUERY_BUDGETS = self._saved_query_budgets
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,208 @@
+"""
+Set-based create-or-update of daily trackings keyed on (child, goal, date).
+"""
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+
+from .models import Child, ScreenTimeGoal, DailyTracking
+from .serializers import DailyTrackingUpsertSerializer
+from .signals import bulk_saved
+
+
+UPSERT_FIELDS = ['status', 'minutes_earned', 'actual_minutes', 'bonus_earned', 'notes']
+
+
+def _key(tracking):
+    return (tracking.child_id, tracking.goal_id, tracking.date)
+
+
+def _merge_stored_key(data, stored):
+    """Fill the key fields `data` omits from the tracking its `id` names.
+
+    Returns a field -> messages dict for key fields that name a different
+    row than `stored`, so an item cannot silently upsert some other day.
+    """
+    errors = {}
+    for field, value in (('child', stored.child_id), ('goal', stored.goal_id), ('date', stored.date)):
+        if field not in data:
+            data[field] = value
+        elif data[field] != value:
+            errors[field] = [f'Does not match tracking {stored.id}.']
+    return errors
+
+
+def bulk_upsert_trackings(items):
+    """Validate a batch of tracking items, then create or update them together.
+
+    Items are keyed on (child, goal, date); an item may instead carry the `id`
+    of an existing tracking, and any key fields it also sends must match that
+    row. Fields an item omits keep their stored value (or
+    the model default for new rows). `minutes_earned` is computed from the
+    goal's reward settings, as on every tracking write path; a client value
+    is ignored. Nothing is written unless every item is valid.
+
+    Returns (results, errors): `results` holds one dict per item, in order,
+    with the saved tracking and whether it was created; `errors` lists
+    {'index', 'errors'} for invalid items, in which case `results` is empty.
+    The number of queries does not depend on the batch size.
+    """
+    errors = []
+    validated = []
+    for index, item in enumerate(items):
+        serializer = DailyTrackingUpsertSerializer(data=item, partial=True)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+            validated.append(None)
+
+    ids = [data['id'] for data in validated if data and 'id' in data]
+    by_id = DailyTracking.objects.in_bulk(ids) if ids else {}
+
+    for index, data in enumerate(validated):
+        if data is None:
+            continue
+        if 'id' in data:
+            stored = by_id.get(data['id'])
+            if stored is None:
+                errors.append({'index': index, 'errors': {'id': ['Tracking not found.']}})
+                continue
+            mismatched = _merge_stored_key(data, stored)
+            if mismatched:
+                errors.append({'index': index, 'errors': mismatched})
+                continue
+        missing = [field for field in ('child', 'goal', 'date') if field not in data]
+        if missing:
+            errors.append({'index': index, 'errors': {field: ['This field is required.'] for field in missing}})
+
+    child_ids = {data['child'] for data in validated if data and 'child' in data}
+    goal_ids = {data['goal'] for data in validated if data and 'goal' in data}
+    known_children = set(Child.objects.filter(id__in=child_ids).values_list('id', flat=True)) if child_ids else set()
+    known_goals = ScreenTimeGoal.objects.in_bulk(goal_ids) if goal_ids else {}
+    for index, data in enumerate(validated):
+        if data is None:
+            continue
+        item_errors = {}
+        if 'child' in data and data['child'] not in known_children:
+            item_errors['child'] = [f"Invalid pk \"{data['child']}\" - object does not exist."]
+        if 'goal' in data and data['goal'] not in known_goals:
+            item_errors['goal'] = [f"Invalid pk \"{data['goal']}\" - object does not exist."]
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+    if errors:
+        return [], sorted(errors, key=lambda error: error['index'])
+
+    keys = [(data['child'], data['goal'], data['date']) for data in validated]
+    key_filter = Q(child_id__in=child_ids, goal_id__in=goal_ids, date__in={key[2] for key in keys})
+
+    with transaction.atomic():
+        wanted = set(keys)
+        existing = {
+            _key(t): t for t in DailyTracking.objects.filter(key_filter).select_for_update()
+            if _key(t) in wanted
+        }
+
+        # Later items for the same key win, matching sequential saves
+        merged = {}
+        for key, data in zip(keys, validated):
+            stored = merged.get(key) or existing.get(key)
+            tracking = DailyTracking(child_id=key[0], goal_id=key[1], date=key[2])
+            for field in UPSERT_FIELDS:
+                if field in data:
+                    setattr(tracking, field, data[field])
+                elif stored is not None:
+                    setattr(tracking, field, getattr(stored, field))
+            tracking.minutes_earned = known_goals[key[1]].minutes_for(
+                tracking.status, tracking.actual_minutes, tracking.bonus_earned
+            )
+            merged[key] = tracking
+
+        conflict_target = {}
+        if connection.features.supports_update_conflicts_with_target:
+            conflict_target['unique_fields'] = ['child', 'goal', 'date']
+        DailyTracking.objects.bulk_create(
+            list(merged.values()),
+            update_conflicts=True,
+            update_fields=UPSERT_FIELDS + ['updated_at'],
+            **conflict_target
+        )
+        saved = {
+            _key(t): t for t in DailyTracking.objects.filter(key_filter).select_related('child', 'goal')
+            if _key(t) in wanted
+        }
+        bulk_saved.send(sender=DailyTracking, instances=list(saved.values()), previous=list(existing.values()))
+
+    results = [
+        {'index': index, 'id': saved[key].id, 'created': key not in existing, 'tracking': saved[key]}
+        for index, key in enumerate(keys)
+    ]
+    return results, []
+
+
+def validate_upsert(payload):
+    """Validate the body of a single (child, goal, date) upsert.
+
+    A body carrying the `id` of an existing tracking may omit the key fields;
+    any it sends must match that row. Returns (data, child, goal, errors). `errors` is a field -> messages dict
+    shaped like serializer errors; when it is non-empty the other values may
+    be None.
+    """
+    serializer = DailyTrackingUpsertSerializer(data=payload, partial=True)
+    if not serializer.is_valid():
+        return None, None, None, serializer.errors
+    data = serializer.validated_data
+    if 'id' in data:
+        stored = DailyTracking.objects.select_related('child', 'goal').filter(id=data['id']).first()
+        if stored is None:
+            return data, None, None, {'id': ['Tracking not found.']}
+        mismatched = _merge_stored_key(data, stored)
+        if mismatched:
+            return data, None, None, mismatched
+        return data, stored.child, stored.goal, {}
+    missing = {field: ['This field is required.'] for field in ('child', 'goal', 'date') if field not in data}
+    if missing:
+        return data, None, None, missing
+    
+    child = Child.objects.filter(id=data['child']).first()
+    goal = ScreenTimeGoal.objects.filter(id=data['goal']).first()
+    errors = {}
+    if child is None:
+        errors['child'] = [f"Invalid pk \"{data['child']}\" - object does not exist."]
+    if goal is None:
+        errors['goal'] = [f"Invalid pk \"{data['goal']}\" - object does not exist."]
+    return data, child, goal, errors
+
+
+def upsert_tracking(child, goal, day, data):
+    """Create or update the tracking for (child, goal, day) atomically.
+
+    `data` may carry `status`, `actual_minutes`, `bonus_earned` and `notes`;
+    omitted fields keep their stored value. `minutes_earned` is always
+    computed from the goal's reward settings, as on every tracking write
+    path. For tracked goals without an
+    explicit status, any time spent marks the goal earned.
+
+    Returns (tracking, created).
+    """
+    lookup = {'child': child, 'goal': goal, 'date': day}
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                tracking = DailyTracking.objects.select_for_update().filter(**lookup).first()
+                created = tracking is None
+                if created:
+                    tracking = DailyTracking(**lookup)
+                for field in ('status', 'actual_minutes', 'bonus_earned', 'notes'):
+                    if field in data:
+                        setattr(tracking, field, data[field])
+                if goal.goal_type == 'tracked' and 'status' not in data:
+                    tracking.status = 'earned' if tracking.actual_minutes > 0 else 'not_earned'
+                tracking.minutes_earned = goal.minutes_for(
+                    tracking.status, tracking.actual_minutes, tracking.bonus_earned
+                )
+                tracking.save()
+            return tracking, created
+        except IntegrityError:
+            # A concurrent request created the row first; retry as an update
+            if attempt:
+                raise
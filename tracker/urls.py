@@ -3,10 +3,11 @@ URL routing for the tracker app.
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     ChildViewSet, ScreenTimeGoalViewSet, 
     DailyTrackingViewSet, AdhocRewardViewSet, AdhocPenaltyViewSet,
-    ScreenTimeUsageViewSet
+    ScreenTimeUsageViewSet, BootstrapViewSet, MutationViewSet, SyncViewSet, prometheus_metrics
 )
 
 router = DefaultRouter()
@@ -16,7 +17,26 @@ router.register(r'daily-tracking', DailyTrackingViewSet, basename='daily-trackin
 router.register(r'adhoc-rewards', AdhocRewardViewSet, basename='adhoc-reward')
 router.register(r'adhoc-penalties', AdhocPenaltyViewSet, basename='adhoc-penalty')
 router.register(r'screen-time-usage', ScreenTimeUsageViewSet, basename='screen-time-usage')
+router.register(r'bootstrap', BootstrapViewSet, basename='bootstrap')
+router.register(r'mutations', MutationViewSet, basename='mutation')
+router.register(r'sync', SyncViewSet, basename='sync')
+
+# Async mirrors of the read endpoints, for running under ASGI
+async_urlpatterns = [
+    path('children/', async_views.children, name='async-child-list'),
+    path('children/<pk>/daily_summary/', async_views.daily_summary, name='async-child-daily-summary'),
+    path('children/<pk>/weekly_summary/', async_views.weekly_summary, name='async-child-weekly-summary'),
+    path('children/<pk>/weekly_ledger/', async_views.weekly_ledger, name='async-child-weekly-ledger'),
+    path('goals/', async_views.goals, name='async-goal-list'),
+    path('daily-tracking/', async_views.daily_trackings, name='async-daily-tracking-list'),
+    path('adhoc-rewards/', async_views.adhoc_rewards, name='async-adhoc-reward-list'),
+    path('adhoc-penalties/', async_views.adhoc_penalties, name='async-adhoc-penalty-list'),
+    path('screen-time-usage/', async_views.screen_time_usage, name='async-screen-time-usage-list'),
+]
 
 urlpatterns = [
+    path('async/', include(async_urlpatterns)),
+    path('children/<pk>/events/', async_views.child_events, name='child-events'),
+    path('_metrics', prometheus_metrics, name='metrics'),
     path('', include(router.urls)),
 ]
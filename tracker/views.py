@@ -3,201 +3,252 @@ Views for the Screen Time Tracker API.
 """
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponse
 from django.utils import timezone
-from django.db.models import Sum, Q
+from django.db.models import Prefetch, Sum, Q
 from datetime import datetime, timedelta
 
-from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage
+from .models import Child, ScreenTimeGoal, DailyTracking, AdhocReward, AdhocPenalty, ScreenTimeUsage, WeeklyBalance, DailyRollup, GoalWeekRollup
 from .serializers import (
     ChildDetailSerializer, ChildListSerializer, ScreenTimeGoalSerializer,
     DailyTrackingSerializer, AdhocRewardSerializer, AdhocPenaltySerializer,
-    ScreenTimeUsageSerializer
+    GoalReorderSerializer, HistoryQuerySerializer, ScreenTimeUsageSerializer, TrackingBatchSerializer
 )
+from .budgets import QueryBudgetMixin, query_budget
+from .conditional import ConditionalListMixin, conditional, fingerprint, request_variant
+from .mutations import MAX_BATCH_SIZE, apply_mutations
+from .pagination import TrackingKeysetPagination
+from .summaries import (
+    bootstrap, daily_summary, history, household_dashboard, weekly_ledger, weekly_summary, week_bounds,
+)
+from . import metrics, summary_cache
+from .summary_cache import cached_summary
+from .sync import changes_since, parse_token
+from .upserts import bulk_upsert_trackings, upsert_tracking, validate_upsert
+
+
+def requested_date(request):
+    """Return the date from the `date` query param, falling back to today."""
+    date_param = request.query_params.get('date')
+    if date_param:
+        try:
+            return datetime.strptime(date_param, '%Y-%m-%d').date()
+        except Exception:
+            pass
+    return timezone.now().date()
+
+
+def child_pk(pk):
+    """Return `pk` as an int, raising 404 the way get_object() would for junk ids."""
+    try:
+        return int(pk)
+    except (TypeError, ValueError):
+        raise Http404
+
 
+def daily_summary_sources(child_id, day):
+    """Querysets whose rows make up a child's daily summary, for ETags."""
+    return [
+        Child.objects.filter(pk=child_id),
+        ScreenTimeGoal.objects.filter(children=child_id),
+        DailyTracking.objects.filter(child_id=child_id, date=day),
+    ]
 
-class ChildViewSet(viewsets.ModelViewSet):
+
+def history_params(request):
+    """Validated `start`, `end` and `bucket` query params of a history request."""
+    serializer = HistoryQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def weekly_summary_sources(child_id, monday):
+    """Querysets whose rows make up a child's weekly summary and ledger, for ETags."""
+    return [
+        Child.objects.filter(pk=child_id),
+        WeeklyBalance.objects.filter(child_id=child_id, week_start=monday),
+    ]
+
+
+class ChildViewSet(QueryBudgetMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet for managing children."""
     queryset = Child.objects.all()
     permission_classes = [AllowAny]
+    # destroy cascades row by row through the tracking, reward, penalty and usage signals
+    query_budgets = {'list': 3, 'retrieve': 3, 'create': 1, 'update': 2, 'partial_update': 2}
+    
+    def get_queryset(self):
+        queryset = Child.objects.all()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('goals', queryset=ScreenTimeGoal.objects.prefetch_related('children'))
+            )
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return ChildDetailSerializer
         return ChildListSerializer
     
+    def daily_summary_fingerprint(self, request, pk=None):
+        day = requested_date(request)
+        return fingerprint(*daily_summary_sources(child_pk(pk), day), extra=[*request_variant(request), day])
+
+    def weekly_fingerprint(self, request, pk=None):
+        monday, _ = week_bounds(requested_date(request))
+        return fingerprint(*weekly_summary_sources(child_pk(pk), monday), extra=[*request_variant(request), monday])
+
+    def history_fingerprint(self, request, pk=None):
+        params = history_params(request)
+        child_id, start, end = child_pk(pk), params['start'], params['end']
+        return fingerprint(
+            Child.objects.filter(pk=child_id),
+            ScreenTimeGoal.objects.filter(children=child_id),
+            DailyRollup.objects.filter(child_id=child_id, date__gte=start, date__lte=end),
+            GoalWeekRollup.objects.filter(
+                child_id=child_id, week_start__gte=start - timedelta(days=start.weekday()), week_start__lte=end
+            ),
+            extra=[*request_variant(request), start, end],
+        )
+
+    def dashboard_fingerprint(self, request):
+        day = requested_date(request)
+        monday, _ = week_bounds(day)
+        return fingerprint(
+            self.filter_queryset(self.get_queryset()),
+            ScreenTimeGoal.objects.all(),
+            DailyTracking.objects.filter(date=day),
+            WeeklyBalance.objects.filter(week_start=monday),
+            extra=[*request_variant(request), day],
+        )
+
     @action(detail=True, methods=['get'])
+    @conditional(daily_summary_fingerprint)
+    @query_budget(6)
     def daily_summary(self, request, pk=None):
         """Get today's tracking summary for a child."""
         child = self.get_object()
         # Allow client to request summary for a specific date via `date` query param
-        date_param = request.query_params.get('date')
-        if date_param:
-            try:
-                today = datetime.strptime(date_param, '%Y-%m-%d').date()
-            except Exception:
-                today = timezone.now().date()
-        else:
-            today = timezone.now().date()
-        
-        # Collect goals that apply for this day
-        day_map = {0: 'mon', 1: 'tue', 2: 'wed', 3: 'thu', 4: 'fri', 5: 'sat', 6: 'sun'}
-        day_code = day_map[today.weekday()]
-
-        all_goals = ScreenTimeGoal.objects.filter(children=child, is_active=True).order_by('order')
-        applicable_goals = [g for g in all_goals if day_code in [d.strip() for d in (g.applies_to_days or '').split(',')]]
-
-        # Fetch existing trackings for applicable goals on this date for this child
-        trackings_qs = DailyTracking.objects.filter(child=child, goal__in=applicable_goals, date=today).select_related('goal')
-
-        # Build a mapping goal_id -> tracking
-        tracking_map = {t.goal_id: t for t in trackings_qs}
-
-        # Prepare goals list: include a synthetic tracking for goals without one
-        goals_list = []
-        earned = 0
-        not_earned = 0
-        total_target = 0
-        total_earned = 0
-
-        for g in applicable_goals:
-            total_target += g.target_minutes or 0
-            t = tracking_map.get(g.id)
-            if t:
-                goals_list.append(t)
-                total_earned += t.minutes_earned or 0
-                if t.status == 'earned':
-                    earned += 1
-                elif t.status == 'not_earned':
-                    not_earned += 1
-            else:
-                # synthetic 'not_earned' tracking (default)
-                not_earned += 1
-                goals_list.append(DailyTracking(child=child, goal=g, date=today, status='not_earned', minutes_earned=0, actual_minutes=0, bonus_earned=False))
-
-        summary = {
-            'date': today,
-            'child_id': child.id,
-            'child_name': child.name,
-            'total_target_minutes': total_target,
-            'total_earned_minutes': total_earned,
-            'pending_goals': 0,
-            'earned_goals': earned,
-            'not_earned_goals': not_earned,
-            'goals': DailyTrackingSerializer(goals_list, many=True).data
-        }
-        
-        return Response(summary)
+        day = requested_date(request)
+        return Response(cached_summary('daily', child.id, day, lambda: daily_summary(child, day)))
     
     @action(detail=True, methods=['get'])
+    @conditional(weekly_fingerprint)
+    @query_budget(4)
     def weekly_summary(self, request, pk=None):
         """Get current week's tracking summary for a child."""
         child = self.get_object()
         # Allow client to request the week containing a specific date via `date` query param
-        date_param = request.query_params.get('date')
-        if date_param:
-            try:
-                ref_date = datetime.strptime(date_param, '%Y-%m-%d').date()
-            except Exception:
-                ref_date = timezone.now().date()
-        else:
-            ref_date = timezone.now().date()
+        monday, _ = week_bounds(requested_date(request))
+        return Response(cached_summary('weekly', child.id, monday, lambda: weekly_summary(child, monday)))
 
-        monday = ref_date - timedelta(days=ref_date.weekday())
-        sunday = monday + timedelta(days=6)
-        
-        # Get all trackings for the week for this child
-        trackings = DailyTracking.objects.filter(
-            child=child,
-            date__gte=monday,
-            date__lte=sunday
-        ).select_related('goal')
-
-        # Only count minutes for trackings where the goal applies to that tracking's weekday
-        # AND the child is still assigned to that goal
-        day_map = {0: 'mon', 1: 'tue', 2: 'wed', 3: 'thu', 4: 'fri', 5: 'sat', 6: 'sun'}
-        total_earned = 0
-        for t in trackings:
-            day_code = day_map[t.date.weekday()]
-            applies = day_code in [d.strip() for d in (t.goal.applies_to_days or '').split(',')]
-            if not applies or t.status != 'earned':
-                continue
-            # If goal is marked to roll Sunday into next week, skip counting it this week
-            if day_code == 'sun' and getattr(t.goal, 'rollover_sunday_to_next_week', False):
-                continue
-            total_earned += t.minutes_earned or 0
-
-        # Include roll-over earnings from the previous Sunday's completed goals (for flagged goals)
-        prev_sunday = monday - timedelta(days=1)
-        rollover_trackings = DailyTracking.objects.filter(
-            child=child,
-            date=prev_sunday,
-            goal__rollover_sunday_to_next_week=True,
-            status='earned'
-        ).select_related('goal')
-
-        for t in rollover_trackings:
-            # Only count if the goal actually applies to Sundays
-            applies = 'sun' in [d.strip() for d in (t.goal.applies_to_days or '').split(',')]
-            if applies:
-                total_earned += t.minutes_earned or 0
-
-        summary = {
-            'child_id': child.id,
-            'child_name': child.name,
-            'week_start': monday,
-            'week_end': sunday,
-            'total_baseline_minutes': child.baseline_weekly_minutes,
-            'total_earned_minutes': total_earned,
-            'total_available_minutes': child.baseline_weekly_minutes + total_earned,
-        }
-        
-        return Response(summary)
+    @action(detail=True, methods=['get'])
+    @conditional(weekly_fingerprint)
+    @query_budget(4)
+    def weekly_ledger(self, request, pk=None):
+        """Get the full weekly balance for a child.
+
+        Folds the baseline, goal earnings, ad-hoc rewards and penalties and
+        screen time used into one payload for the week containing `date`.
+        """
+        child = self.get_object()
+        monday, _ = week_bounds(requested_date(request))
+        return Response(cached_summary('ledger', child.id, monday, lambda: weekly_ledger(child, monday)))
+
+    @action(detail=True, methods=['get'])
+    @conditional(history_fingerprint)
+    @query_budget(8)
+    def history(self, request, pk=None):
+        """Get week- or month-bucketed trends for a child.
+
+        Takes `start`, `end` (default: the year up to today) and `bucket`
+        (`week` or `month`). Returns per-bucket goal earnings, ad-hoc
+        rewards and penalties, usage and allowance, and each goal's
+        completion rate per bucket.
+        """
+        params = history_params(request)
+        child = self.get_object()
+        return Response(history(child, params['start'], params['end'], params['bucket']))
 
+    @action(detail=False, methods=['get'])
+    @conditional(dashboard_fingerprint)
+    @query_budget(8)
+    def dashboard(self, request):
+        """Get daily and weekly summaries for every child in one response."""
+        children = self.filter_queryset(self.get_queryset())
+        return Response(household_dashboard(children, requested_date(request)))
 
-class ScreenTimeGoalViewSet(viewsets.ModelViewSet):
+
+class ScreenTimeGoalViewSet(QueryBudgetMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet for managing screen time goals."""
     queryset = ScreenTimeGoal.objects.all()
     serializer_class = ScreenTimeGoalSerializer
     permission_classes = [AllowAny]
+    # Writes are left out: schedule changes and deletes recompute every week the goal touched
+    query_budgets = {'list': 5, 'retrieve': 2}
+    etag_related_models = [Child]
     
     def get_queryset(self):
         child_id = self.request.query_params.get('child_id')
+        queryset = ScreenTimeGoal.objects.prefetch_related('children')
         if child_id:
-            return ScreenTimeGoal.objects.filter(children__id=child_id).order_by('order').distinct()
-        return ScreenTimeGoal.objects.all().order_by('order')
+            return queryset.filter(children__id=child_id).order_by('order').distinct()
+        return queryset.order_by('order')
     
     @action(detail=False, methods=['post'])
+    @query_budget(3)
     def reorder(self, request):
-        """Reorder goals by updating their order field."""
-        goals_order = request.data.get('goals', [])
-        updated_goals = []
+        """Set each goal's order to its position in `goals`.
         
-        for idx, goal_id in enumerate(goals_order):
-            try:
-                goal = ScreenTimeGoal.objects.get(id=goal_id)
-                goal.order = idx
-                goal.save()
-                updated_goals.append(ScreenTimeGoalSerializer(goal).data)
-            except ScreenTimeGoal.DoesNotExist:
-                pass
+        Every id must exist. Only goals whose position changes are written,
+        in a single UPDATE, and their `updated_at` is bumped so delta syncs
+        and conditional GETs see the new order.
+        """
+        serializer = GoalReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        goal_ids = serializer.validated_data['goals']
         
+        with transaction.atomic():
+            goals = ScreenTimeGoal.objects.select_for_update().prefetch_related('children').in_bulk(goal_ids)
+            missing = [goal_id for goal_id in goal_ids if goal_id not in goals]
+            if missing:
+                raise ValidationError({'goals': [f"Unknown goal ids: {', '.join(map(str, missing))}"]})
+            
+            now = timezone.now()
+            moved = []
+            for idx, goal_id in enumerate(goal_ids):
+                goal = goals[goal_id]
+                if goal.order != idx:
+                    goal.order = idx
+                    goal.updated_at = now
+                    moved.append(goal)
+            # bulk_update skips signals, so drop the cached summaries that list these goals here
+            ScreenTimeGoal.objects.bulk_update(moved, ['order', 'updated_at'])
+            summary_cache.invalidate(*{child.pk for goal in moved for child in goal.children.all()})
+        
+        updated_goals = ScreenTimeGoalSerializer([goals[goal_id] for goal_id in goal_ids], many=True).data
         return Response({'updated': updated_goals})
 
 
-class DailyTrackingViewSet(viewsets.ModelViewSet):
+class DailyTrackingViewSet(QueryBudgetMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet for managing daily tracking."""
     queryset = DailyTracking.objects.all()
     serializer_class = DailyTrackingSerializer
     permission_classes = [AllowAny]
+    query_budgets = {'list': 5, 'retrieve': 1, 'create': 8, 'update': 10, 'partial_update': 10, 'destroy': 5}
+    etag_related_models = [Child, ScreenTimeGoal]
     
     def get_queryset(self):
         goal_id = self.request.query_params.get('goal_id')
         date = self.request.query_params.get('date')
         child_id = self.request.query_params.get('child_id')
         
-        queryset = DailyTracking.objects.all()
+        queryset = DailyTracking.objects.select_related('child', 'goal')
         
         if child_id:
             queryset = queryset.filter(child_id=child_id)
@@ -215,104 +266,229 @@ class DailyTrackingViewSet(viewsets.ModelViewSet):
         serializer.save()
     
     @action(detail=False, methods=['post'])
+    @query_budget(21)
     def bulk_update(self, request):
-        """Bulk update multiple daily trackings."""
+        """Create or update many daily trackings in one transaction.
+
+        Expects JSON body with `trackings`: a list of items keyed on
+        (child, goal, date) or on an existing tracking `id`. The whole batch
+        is validated before anything is written; any invalid item returns
+        400 with per-item errors.
+        """
         trackings_data = request.data.get('trackings', [])
-        updated = []
+        if not isinstance(trackings_data, list):
+            return Response({'trackings': ['Expected a list of items.']}, status=status.HTTP_400_BAD_REQUEST)
         
-        for tracking_data in trackings_data:
-            tracking_id = tracking_data.get('id')
-            try:
-                tracking = DailyTracking.objects.get(id=tracking_id)
-                serializer = self.get_serializer(
-                    tracking, data=tracking_data, partial=True
-                )
-                if serializer.is_valid():
-                    tracking = serializer.save()
-                    self._update_weekly_allocation(tracking)
-                    updated.append(serializer.data)
-            except DailyTracking.DoesNotExist:
-                pass
+        results, errors = bulk_upsert_trackings(trackings_data)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        for result in results:
+            result['tracking'] = self.get_serializer(result['tracking']).data
+        return Response({'results': results})
+
+    @action(detail=False, methods=['put'])
+    @query_budget(11)
+    def upsert(self, request):
+        """Create or update the tracking for one (child, goal, date) in a single request.
+
+        `minutes_earned` is computed server-side from the goal's
+        `reward_minutes`, `reward_per_hour` and `bonus_minutes`; any value
+        sent by the client is ignored.
+        """
+        data, child, goal, errors = validate_upsert(request.data)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({'updated': updated})
+        tracking, created = upsert_tracking(child, goal, data['date'], data)
+        return Response(
+            self.get_serializer(tracking).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
 
     @action(detail=False, methods=['post'])
+    @query_budget(1)
     def batch(self, request):
-        """Return trackings for multiple goals and/or dates in one request.
+        """Return one child's trackings for a date range, a page at a time.
 
-        Expects JSON body with optional keys:
-          - goal_ids: [int, int, ...]
-          - dates: ["YYYY-MM-DD", ...]
+        Expects JSON body with keys:
+          - child_id: int (required)
+          - goal_ids: [int, int, ...] (optional)
+          - start, end: "YYYY-MM-DD" (optional, inclusive)
+          - cursor: `next` value from the previous page (optional)
+          - page_size: int (optional, capped at 500)
 
-        Returns serialized DailyTracking objects that match any of the provided
-        goal_ids and dates.
+        Returns `results` ordered by (date, goal) and a `next` cursor, which
+        is null on the last page.
         """
-        goal_ids = request.data.get('goal_ids') or []
-        dates = request.data.get('dates') or []
+        params = TrackingBatchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
 
-        qs = DailyTracking.objects.all().select_related('goal')
-        if goal_ids:
-            qs = qs.filter(goal_id__in=goal_ids)
-        if dates:
-            qs = qs.filter(date__in=dates)
+        qs = DailyTracking.objects.filter(child_id=params['child_id']).select_related('child', 'goal')
+        if params.get('goal_ids'):
+            qs = qs.filter(goal_id__in=params['goal_ids'])
+        if 'start' in params:
+            qs = qs.filter(date__gte=params['start'])
+        if 'end' in params:
+            qs = qs.filter(date__lte=params['end'])
 
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+        rows, next_cursor = TrackingKeysetPagination().paginate(
+            qs, params.get('cursor'), params.get('page_size')
+        )
+        serializer = self.get_serializer(rows, many=True)
+        return Response({'results': serializer.data, 'next': next_cursor})
 
 
-class AdhocRewardViewSet(viewsets.ModelViewSet):
+class BootstrapViewSet(viewsets.ViewSet):
+    """Initial data for the dashboard in a single request."""
+    permission_classes = [AllowAny]
+    
+    def list(self, request):
+        """Get children, plus the selected child's goals, trackings, ledger and ad-hoc entries for `date`.
+
+        `child_id` selects the child; without it the first child is used.
+        """
+        children = list(Child.objects.all())
+        child_id = request.query_params.get('child_id')
+        if child_id:
+            child = next((c for c in children if str(c.id) == child_id), None)
+            if child is None:
+                raise Http404
+        else:
+            child = children[0] if children else None
+        return Response(bootstrap(children, child, requested_date(request)))
+
+
+class SyncViewSet(viewsets.ViewSet):
+    """Delta feed for clients that keep a local copy of the data."""
+    permission_classes = [AllowAny]
+    
+    def list(self, request):
+        """Get every row created, updated or deleted since the `since` token.
+
+        Returns `changes` and `deleted` ids keyed by collection, and the
+        `token` to pass as `since` next time. Without `since`, or when it
+        is too old to have all deletions, everything is returned with
+        `reset` set.
+        """
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_token(since)
+            except (ValueError, OverflowError):
+                raise ValidationError({'since': ['Invalid sync token.']})
+        return Response(changes_since(since or None))
+
+
+class MutationViewSet(viewsets.ViewSet):
+    """Replay of mutations queued by offline clients."""
+    permission_classes = [AllowAny]
+    
+    def create(self, request):
+        """Apply a batch of queued mutations in order.
+
+        Expects JSON body with `mutations`: a list of at most MAX_BATCH_SIZE
+        items, each with a client-generated `id`, `model` (tracking, reward,
+        penalty or usage), `op`, `data`, `pk` for updates and deletes, and
+        `base_updated_at`. Returns one result per item; a row changed on
+        the server since `base_updated_at` is a conflict and is not
+        overwritten.
+        """
+        mutations = request.data.get('mutations', [])
+        if not isinstance(mutations, list):
+            return Response({'mutations': ['Expected a list of items.']}, status=status.HTTP_400_BAD_REQUEST)
+        if len(mutations) > MAX_BATCH_SIZE:
+            return Response(
+                {'mutations': [f'Ensure this list has at most {MAX_BATCH_SIZE} items.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'results': apply_mutations(mutations)})
+
+
+class DateRangeFilterMixin:
+    """Filter a child-scoped list by the `date`, `start` and `end` query params.
+
+    Filters apply to `date_field` so lookups use the (child, date) indexes.
+    """
+    date_field = 'date'
+    
+    def _date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValidationError({name: ['Date has wrong format. Use YYYY-MM-DD.']})
+    
+    def filter_by_child_and_dates(self, queryset):
+        child_id = self.request.query_params.get('child_id')
+        if child_id:
+            queryset = queryset.filter(child_id=child_id)
+        
+        day = self._date_param('date')
+        start = self._date_param('start')
+        end = self._date_param('end')
+        if day:
+            queryset = queryset.filter(**{self.date_field: day})
+        if start:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': start})
+        if end:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': end})
+        return queryset
+
+
+class AdhocRewardViewSet(ConditionalListMixin, DateRangeFilterMixin, viewsets.ModelViewSet):
     """ViewSet for managing ad-hoc rewards."""
     queryset = AdhocReward.objects.all()
     serializer_class = AdhocRewardSerializer
     permission_classes = [AllowAny]
+    date_field = 'awarded_date'
     
     def get_queryset(self):
-        child_id = self.request.query_params.get('child_id')
-        if child_id:
-            return AdhocReward.objects.filter(child_id=child_id)
-        return AdhocReward.objects.all()
+        return self.filter_by_child_and_dates(AdhocReward.objects.all())
     
     def perform_create(self, serializer):
         serializer.save()
 
 
-class AdhocPenaltyViewSet(viewsets.ModelViewSet):
+class AdhocPenaltyViewSet(ConditionalListMixin, DateRangeFilterMixin, viewsets.ModelViewSet):
     """ViewSet for managing ad-hoc penalties."""
     queryset = AdhocPenalty.objects.all()
     serializer_class = AdhocPenaltySerializer
     permission_classes = [AllowAny]
+    date_field = 'applied_date'
     
     def get_queryset(self):
-        child_id = self.request.query_params.get('child_id')
-        if child_id:
-            return AdhocPenalty.objects.filter(child_id=child_id)
-        return AdhocPenalty.objects.all()
+        return self.filter_by_child_and_dates(AdhocPenalty.objects.all())
     
     def perform_create(self, serializer):
         serializer.save()
 
 
-class ScreenTimeUsageViewSet(viewsets.ModelViewSet):
+class ScreenTimeUsageViewSet(ConditionalListMixin, DateRangeFilterMixin, viewsets.ModelViewSet):
     """ViewSet for managing screen time usage."""
     queryset = ScreenTimeUsage.objects.all()
     serializer_class = ScreenTimeUsageSerializer
     permission_classes = [AllowAny]
+    etag_related_models = [Child]
     
     def get_queryset(self):
-        child_id = self.request.query_params.get('child_id')
-        date = self.request.query_params.get('date')
-        
-        queryset = ScreenTimeUsage.objects.all()
-        
-        if child_id:
-            queryset = queryset.filter(child_id=child_id)
-        if date:
-            queryset = queryset.filter(date=date)
-            
-        return queryset
+        return self.filter_by_child_and_dates(ScreenTimeUsage.objects.select_related('child'))
     
     def perform_create(self, serializer):
         serializer.save()
     
     def perform_update(self, serializer):
         serializer.save()
+
+
+def prometheus_metrics(request):
+    """Per-route request histograms of this process in the Prometheus text format.
+
+    Only served when REQUEST_METRICS is on.
+    """
+    if not settings.REQUEST_METRICS:
+        raise Http404
+    return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')